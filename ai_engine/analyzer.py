@@ -0,0 +1,134 @@
+"""
+ai_engine/analyzer.py
+----------------------
+Fused text analysis: one cleaning pass and one keyword-automaton pass
+per record instead of separate scans by the NER, classifier and place
+gazetteer.
+
+The fused matcher is compiled from the same terms those modules use
+(ner.entity_terms(), CompiledClassifier.terms, PlaceGazetteer.spellings)
+and each hit is routed back to its owner's own resolution logic, so the
+results are identical to calling _classify_text() and _detect_place()
+on the cleaned text and extract_entities() on its cased form (acronyms
+only count in capitals). It is rebuilt whenever one of the underlying
+compiled forms is.
+
+Enabled in the pipeline with FUSED_ANALYSIS=true.
+"""
+
+import os
+import logging
+import threading
+from typing import NamedTuple, Optional
+from ai_engine.preprocessor import _clean_text as clean_text, _clean_text_cased as clean_text_cased
+from ai_engine.ner import entity_terms, resolve_spans, count_spans, _get_matcher as get_entity_matcher
+from ai_engine.classifier import get_classifier
+from ai_engine.geo_mapper import get_gazetteer, Place
+from ingestion.matcher import KeywordMatcher, WORD
+
+logger = logging.getLogger(__name__)
+
+FUSED_ANALYSIS = os.getenv("FUSED_ANALYSIS", "false").lower() == "true"
+
+# hit kinds in the fused matcher
+_ENTITY   = 0
+_CATEGORY = 1
+_PLACE    = 2
+
+
+class Analysis(NamedTuple):
+    cleaned:         str
+    entities:        dict                     # as extract_entities()
+    entity_counts:   dict                     # as ner.entity_counts()
+    incident_type:   str                      # as _classify_text()
+    ranking:         list                     # as CompiledClassifier.rank()
+    category_counts: dict                     # as CompiledClassifier.counts()
+    place:           Optional[Place]          # as _detect_place(), first place mentioned
+
+
+class FusedAnalyzer:
+    """Entity, category and place terms compiled into one matcher."""
+
+    def __init__(self, classifier, entity_terms_, gazetteer):
+        self.classifier = classifier
+        self.gazetteer  = gazetteer
+
+        # every term is already lower case and analysis runs on cleaned
+        # (lower-cased) text, so the matcher needn't fold case again
+        matcher = KeywordMatcher(case_sensitive=True)
+
+        for spelling, value in entity_terms_:
+            matcher.add(spelling, (_ENTITY, value), boundary=WORD)
+        for keyword, value, boundary in classifier.terms:
+            matcher.add(keyword, (_CATEGORY, value), boundary=boundary)
+        for spelling, index in gazetteer.spellings:
+            matcher.add(spelling, (_PLACE, index), boundary=WORD)
+
+        matcher.compile()
+        self.matcher = matcher
+
+    def __len__(self):
+        return len(self.matcher)
+
+    def analyze(self, text: str) -> Analysis:
+        cleaned = clean_text(text)
+
+        entity_hits   = []
+        category_hits = []
+        place_hit     = None
+
+        for match in self.matcher.finditer(cleaned):
+            kind, value = match.value
+
+            if kind == _ENTITY:
+                entity_hits.append(match._replace(value=value))
+            elif kind == _CATEGORY:
+                category_hits.append(value)
+            elif place_hit is None or (match.start, -match.end) < (place_hit.start, -place_hit.end):
+                # leftmost, then longest: the gazetteer's own first match
+                place_hit = match
+
+        # spans line up with the cased text, which keeps "RAW" apart from "raw"
+        counts  = count_spans(resolve_spans(entity_hits, clean_text_cased(text, cleaned)))
+        ranking = self.classifier.rank_hits(category_hits)
+
+        return Analysis(
+            cleaned         = cleaned,
+            entities        = {key: list(names) for key, names in counts.items()},
+            entity_counts   = counts,
+            incident_type   = ranking[0][0] if ranking else "other",
+            ranking         = ranking,
+            category_counts = self.classifier.count_hits(category_hits),
+            place           = self.gazetteer.place(place_hit.value[1]) if place_hit else None,
+        )
+
+
+_analyzer: Optional[FusedAnalyzer] = None
+_analyzer_key = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> FusedAnalyzer:
+    """The fused analyzer for the current rules / gazetteers, rebuilt when any changes."""
+    global _analyzer, _analyzer_key
+
+    classifier = get_classifier()
+    entity_matcher = get_entity_matcher()
+    gazetteer = get_gazetteer()
+
+    key = (id(classifier), id(entity_matcher), id(gazetteer))
+    if _analyzer is not None and key == _analyzer_key:
+        return _analyzer
+
+    with _analyzer_lock:
+        if _analyzer is None or key != _analyzer_key:
+            _analyzer = FusedAnalyzer(classifier, entity_terms(), gazetteer)
+            _analyzer_key = key
+            logger.info(f"[Analyzer] Compiled {len(_analyzer)} terms")
+
+    return _analyzer
+
+
+def analyze_text(text: str) -> Analysis:
+    """Clean text and extract entities, category and place in one pass."""
+    return get_analyzer().analyze(text)
@@ -3,14 +3,22 @@ ai_engine/classifier.py
 ------------------------
 Classifies a RawOSINT record by ID using keyword rules.
 Writes the incident_type back to the DB row.
+
+The rules are compiled into one keyword automaton (ingestion.matcher),
+so a text is scanned once whatever the number of terms. Every category
+is scored and the best one wins; ties go to the category listed first.
 """
 
+import json
+import hashlib
 import logging
+import threading
 from typing import Optional
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import RawOSINT
 from ai_engine.preprocessor import get_cleaned_content
+from ingestion.matcher import KeywordMatcher, PREFIX, WORD
 
 logger = logging.getLogger(__name__)
 
@@ -50,20 +58,171 @@ CLASSIFICATION_RULES: dict[str, list[str]] = {
 }
 
 
+# Keywords this short are mostly abbreviations ("loc", "ied", "mob") and
+# must match as whole words (their plural, "ieds", is added as a word of
+# its own); longer ones may run into a longer word ("hack" -> "hackers")
+# but must start on a word boundary.
+SHORT_KEYWORD_LEN = 3
+
+
+# ──────────────────────────────────────────────
+# Compiled rules
+# ──────────────────────────────────────────────
+
+def rules_version(rules: dict[str, list[str]]) -> str:
+    """Stable short hash of a rule set; changes whenever any term does."""
+    payload = json.dumps(list(rules.items()), ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:12]
+
+
+class CompiledClassifier:
+    """
+    CLASSIFICATION_RULES compiled into a single matcher.
+
+    Each keyword hit scores its category by the keyword's word count, so
+    specific phrases ("line of control") outweigh single words. A keyword
+    listed under several categories scores each of them.
+    """
+
+    def __init__(self, rules: dict[str, list[str]]):
+        self.version    = rules_version(rules)
+        self.categories = list(rules)
+        self._order     = {category: i for i, category in enumerate(self.categories)}
+
+        terms: dict[str, list[str]] = {}
+        for category, keywords in rules.items():
+            for kw in keywords:
+                kw = kw.lower().strip()
+                if kw and category not in terms.setdefault(kw, []):
+                    terms[kw].append(category)
+
+        # (keyword, (categories, weight), boundary) — also compiled into
+        # the fused matcher of ai_engine.analyzer
+        self.terms = []
+        for kw, categories in terms.items():
+            value = (tuple(categories), len(kw.split()))
+            if len(kw) > SHORT_KEYWORD_LEN:
+                self.terms.append((kw, value, PREFIX))
+                continue
+
+            self.terms.append((kw, value, WORD))
+            if kw + "s" not in terms:
+                self.terms.append((kw + "s", value, WORD))
+
+        self._matcher = KeywordMatcher(boundary=PREFIX)
+        for kw, value, boundary in self.terms:
+            self._matcher.add(kw, value, boundary=boundary)
+        self._matcher.compile()
+
+    def __len__(self):
+        return len(self._matcher)
+
+    def _hits(self, text: str):
+        return (match.value for match in self._matcher.finditer(text or ""))
+
+    def count_hits(self, hits) -> dict[str, int]:
+        result: dict[str, int] = {}
+        for categories, _ in hits:
+            for category in categories:
+                result[category] = result.get(category, 0) + 1
+        return result
+
+    def rank_hits(self, hits) -> list[tuple[str, int]]:
+        scores: dict[str, int] = {}
+        for categories, weight in hits:
+            for category in categories:
+                scores[category] = scores.get(category, 0) + weight
+
+        return sorted(scores.items(), key=lambda item: (-item[1], self._order[item[0]]))
+
+    def counts(self, text: str) -> dict[str, int]:
+        """{category: keyword hits}, only for categories that were hit."""
+        return self.count_hits(self._hits(text))
+
+    def rank(self, text: str) -> list[tuple[str, int]]:
+        """[(category, score)] for every hit category, best first."""
+        return self.rank_hits(self._hits(text))
+
+    def classify(self, text: str) -> str:
+        ranking = self.rank(text)
+        return ranking[0][0] if ranking else "other"
+
+
+_compiled: Optional[CompiledClassifier] = None
+_compiled_key = None
+_compile_lock = threading.Lock()
+
+
+def _rules_key():
+    # cheap identity of the current rules (no per-term work): catches the
+    # dict being replaced, categories added and terms appended
+    return (id(CLASSIFICATION_RULES),) + tuple(
+        (category, id(keywords), len(keywords)) for category, keywords in CLASSIFICATION_RULES.items()
+    )
+
+
+def get_classifier() -> CompiledClassifier:
+    """The compiled classifier for the current rules, rebuilt when they change."""
+    global _compiled, _compiled_key
+
+    key = _rules_key()
+    if _compiled is not None and key == _compiled_key:
+        return _compiled
+
+    with _compile_lock:
+        if _compiled is None or key != _compiled_key:
+            compiled = CompiledClassifier(CLASSIFICATION_RULES)
+
+            if _compiled is None or compiled.version != _compiled.version:
+                logger.info(f"[Classifier] Compiled {len(compiled)} terms (rules {compiled.version})")
+                _compiled = compiled
+
+            _compiled_key = key
+
+    return _compiled
+
+
+def reload_rules() -> str:
+    """
+    Force a rebuild, e.g. after editing a keyword in place (which the
+    cheap change check can't see). Returns the new rules version.
+    """
+    global _compiled_key
+
+    with _compile_lock:
+        _compiled_key = None
+
+    return get_classifier().version
+
+
+def score_text(text: str) -> dict:
+    """
+    Full classification detail for a text.
+
+    Returns:
+        Dict with incident_type, ranking [(category, score)], counts
+        {category: hits} and the rules version used.
+    """
+    classifier = get_classifier()
+    ranking = classifier.rank(text)
+
+    return {
+        "incident_type": ranking[0][0] if ranking else "other",
+        "ranking":       ranking,
+        "counts":        classifier.counts(text),
+        "rules_version": classifier.version,
+    }
+
+
 def _classify_text(text: str) -> str:
     """
-    Keyword-based classifier. Returns the first matched category
+    Keyword-based classifier. Returns the best-scoring category
     or 'other' if nothing matches.
     """
     if not text:
         return "other"
 
-    lower = text.lower()
-    for incident_type, keywords in CLASSIFICATION_RULES.items():
-        for kw in keywords:
-            if kw in lower:
-                return incident_type
-    return "other"
+    return get_classifier().classify(text)
 
 
 # ──────────────────────────────────────────────
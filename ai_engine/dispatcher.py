@@ -0,0 +1,222 @@
+"""
+ai_engine/dispatcher.py
+------------------------
+Event-driven handoff from ingestion to the AI pipeline.
+
+Ingestion announces every committed raw_osint ID (see ingestion/events.py).
+The dispatcher collects those IDs into micro-batches and runs
+process_records() on them within seconds of insert, instead of waiting
+for the next interval sweep.
+
+Two sources of IDs:
+  local    — in-process queue; use when ingestion runs in this process
+             (the scheduler).
+  postgres — LISTEN on the insert channel; use from a separate worker:
+                 python -m ai_engine.dispatcher
+
+NOTIFY is fire-and-forget: anything sent while the listener is down is
+gone. The listener therefore reconnects with backoff and, after every
+(re)connect and every CATCHUP_INTERVAL, queues the IDs of unprocessed
+rows as well. Several workers can run side by side: process_records()
+claims rows with FOR UPDATE SKIP LOCKED.
+"""
+
+import logging
+import queue
+import select
+import threading
+import time
+from typing import Optional
+
+from database import engine
+from ingestion.events import INSERT_CHANNEL, parse_payload, subscribe, unsubscribe
+from ingestion.resilience import backoff_delay
+from ai_engine.pipeline import process_records, unprocessed_record_ids
+
+logger = logging.getLogger(__name__)
+
+
+# ──────────────────────────────────────────────
+# Micro-batch tuning
+# ──────────────────────────────────────────────
+
+BATCH_SIZE   = 50     # max IDs per pipeline call
+MAX_WAIT     = 1.0    # seconds a partial batch waits for more IDs
+LISTEN_POLL  = 5.0    # seconds between LISTEN socket checks (for shutdown)
+
+RECONNECT_MAX    = 60.0    # cap on the backoff between LISTEN reconnects
+CATCHUP_INTERVAL = 60.0    # seconds between polls for rows whose NOTIFY was missed
+CATCHUP_LIMIT    = 500     # max IDs queued per catch-up poll
+
+
+class PipelineDispatcher:
+    """
+    Background thread that drains inserted-ID events into process_records().
+
+    Args:
+        mode:       "local" or "postgres" (see module docstring).
+        batch_size: Max IDs per pipeline call.
+        max_wait:   Max seconds to hold a partial batch.
+    """
+
+    def __init__(self, mode: str = "local", batch_size: int = BATCH_SIZE, max_wait: float = MAX_WAIT):
+        if mode not in ("local", "postgres"):
+            raise ValueError(f"Unknown dispatcher mode: {mode}")
+
+        self.mode       = mode
+        self.batch_size = batch_size
+        self.max_wait   = max_wait
+
+        self._events: Optional[queue.Queue] = None
+        self._stop      = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+        self.batches_run     = 0
+        self.records_pushed  = 0
+        self.reconnects      = 0
+        self._listen_failures = 0
+
+    # ── lifecycle ──
+
+    def start(self) -> None:
+        if self._threads:
+            return
+
+        self._stop.clear()
+
+        if self.mode == "local":
+            self._events = subscribe()
+        else:
+            self._events = queue.Queue()
+            self._spawn(self._listen, "pipeline-listener")
+
+        self._spawn(self._dispatch, "pipeline-dispatcher")
+        logger.info(f"[Dispatcher] Started ({self.mode}).")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+        for thread in self._threads:
+            thread.join(timeout=LISTEN_POLL + 1)
+
+        if self.mode == "local" and self._events is not None:
+            unsubscribe(self._events)
+
+        self._threads = []
+        logger.info("[Dispatcher] Stopped.")
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def _spawn(self, target, name: str) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # ── Postgres LISTEN → internal queue ──
+
+    def _listen(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._listen_once()
+
+            except Exception as e:
+                delay = backoff_delay(self._listen_failures, cap=RECONNECT_MAX)
+                self._listen_failures += 1
+                self.reconnects += 1
+                logger.error(f"[Dispatcher] LISTEN failed: {e}; reconnecting in {delay:.1f}s")
+                self._stop.wait(delay)
+
+    def _listen_once(self) -> None:
+        conn = engine.raw_connection()
+
+        try:
+            dbapi_conn = conn.driver_connection
+            dbapi_conn.autocommit = True
+
+            with dbapi_conn.cursor() as cur:
+                cur.execute(f"LISTEN {INSERT_CHANNEL}")
+
+            self._listen_failures = 0
+
+            # listening first, then polling: a row inserted in between is
+            # announced or found, never neither
+            self._catch_up()
+            next_catch_up = time.monotonic() + CATCHUP_INTERVAL
+
+            while not self._stop.is_set():
+                if time.monotonic() >= next_catch_up:
+                    self._catch_up()
+                    next_catch_up = time.monotonic() + CATCHUP_INTERVAL
+
+                if select.select([dbapi_conn], [], [], LISTEN_POLL) == ([], [], []):
+                    continue
+
+                dbapi_conn.poll()
+                while dbapi_conn.notifies:
+                    notify = dbapi_conn.notifies.pop(0)
+                    self._events.put(parse_payload(notify.payload))
+
+        finally:
+            # don't hand a LISTENing autocommit connection back to the pool
+            conn.invalidate()
+
+    def _catch_up(self) -> None:
+        ids = unprocessed_record_ids(CATCHUP_LIMIT)
+        if ids:
+            logger.info(f"[Dispatcher] Catch-up queued {len(ids)} unprocessed IDs.")
+            self._events.put(ids)
+
+    # ── internal queue → micro-batches → pipeline ──
+
+    def _next_batch(self) -> list[int]:
+        ids: list[int] = []
+        deadline = None
+
+        while len(ids) < self.batch_size and not self._stop.is_set():
+            timeout = self.max_wait if deadline is None else deadline - time.monotonic()
+            if timeout <= 0:
+                break
+
+            try:
+                ids.extend(self._events.get(timeout=timeout))
+            except queue.Empty:
+                if ids:
+                    break
+                continue
+
+            if deadline is None:
+                deadline = time.monotonic() + self.max_wait
+
+        return ids
+
+    def _dispatch(self) -> None:
+        while not self._stop.is_set():
+            ids = self._next_batch()
+            if not ids:
+                continue
+
+            for start in range(0, len(ids), self.batch_size):
+                chunk = ids[start:start + self.batch_size]
+
+                try:
+                    process_records(chunk)
+                    self.batches_run    += 1
+                    self.records_pushed += len(chunk)
+                except Exception as e:
+                    # records stay processed=False; the interval sweep retries them
+                    logger.error(f"[Dispatcher] Batch of {len(chunk)} failed: {e}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    dispatcher = PipelineDispatcher(mode="postgres")
+    dispatcher.start()
+
+    try:
+        while dispatcher.running:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        dispatcher.stop()
@@ -3,10 +3,17 @@ ai_engine/geo_mapper.py
 ------------------------
 Extracts geographic signals from a RawOSINT record by ID.
 Writes country, state, geo_lat, geo_lon back to the DB row.
+
+Coordinates come from the most precise signal found:
+place (district / town / border post gazetteer) > state > country.
 """
 
+import os
+import re
 import logging
-from typing import Optional
+import threading
+from array import array
+from typing import NamedTuple, Optional
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from models import RawOSINT
@@ -95,10 +102,168 @@ DEFAULT_COUNTRY = "India"
 DEFAULT_COORDS: tuple[float, float] = (20.5937, 78.9629)   # India centroid
 
 
+# ──────────────────────────────────────────────
+# Place gazetteer (districts, towns, border posts)
+# ──────────────────────────────────────────────
+# Tab-separated: name, state, kind, lat, lon, aliases ("|"-separated);
+# "#" starts a comment line. A missing file just means no place-level
+# detection.
+
+PLACE_GAZETTEER_PATH = os.getenv(
+    "GEO_GAZETTEER",
+    os.path.join(os.path.dirname(__file__), "data", "gazetteer_in.tsv"),
+)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_END = ""       # trie key marking a complete name; tokens are never empty
+
+
+class Place(NamedTuple):
+    name:  str
+    state: str
+    kind:  str
+    lat:   float
+    lon:   float
+
+
+class PlaceGazetteer:
+    """
+    Array-backed place index. Entries live in parallel columns
+    (names / kinds as lists, states as indexes into a small table,
+    coordinates in array('d')), and a token trie maps word sequences to
+    entry indexes. A lookup walks the trie from each word of the text,
+    so its cost depends on the text, not on the number of places.
+    """
+
+    def __init__(self):
+        self.names:  list[str] = []
+        self.kinds:  list[str] = []
+        self.states: list[str] = []         # distinct state names
+        self._state_ids: dict[str, int] = {}
+        self._state_of = array("H")
+        self.lats = array("d")
+        self.lons = array("d")
+        self._trie: dict = {}
+        self.spellings: list[tuple[str, int]] = []   # (tokens joined by " ", entry)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name: str, state: str, kind: str, lat: float, lon: float, aliases=()) -> int:
+        index = len(self.names)
+
+        state_id = self._state_ids.get(state)
+        if state_id is None:
+            state_id = self._state_ids[state] = len(self.states)
+            self.states.append(state)
+
+        self.names.append(name)
+        self.kinds.append(kind)
+        self._state_of.append(state_id)
+        self.lats.append(lat)
+        self.lons.append(lon)
+
+        for spelling in (name, *aliases):
+            tokens = _TOKEN.findall(spelling.lower())
+            if not tokens:
+                continue
+
+            node = self._trie
+            for token in tokens:
+                node = node.setdefault(token, {})
+            # first entry wins for a shared spelling
+            if _END not in node:
+                node[_END] = index
+                self.spellings.append((" ".join(tokens), index))
+
+        return index
+
+    @classmethod
+    def load(cls, path: str) -> "PlaceGazetteer":
+        gazetteer = cls()
+        if not path or not os.path.exists(path):
+            return gazetteer
+
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip() or line.startswith("#"):
+                    continue
+
+                parts = line.rstrip("\n").split("\t")
+                try:
+                    name, state, kind, lat, lon = parts[:5]
+                    aliases = [a.strip() for a in parts[5].split("|") if a.strip()] if len(parts) > 5 else []
+                    gazetteer.add(name.strip(), state.strip(), kind.strip(), float(lat), float(lon), aliases)
+                except ValueError:
+                    logger.warning(f"[GeoMapper] {path}:{line_no} skipped: {line.strip()!r}")
+
+        return gazetteer
+
+    def place(self, index: int) -> Place:
+        return Place(
+            self.names[index], self.states[self._state_of[index]],
+            self.kinds[index], self.lats[index], self.lons[index],
+        )
+
+    def find(self, text: str) -> list[Place]:
+        """Places mentioned in text, in order; overlapping names resolve to the longest."""
+        if not text or not self._trie:
+            return []
+
+        tokens = _TOKEN.findall(text.lower())
+        found = []
+        i = 0
+
+        while i < len(tokens):
+            node = self._trie
+            match = None
+
+            for j in range(i, len(tokens)):
+                node = node.get(tokens[j])
+                if node is None:
+                    break
+                if _END in node:
+                    match = (j + 1, node[_END])
+
+            if match:
+                found.append(self.place(match[1]))
+                i = match[0]
+            else:
+                i += 1
+
+        return found
+
+
+_gazetteer: Optional[PlaceGazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> PlaceGazetteer:
+    global _gazetteer
+
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = PlaceGazetteer.load(PLACE_GAZETTEER_PATH)
+                logger.info(f"[GeoMapper] Loaded {len(_gazetteer)} places")
+
+    return _gazetteer
+
+
 # ──────────────────────────────────────────────
 # Detection helpers
 # ──────────────────────────────────────────────
 
+def _detect_place(text: str) -> tuple[Optional[str], Optional[str], Optional[float], Optional[float]]:
+    """Returns (place_name, state, lat, lon) for the first place mentioned, or all None."""
+    places = get_gazetteer().find(text)
+    if not places:
+        return None, None, None, None
+
+    place = places[0]
+    return place.name, place.state, place.lat, place.lon
+
+
 def _detect_country(text: str) -> tuple[str, float, float]:
     """Returns (country_name, lat, lon). Defaults to India."""
     lower = text.lower()
@@ -117,6 +282,26 @@ def _detect_state(text: str) -> tuple[Optional[str], Optional[float], Optional[f
     return None, None, None
 
 
+def _resolve_location(text: str) -> dict:
+    """
+    Country, state, place and coordinates for a text, taking coordinates
+    from the most precise signal: place > state > country. A place also
+    fixes the state it belongs to.
+    """
+    place, p_state, p_lat, p_lon = _detect_place(text)
+    state, s_lat, s_lon = _detect_state(text)
+    country, c_lat, c_lon = _detect_country(text)
+
+    if place:
+        state, lat, lon = p_state, p_lat, p_lon
+    elif state:
+        lat, lon = s_lat, s_lon
+    else:
+        lat, lon = c_lat, c_lon
+
+    return {"country": country, "state": state, "place": place, "geo_lat": lat, "geo_lon": lon}
+
+
 # ──────────────────────────────────────────────
 # Single Record
 # ──────────────────────────────────────────────
@@ -131,7 +316,7 @@ def geomap_record(record_id: int, db: Optional[Session] = None) -> dict:
         db:        Optional shared session.
 
     Returns:
-        Dict with keys: country, state, geo_lat, geo_lon.
+        Dict with keys: country, state, place, geo_lat, geo_lon.
     """
     _own_session = db is None
     if _own_session:
@@ -146,20 +331,30 @@ def geomap_record(record_id: int, db: Optional[Session] = None) -> dict:
             logger.warning(f"[GeoMapper] Record ID {record_id} not found.")
             return result
 
+        # coordinates supplied by the source (e.g. GDELT ActionGeo) win
+        if (record.extra_metadata or {}).get("geo_source") and record.geo_lat is not None:
+            return {
+                "country": record.country,
+                "state":   record.state,
+                "place":   None,
+                "geo_lat": record.geo_lat,
+                "geo_lon": record.geo_lon,
+            }
+
         text = get_cleaned_content(record_id, db) or record.content
 
-        # State takes priority for lat/lon (more precise)
-        state, s_lat, s_lon = _detect_state(text)
-        country, c_lat, c_lon = _detect_country(text)
+        # Place, then state, takes priority for lat/lon (more precise)
+        location = _resolve_location(text)
 
-        record.state   = state
-        record.country = country
-        record.geo_lat = s_lat if s_lat is not None else c_lat
-        record.geo_lon = s_lon if s_lon is not None else c_lon
+        record.state   = location["state"]
+        record.country = location["country"]
+        record.geo_lat = location["geo_lat"]
+        record.geo_lon = location["geo_lon"]
 
         result = {
-            "country": country,
-            "state":   state,
+            "country": record.country,
+            "state":   record.state,
+            "place":   location["place"],
             "geo_lat": record.geo_lat,
             "geo_lon": record.geo_lon,
         }
@@ -167,7 +362,10 @@ def geomap_record(record_id: int, db: Optional[Session] = None) -> dict:
         if _own_session:
             db.commit()
 
-        logger.info(f"[GeoMapper] ID {record_id} → {country} / {state} ({record.geo_lat}, {record.geo_lon})")
+        logger.info(
+            f"[GeoMapper] ID {record_id} → {record.country} / {record.state} / {location['place']} "
+            f"({record.geo_lat}, {record.geo_lon})"
+        )
         return result
 
     except Exception as e:
@@ -204,13 +402,12 @@ def geomap_unmapped(batch_size: int = 100) -> list[int]:
 
         for record in records:
             text = (record.extra_metadata or {}).get("cleaned_content") or record.content
-            state, s_lat, s_lon = _detect_state(text)
-            country, c_lat, c_lon = _detect_country(text)
+            location = _resolve_location(text)
 
-            record.state   = state
-            record.country = country
-            record.geo_lat = s_lat if s_lat is not None else c_lat
-            record.geo_lon = s_lon if s_lon is not None else c_lon
+            record.state   = location["state"]
+            record.country = location["country"]
+            record.geo_lat = location["geo_lat"]
+            record.geo_lon = location["geo_lon"]
 
         db.commit()
         processed_ids = [r.id for r in records]
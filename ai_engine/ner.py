@@ -4,10 +4,26 @@ ai_engine/ner.py
 Named Entity Recognition without spaCy.
 Uses keyword matching against known entities for Python 3.12 compatibility.
 spaCy conflicts with pydantic on Python 3.12 — this avoids that entirely.
+
+All known names (the lists below, the geo_mapper states / countries and
+the optional gazetteer file) are compiled once into a single keyword
+automaton, so extraction is one pass over the text however large the
+gazetteer grows. Names only match on word boundaries ("raw" no longer
+fires inside "draw"), and where names of one type overlap the longest
+wins ("jammu and kashmir" rather than "jammu" + "kashmir"). Demonyms
+("pakistani troops") and possessives ("pakistans", as cleaning leaves
+"pakistan's") still name the place, as the old substring match did.
 """
 
+import os
 import re
+import logging
+import threading
+from typing import NamedTuple, Optional
 from ai_engine.geo_mapper import INDIAN_STATES, NEIGHBOR_COUNTRIES
+from ingestion.matcher import KeywordMatcher, WORD
+
+logger = logging.getLogger(__name__)
 
 # ── Known Organizations ──
 KNOWN_ORGS = [
@@ -18,12 +34,257 @@ KNOWN_ORGS = [
     "government of india", "parliament", "supreme court",
 ]
 
+# Acronyms that are also everyday words ("police who arrived", "raw
+# data", French "un") only count written in capitals. The pipeline
+# analyses lower-cased text, so there only the long forms match.
+ACRONYM_ONLY = {"raw", "un", "who"}
+
+ORG_LONG_FORMS = {
+    "raw": ["research and analysis wing"],
+    "un":  ["united nations"],
+    "who": ["world health organization", "world health organisation"],
+}
+
 # ── Known Persons (expandable) ──
 KNOWN_PERSONS = [
     "modi", "shah", "rajnath", "jaishankar", "doval",
     "xi jinping", "imran", "shehbaz", "biden", "putin",
 ]
 
+# ── Demonyms of the built-in locations ──
+DEMONYMS = {
+    "India":       ["indians"],
+    "Pakistan":    ["pakistani", "pakistanis"],
+    "China":       ["chinese"],
+    "Bangladesh":  ["bangladeshi", "bangladeshis"],
+    "Nepal":       ["nepalese", "nepali", "nepalis"],
+    "Sri Lanka":   ["sri lankan", "sri lankans"],
+    "Myanmar":     ["myanmarese", "burmese"],
+    "Bhutan":      ["bhutanese"],
+    "Afghanistan": ["afghan", "afghans"],
+    "Kashmir":     ["kashmiri", "kashmiris"],
+    "Punjab":      ["punjabi", "punjabis"],
+    "Assam":       ["assamese"],
+    "Manipur":     ["manipuri", "manipuris"],
+    "Gujarat":     ["gujarati", "gujaratis"],
+    "Rajasthan":   ["rajasthani", "rajasthanis"],
+    "Bihar":       ["bihari", "biharis"],
+    "Ladakh":      ["ladakhi", "ladakhis"],
+    "Sikkim":      ["sikkimese"],
+    "Goa":         ["goan", "goans"],
+    "Uttarakhand": ["uttarakhandi", "uttarakhandis"],
+}
+
+# ── Optional gazetteer file ──
+# Tab-separated: <type> <name> [<alias>|<alias>...], type one of
+# person / organization / location; "#" starts a comment line.
+GAZETTEER_PATH = os.getenv(
+    "NER_GAZETTEER",
+    os.path.join(os.path.dirname(__file__), "data", "entities.tsv"),
+)
+
+PERSON       = "person"
+ORGANIZATION = "organization"
+LOCATION     = "location"
+
+# extract_entities() keys, in output order
+ENTITY_KEYS = {PERSON: "persons", ORGANIZATION: "organizations", LOCATION: "locations"}
+
+
+class EntitySpan(NamedTuple):
+    start: int
+    end:   int
+    label: str       # person / organization / location
+    name:  str       # canonical display name
+
+
+# ──────────────────────────────────────────────
+# Gazetteer
+# ──────────────────────────────────────────────
+
+def _read_gazetteer(path: str) -> list[tuple[str, str, list[str]]]:
+    """[(type, name, aliases)] from a gazetteer file; [] if it doesn't exist."""
+    if not path or not os.path.exists(path):
+        return []
+
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.rstrip("\n")
+            if not line.strip() or line.startswith("#"):
+                continue
+
+            parts = line.split("\t")
+            label = parts[0].strip().lower()
+            if label not in ENTITY_KEYS or len(parts) < 2 or not parts[1].strip():
+                logger.warning(f"[NER] {path}:{line_no} skipped: {line!r}")
+                continue
+
+            aliases = [a.strip() for a in parts[2].split("|")] if len(parts) > 2 else []
+            entries.append((label, parts[1].strip(), [a for a in aliases if a]))
+
+    return entries
+
+
+def _spellings(term: str) -> set[str]:
+    # the pipeline matches cleaned text, where "lashkar-e-taiba" has become
+    # "lashkaretaiba"; raw text keeps the punctuation or spaces it
+    term = term.lower().strip()
+    return {
+        term,
+        re.sub(r"[^a-z0-9\s]", "", term),
+        re.sub(r"\s+", " ", re.sub(r"[^a-z0-9\s]", " ", term)).strip(),
+    } - {""}
+
+
+def _entity_terms(gazetteer_path: Optional[str] = GAZETTEER_PATH) -> list[tuple[str, tuple[str, str]]]:
+    """[(spelling, (label, name))] for every known name, first definition first."""
+    terms = []
+    seen: set[str] = set()
+
+    def add(term, label, name):
+        # first definition of a term wins, so built-in names keep their type
+        for spelling in sorted(_spellings(term)):
+            if spelling not in seen:
+                seen.add(spelling)
+                terms.append((spelling, (label, name)))
+
+    builtin = [(state, LOCATION, state) for state in INDIAN_STATES]
+    builtin += [(country, LOCATION, country) for country in NEIGHBOR_COUNTRIES]
+    builtin += [("india", LOCATION, "India")]
+    builtin += [(org, ORGANIZATION, org.title()) for org in KNOWN_ORGS]
+    builtin += [(person, PERSON, person.title()) for person in KNOWN_PERSONS]
+
+    for term, label, name in builtin:
+        add(term, label, name)
+
+    add("indian", LOCATION, "India")
+    for name, demonyms in DEMONYMS.items():
+        for demonym in demonyms:
+            add(demonym, LOCATION, name)
+    for org, long_forms in ORG_LONG_FORMS.items():
+        for long_form in long_forms:
+            add(long_form, ORGANIZATION, org.title())
+
+    for label, name, aliases in _read_gazetteer(gazetteer_path):
+        add(name, label, name)
+        for alias in aliases:
+            add(alias, label, name)
+
+    # cleaned text keeps "pakistan's" as "pakistans"; added last so a
+    # real name ("isis") is never taken for a possessive ("isi's")
+    for term, label, name in builtin:
+        if term not in ACRONYM_ONLY:
+            add(f"{term}s", label, name)
+
+    return terms
+
+
+def _build_matcher(terms) -> KeywordMatcher:
+    matcher = KeywordMatcher(boundary=WORD)
+    for spelling, value in terms:
+        matcher.add(spelling, value)
+
+    matcher.compile()
+    logger.info(f"[NER] Compiled {len(matcher)} entity names")
+    return matcher
+
+
+_matcher: Optional[KeywordMatcher] = None
+_terms: list = []
+_matcher_lock = threading.Lock()
+
+
+def _get_matcher() -> KeywordMatcher:
+    global _matcher, _terms
+
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _terms = _entity_terms()
+                _matcher = _build_matcher(_terms)
+
+    return _matcher
+
+
+def entity_terms() -> list[tuple[str, tuple[str, str]]]:
+    """The (spelling, (label, name)) terms behind the current matcher."""
+    _get_matcher()
+    return _terms
+
+
+def reload_gazetteer(path: Optional[str] = None) -> int:
+    """
+    Rebuild the matcher, e.g. after editing the gazetteer file or the
+    lists above. Returns the number of compiled names.
+    """
+    global _matcher, _terms
+
+    terms = _entity_terms(path or GAZETTEER_PATH)
+    matcher = _build_matcher(terms)
+    with _matcher_lock:
+        _matcher, _terms = matcher, terms
+
+    return len(matcher)
+
+
+# ──────────────────────────────────────────────
+# Extraction
+# ──────────────────────────────────────────────
+
+def _is_acronym_word(text: str, m) -> bool:
+    # an ACRONYM_ONLY spelling not written in capitals ("who", "Raw")
+    word = text[m.start:m.end]
+    return word.lower() in ACRONYM_ONLY and not word.isupper()
+
+
+def resolve_spans(matches, text: str) -> list[EntitySpan]:
+    """
+    Entity spans from raw matcher hits (value = (label, name)) on text,
+    in text order. ACRONYM_ONLY names count only in capitals; overlapping
+    names of the same type resolve to the longest, leftmost one.
+    """
+    matches = sorted(
+        (m for m in matches if not _is_acronym_word(text, m)),
+        key=lambda m: (m.start, -m.end),
+    )
+
+    # overlaps are resolved per type: "indian army" is an organization
+    # and still puts India in the locations
+    spans = []
+    taken: dict[str, int] = {}
+    for m in matches:
+        label, name = m.value
+        if m.start >= taken.get(label, 0):
+            spans.append(EntitySpan(m.start, m.end, label, name))
+            taken[label] = m.end
+
+    return spans
+
+
+def find_entities(text: str) -> list[EntitySpan]:
+    """Every entity mention in text, in text order (see resolve_spans)."""
+    if not text:
+        return []
+
+    return resolve_spans(_get_matcher().finditer(text), text)
+
+
+def count_spans(spans) -> dict[str, dict[str, int]]:
+    """{"persons" / "organizations" / "locations": {name: mentions}}."""
+    counts: dict[str, dict[str, int]] = {key: {} for key in ENTITY_KEYS.values()}
+
+    for span in spans:
+        bucket = counts[ENTITY_KEYS[span.label]]
+        bucket[span.name] = bucket.get(span.name, 0) + 1
+
+    return counts
+
+
+def entity_counts(text: str) -> dict[str, dict[str, int]]:
+    """{"persons" / "organizations" / "locations": {name: mentions}}."""
+    return count_spans(find_entities(text))
+
 
 def extract_entities(text: str) -> dict:
     """
@@ -31,38 +292,6 @@ def extract_entities(text: str) -> dict:
 
     Returns:
         Dict with keys: persons, organizations, locations
+        (distinct names, in order of first mention)
     """
-    if not text:
-        return {"persons": [], "organizations": [], "locations": []}
-
-    lower = text.lower()
-
-    # ── Locations — match Indian states + neighbour countries ──
-    locations = []
-    for state in INDIAN_STATES:
-        if state.lower() in lower:
-            locations.append(state)
-    for country in NEIGHBOR_COUNTRIES:
-        if country.lower() in lower:
-            locations.append(country)
-    # Also catch "India" itself
-    if "india" in lower:
-        locations.append("India")
-
-    # ── Organizations ──
-    organizations = []
-    for org in KNOWN_ORGS:
-        if org in lower:
-            organizations.append(org.title())
-
-    # ── Persons ──
-    persons = []
-    for person in KNOWN_PERSONS:
-        if person in lower:
-            persons.append(person.title())
-
-    return {
-        "persons":       list(set(persons)),
-        "organizations": list(set(organizations)),
-        "locations":     list(set(locations)),
-    }
\ No newline at end of file
+    return {key: list(names) for key, names in entity_counts(text).items()}
@@ -5,27 +5,395 @@ Processes unprocessed RawOSINT records from the database.
 
 Changes from original:
   1. Per-record try/except  — one bad record won't rollback the entire batch
-  2. Per-record commit       — progress is saved incrementally
+  2. Per-record savepoint    — a failed record is rolled back alone; one commit per batch
   3. finally db.close()     — no DB connection leaks on exceptions
   4. batch_size limit        — prevents memory overflow on large tables
   5. geo_lat / geo_lon       — coordinates now saved alongside country/state
+  6. process_records(ids)    — targeted runs for IDs pushed by ingestion
+  7. geo_source metadata     — records geocoded upstream (GDELT events) keep their coordinates
+  8. ENRICH_BODIES           — optional article text behind record.url is analysed with the headline
+  9. place gazetteer         — districts / towns / border posts give coordinates before states
+ 10. FUSED_ANALYSIS          — one matcher pass for entities, category and place (same results)
+ 11. PIPELINE_BATCH_WRITE    — results written with one executemany UPDATE per chunk, savepoint-isolated
+ 12. Row claiming            — batches are loaded FOR UPDATE SKIP LOCKED, so concurrent workers
+                               (dispatchers, the interval sweep) never process the same record
+ 13. Near-duplicates         — rows ingestion linked to an original (near_duplicate_of) take over
+                               its analysis instead of being analysed / enriched again
   All original logic (confidence formula, keyword_vector, severity labels) preserved.
 """
 
+import os
 import logging
+from typing import Optional
+from sqlalchemy import bindparam
 from database import SessionLocal
 from models import RawOSINT
-from ai_engine.preprocessor import _clean_text as clean_text
+from ai_engine.preprocessor import _clean_text as clean_text, _clean_text_cased as clean_text_cased
 from ai_engine.ner import extract_entities
-from ai_engine.geo_mapper import _detect_country as detect_country, _detect_state as detect_state, INDIAN_STATES, NEIGHBOR_COUNTRIES, DEFAULT_COORDS
+from ai_engine.geo_mapper import _detect_country as detect_country, _detect_state as detect_state, _detect_place as detect_place, INDIAN_STATES, NEIGHBOR_COUNTRIES, DEFAULT_COORDS
 from ai_engine.classifier import _classify_text as classify_incident
 from ai_engine.risk_engine import _get_severity_level as calculate_severity, _calculate_risk_score as calculate_risk_score
 from ai_engine.summarizer import _generate_summary as generate_summary
+from ai_engine.analyzer import FUSED_ANALYSIS, analyze_text
+from ingestion.enrichment import ENRICH_BODIES, fetch_bodies
+from ingestion.utils import _first_line
 
 logger = logging.getLogger(__name__)
 
 SEVERITY_LABELS = ["low", "medium", "high"]
 
+# Batch write-back: compute a whole batch in memory, then write it with
+# one executemany UPDATE (and one commit) per chunk instead of a commit
+# per record
+BATCH_WRITE = os.getenv("PIPELINE_BATCH_WRITE", "false").lower() == "true"
+WRITE_CHUNK = 500
+
+
+# ──────────────────────────────────────────────
+# Per-record analysis
+# ──────────────────────────────────────────────
+
+def _is_geocoded(record: RawOSINT) -> bool:
+    """True when the collector stored source-provided coordinates."""
+    return bool(
+        (record.extra_metadata or {}).get("geo_source")
+        and record.geo_lat is not None
+        and record.geo_lon is not None
+    )
+
+
+def _analyze(text: str) -> tuple:
+    """
+    Text steps of the pipeline: (cleaned, entities, incident_type,
+    (place, place_state, lat, lon)). FUSED_ANALYSIS gets the same results
+    from a single matcher pass instead of one scan per step.
+    """
+    if FUSED_ANALYSIS:
+        analysis = analyze_text(text)
+        place = analysis.place
+        return (
+            analysis.cleaned,
+            analysis.entities,
+            analysis.incident_type,
+            (place.name, place.state, place.lat, place.lon) if place else (None, None, None, None),
+        )
+
+    cleaned = clean_text(text)
+    # NER reads the cased text: acronyms ("RAW", "UN") only count in capitals
+    entities = extract_entities(clean_text_cased(text, cleaned))
+    return cleaned, entities, classify_incident(cleaned), detect_place(cleaned)
+
+
+def _analyze_record(record: RawOSINT, body: Optional[str] = None) -> dict:
+    """
+    Run every pipeline step on one record and return the new field values
+    ({attribute: value}). The record itself is left untouched.
+    """
+
+    # ── Steps 1, 2, 4: Clean text, extract entities, classify ──
+    # (headline plus article body when enriched)
+    cleaned, entities, incident_type, detected_place = _analyze(
+        f"{record.content}\n\n{body}" if body else record.content
+    )
+    locations = entities.get("locations", [])
+
+    # ── Step 3: Geo detection ──
+    # records geocoded upstream keep their place; detection is skipped
+    geocoded = _is_geocoded(record)
+
+    place = None
+
+    if geocoded:
+        country, state = record.country, record.state
+    else:
+        # detectors return (name, lat, lon); coordinates are resolved below
+        country, _, _ = detect_country(" ".join(locations))
+        state, _, _   = detect_state(" ".join(locations))
+
+        # a district / town pins the record down further and fixes its state
+        place, place_state, place_lat, place_lon = detected_place
+        if place:
+            state = place_state
+
+    # ── Step 5: Risk scoring ──
+    severity_level = calculate_severity(incident_type)
+    risk_score     = calculate_risk_score(severity_level, len(locations), 1, 1.0)
+    severity       = SEVERITY_LABELS[min(severity_level - 1, 2)]
+
+    # ── Step 6: Summary ──
+    summary = generate_summary(incident_type, state, country, severity, record.source)
+
+    # ── Step 7: Field values for the record ──
+    # Coordinates from geo_mapper reference data, most precise first:
+    # place > state > country (upstream coordinates are kept)
+    if geocoded:
+        geo_lat, geo_lon = record.geo_lat, record.geo_lon
+    elif place:
+        geo_lat, geo_lon = place_lat, place_lon
+    elif state and state in INDIAN_STATES:
+        geo_lat, geo_lon = INDIAN_STATES[state]
+    elif country and country in NEIGHBOR_COUNTRIES:
+        geo_lat, geo_lon = NEIGHBOR_COUNTRIES[country]
+    else:
+        geo_lat, geo_lon = DEFAULT_COORDS
+
+    # Save summary + cleaned text into metadata
+    metadata                    = dict(record.extra_metadata or {})
+    metadata["summary"]         = summary
+    metadata["cleaned_content"] = cleaned
+    if place:
+        metadata["place"]       = place
+    if body:
+        metadata["enriched"]    = True
+        metadata["body_chars"]  = len(body)
+
+    return {
+        "country":        country,
+        "state":          state,
+        "incident_type":  incident_type,
+        "severity":       severity,
+        "risk_score":     risk_score,
+        "confidence":     round(0.6 + risk_score * 0.3, 2),
+        "keyword_vector": entities,
+        "processed":      True,
+        "geo_lat":        geo_lat,
+        "geo_lon":        geo_lon,
+        "extra_metadata": metadata,
+    }
+
+
+# ──────────────────────────────────────────────
+# Near-duplicates (linked by ingestion.near_dup)
+# ──────────────────────────────────────────────
+
+# fields a near-duplicate takes over from its already analysed original
+NEAR_DUP_FIELDS = (
+    "country", "state", "incident_type", "severity", "risk_score",
+    "confidence", "keyword_vector", "geo_lat", "geo_lon",
+)
+
+
+def _load_originals(db, records: list[RawOSINT]) -> dict:
+    """{content_hash: processed original} for the records linked to one."""
+    hashes = {(r.extra_metadata or {}).get("near_duplicate_of") for r in records} - {None}
+    if not hashes:
+        return {}
+
+    rows = (
+        db.query(RawOSINT)
+        .filter(RawOSINT.content_hash.in_(hashes), RawOSINT.processed == True)  # noqa: E712
+        .all()
+    )
+    return {row.content_hash: row for row in rows}
+
+
+def _original_of(record: RawOSINT, originals: dict) -> Optional[RawOSINT]:
+    return originals.get((record.extra_metadata or {}).get("near_duplicate_of"))
+
+
+def _copy_record(record: RawOSINT, original: RawOSINT) -> dict:
+    """
+    Field values for a near-duplicate: the original's analysis, with the
+    summary and cleaned text of its own source and content.
+    """
+    fields = {attr: getattr(original, attr) for attr in NEAR_DUP_FIELDS}
+
+    metadata                    = dict(record.extra_metadata or {})
+    metadata["summary"]         = generate_summary(
+        fields["incident_type"], fields["state"], fields["country"], fields["severity"], record.source
+    )
+    metadata["cleaned_content"] = clean_text(record.content)
+    if (original.extra_metadata or {}).get("place"):
+        metadata["place"]       = original.extra_metadata["place"]
+    metadata["analysis_of"]     = original.id
+
+    fields["processed"]      = True
+    fields["extra_metadata"] = metadata
+    return fields
+
+
+def _process_record(record: RawOSINT, body: Optional[str] = None, original: Optional[RawOSINT] = None) -> None:
+    """Run every pipeline step on one record (or copy its original's) and set its fields (no commit)."""
+    fields = _copy_record(record, original) if original is not None else _analyze_record(record, body)
+    for attr, value in fields.items():
+        setattr(record, attr, value)
+
+
+def _fetch_bodies(records: list[RawOSINT]) -> dict:
+    # Article bodies are best effort: deadline-bounded, never fatal
+    if not ENRICH_BODIES or not records:
+        return {}
+
+    try:
+        return fetch_bodies([r.url for r in records if r.url])
+    except Exception as e:
+        logger.warning(f"[Pipeline] Enrichment skipped: {e}")
+        return {}
+
+
+def _process_batch(db, records: list[RawOSINT]) -> tuple[int, int]:
+    """
+    Process already-loaded (and claimed) records. Each record is written
+    in its own savepoint and the batch is committed once, since the
+    commit releases the row locks on everything not yet processed.
+    """
+    if BATCH_WRITE:
+        return _process_batch_bulk(db, records)
+
+    processed_count = 0
+    failed_count = 0
+
+    originals = _load_originals(db, records)
+    bodies = _fetch_bodies([r for r in records if _original_of(r, originals) is None])
+
+    for record in records:
+        try:
+            with db.begin_nested():
+                _process_record(record, bodies.get(record.url), _original_of(record, originals))
+
+            processed_count += 1
+            logger.info(
+                f"[Pipeline] ✓ ID {record.id} | {record.incident_type} | "
+                f"{record.country}/{record.state} | risk={record.risk_score}"
+            )
+
+        except Exception as e:
+            # the savepoint rolled back only this record; continue with the rest
+            failed_count += 1
+            logger.error(f"[Pipeline] ✗ ID {record.id} failed: {e}")
+
+    try:
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"[Pipeline] ✗ Commit of {processed_count} records failed: {_first_line(e)}")
+        processed_count, failed_count = 0, len(records)
+
+    return processed_count, failed_count
+
+
+# ──────────────────────────────────────────────
+# Batch write-back
+# ──────────────────────────────────────────────
+
+def _update_statement():
+    # keyed by the row's id; the SET list comes from the parameter keys
+    table = RawOSINT.__table__
+    return table.update().where(table.c.id == bindparam("_id"))
+
+
+def _column_values(record_id: int, fields: dict) -> dict:
+    # attribute names -> column names (extra_metadata is stored as "metadata")
+    columns = RawOSINT.__mapper__.columns
+    values = {columns[attr].name: value for attr, value in fields.items()}
+    values["_id"] = record_id
+    return values
+
+
+def _write_chunk(db, rows: list[dict]) -> tuple[int, int]:
+    """
+    Write one chunk of column values with a single executemany UPDATE in
+    a savepoint. If the chunk fails, each row is retried in its own
+    savepoint so one bad row can't sink the rest. Returns (written, failed).
+    """
+    stmt = _update_statement()
+
+    try:
+        with db.begin_nested():
+            db.execute(stmt, rows)
+        return len(rows), 0
+
+    except Exception as e:
+        logger.warning(f"[Pipeline] Chunk of {len(rows)} failed ({_first_line(e)}); retrying row by row")
+
+    written = failed = 0
+    for row in rows:
+        try:
+            with db.begin_nested():
+                db.execute(stmt, [row])
+            written += 1
+        except Exception as e:
+            failed += 1
+            logger.error(f"[Pipeline] ✗ ID {row['_id']} failed to write: {_first_line(e)}")
+
+    return written, failed
+
+
+def _process_batch_bulk(db, records: list[RawOSINT]) -> tuple[int, int]:
+    """
+    Compute every record's results in memory, then write them per chunk:
+    one UPDATE round trip per WRITE_CHUNK records and one commit for the
+    batch (which holds the row locks until then).
+    """
+    processed_count = 0
+    failed_count = 0
+
+    originals = _load_originals(db, records)
+    bodies = _fetch_bodies([r for r in records if _original_of(r, originals) is None])
+
+    # ── compute (CPU only, no DB writes) ──
+    rows = []
+    for record in records:
+        try:
+            original = _original_of(record, originals)
+            if original is not None:
+                fields = _copy_record(record, original)
+            else:
+                fields = _analyze_record(record, bodies.get(record.url))
+            rows.append(_column_values(record.id, fields))
+        except Exception as e:
+            failed_count += 1
+            logger.error(f"[Pipeline] ✗ ID {record.id} failed: {e}")
+
+    # the rows are written with Core UPDATEs; the loaded objects are
+    # dropped so a later flush can't write stale values over them
+    db.expunge_all()
+
+    # ── write ──
+    for start in range(0, len(rows), WRITE_CHUNK):
+        written, failed = _write_chunk(db, rows[start:start + WRITE_CHUNK])
+        processed_count += written
+        failed_count += failed
+
+    try:
+        db.commit()
+    except Exception as e:
+        # commit itself failed: nothing in this batch was saved
+        db.rollback()
+        logger.error(f"[Pipeline] ✗ Commit of {processed_count} records failed: {_first_line(e)}")
+        processed_count, failed_count = 0, len(records)
+
+    logger.info(f"[Pipeline] Batch write — {processed_count} written, {failed_count} failed.")
+    return processed_count, failed_count
+
+
+# ──────────────────────────────────────────────
+# Batch entry points
+# ──────────────────────────────────────────────
+
+def _claim(query):
+    # lock the rows until the batch commits; rows another worker holds are skipped
+    # (SQLite has no row locks and ignores this)
+    return query.order_by(RawOSINT.id).with_for_update(skip_locked=True)
+
+
+def unprocessed_record_ids(limit: int = 500) -> list[int]:
+    """IDs of the oldest unprocessed records (dispatcher catch-up)."""
+    db = SessionLocal()
+
+    try:
+        rows = (
+            db.query(RawOSINT.id)
+            .filter(RawOSINT.processed == False)  # noqa: E712
+            .order_by(RawOSINT.id)
+            .limit(limit)
+            .all()
+        )
+        return [row.id for row in rows]
+
+    finally:
+        db.close()
+
 
 def process_unprocessed_records(batch_size: int = 100) -> dict:
     """
@@ -43,74 +411,14 @@ def process_unprocessed_records(batch_size: int = 100) -> dict:
 
     try:
         records = (
-            db.query(RawOSINT)
-            .filter(RawOSINT.processed == False)  # noqa: E712
+            _claim(db.query(RawOSINT).filter(RawOSINT.processed == False))  # noqa: E712
             .limit(batch_size)
             .all()
         )
 
         logger.info(f"[Pipeline] Found {len(records)} unprocessed records.")
 
-        for record in records:
-            try:
-                # ── Step 1: Clean text ──
-                cleaned = clean_text(record.content)
-
-                # ── Step 2: NLP — extract entities ──
-                entities  = extract_entities(cleaned)
-                locations = entities.get("locations", [])
-
-                # ── Step 3: Geo detection ──
-                country = detect_country(" ".join(locations))
-                state   = detect_state(" ".join(locations))
-
-                # ── Step 4: Classify ──
-                incident_type = classify_incident(cleaned)
-
-                # ── Step 5: Risk scoring ──
-                severity_level = calculate_severity(incident_type)
-                risk_score     = calculate_risk_score(severity_level, len(locations), 1, 1.0)
-
-                # ── Step 6: Summary ──
-                summary = generate_summary(incident_type, state, country, SEVERITY_LABELS[min(severity_level - 1, 2)], record.source)
-
-                # ── Step 7: Write back to DB ──
-                record.country        = country
-                record.state          = state
-                record.incident_type  = incident_type
-                record.severity       = SEVERITY_LABELS[min(severity_level - 1, 2)]
-                record.risk_score     = risk_score
-                record.confidence     = round(0.6 + risk_score * 0.3, 2)
-                record.keyword_vector = entities
-                record.processed      = True
-
-                # Coordinates from geo_mapper reference dicts
-                if state and state in INDIAN_STATES:
-                    record.geo_lat, record.geo_lon = INDIAN_STATES[state]
-                elif country and country in NEIGHBOR_COUNTRIES:
-                    record.geo_lat, record.geo_lon = NEIGHBOR_COUNTRIES[country]
-                else:
-                    record.geo_lat, record.geo_lon = DEFAULT_COORDS
-
-                # Save summary + cleaned text into metadata
-                metadata                    = record.extra_metadata or {}
-                metadata["summary"]         = summary
-                metadata["cleaned_content"] = cleaned
-                record.extra_metadata       = metadata
-
-                # Per-record commit — saves progress even if later records fail
-                db.commit()
-                processed_count += 1
-                logger.info(
-                    f"[Pipeline] ✓ ID {record.id} | {incident_type} | "
-                    f"{country}/{state} | risk={risk_score}"
-                )
-
-            except Exception as e:
-                # Rollback only this record, continue with the rest
-                db.rollback()
-                failed_count += 1
-                logger.error(f"[Pipeline] ✗ ID {record.id} failed: {e}")
+        processed_count, failed_count = _process_batch(db, records)
 
     finally:
         db.close()
@@ -122,3 +430,41 @@ def process_unprocessed_records(batch_size: int = 100) -> dict:
         "processed_count": processed_count,
         "failed_count":    failed_count,
     }
+
+
+def process_records(record_ids: list[int], include_processed: bool = False) -> dict:
+    """
+    Run the pipeline on specific records, e.g. ones just inserted by
+    ingestion. Records already processed are skipped unless
+    include_processed is set (used when replaying the archive).
+
+    Args:
+        record_ids:        PKs of RawOSINT rows.
+        include_processed: Re-run records that were already processed.
+
+    Returns:
+        Dict with processed_count and failed_count.
+    """
+    db = SessionLocal()
+    processed_count = 0
+    failed_count = 0
+
+    try:
+        query = db.query(RawOSINT).filter(RawOSINT.id.in_(record_ids))
+        if not include_processed:
+            query = query.filter(RawOSINT.processed == False)  # noqa: E712
+
+        records = _claim(query).all()
+
+        processed_count, failed_count = _process_batch(db, records)
+
+    finally:
+        db.close()
+
+    logger.info(
+        f"[Pipeline] {len(record_ids)} pushed IDs — {processed_count} processed, {failed_count} failed."
+    )
+    return {
+        "processed_count": processed_count,
+        "failed_count":    failed_count,
+    }
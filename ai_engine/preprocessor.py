@@ -19,17 +19,29 @@ logger = logging.getLogger(__name__)
 # Core Text Cleaning
 # ──────────────────────────────────────────────
 
-def _clean_text(text: str) -> str:
+def _clean_text(text: str, keep_case: bool = False) -> str:
     """Pure cleaning logic (no DB dependency — can be unit-tested standalone)."""
     if not text:
         return ""
-    text = text.lower()
+    if not keep_case:
+        text = text.lower()
     text = re.sub(r"http\S+", "", text)           # strip URLs
     text = re.sub(r"[^a-zA-Z0-9\s]", "", text)   # remove special chars
     text = re.sub(r"\s+", " ", text)              # collapse whitespace
     return text.strip()
 
 
+def _clean_text_cased(text: str, cleaned: Optional[str] = None) -> str:
+    """
+    _clean_text() with the original casing, character for character, so
+    NER can tell "RAW" from "raw". Falls back to the cleaned text when
+    lower-casing changes which characters survive (e.g. "İ").
+    """
+    cleaned = _clean_text(text) if cleaned is None else cleaned
+    cased = _clean_text(text, keep_case=True)
+    return cased if cased.lower() == cleaned else cleaned
+
+
 # ──────────────────────────────────────────────
 # Single Record
 # ──────────────────────────────────────────────
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from datetime import timedelta
+from fastapi import APIRouter, HTTPException, Depends, Query
 from ingestion.runner import run_ingestion
 from ai_engine.pipeline import process_unprocessed_records
-from ingestion.scheduler import scheduler
+from ingestion.scheduler import scheduler, dispatcher
+from ingestion.dedup import get_content_filter
+from ingestion.resilience import source_health as get_source_health, reset_source
+from ingestion.registry import get_sources
 from database import get_db
-from models import RawOSINT
+from models import RawOSINT, IngestionLog
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 
 router = APIRouter(prefix="/operations", tags=["Operations"])
 
@@ -48,6 +53,7 @@ def run_ai_endpoint():
 def scheduler_status():
     return {
         "running": scheduler.running,
+        "dispatcher_running": dispatcher.running,
         "jobs": [job.id for job in scheduler.get_jobs()]
     }
 
@@ -58,6 +64,9 @@ def scheduler_status():
 @router.post("/start-scheduler")
 def start_scheduler():
     if not scheduler.running:
+        # new records go straight to the AI pipeline; the interval job
+        # only sweeps up what the dispatcher missed
+        dispatcher.start()
         scheduler.start()
         return {"status": "Scheduler started"}
     return {"status": "Scheduler already running"}
@@ -70,6 +79,7 @@ def start_scheduler():
 def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown()
+        dispatcher.stop()
         return {"status": "Scheduler stopped"}
     return {"status": "Scheduler already stopped"}
 
@@ -89,3 +99,109 @@ def db_stats():
         "processed_records": processed,
         "unprocessed_records": unprocessed
     }
+
+
+# ------------------------------
+# Dedup Filter Stats (for sizing)
+# ------------------------------
+@router.get("/dedup-stats")
+def dedup_stats():
+    return get_content_filter().stats()
+
+
+# ------------------------------
+# Ingestion Stats (per source, percentiles over a window)
+# ------------------------------
+STAT_PERCENTILES = (0.5, 0.95, 0.99)
+
+STAT_METRICS = {
+    "duration_seconds": IngestionLog.duration_seconds,
+    "fetch_seconds": IngestionLog.fetch_seconds,
+    "parse_seconds": IngestionLog.parse_seconds,
+    "insert_seconds": IngestionLog.insert_seconds,
+    "bytes_downloaded": IngestionLog.bytes_downloaded,
+}
+
+
+@router.get("/ingestion-stats")
+def ingestion_stats(hours: int = Query(24, ge=1, le=24 * 30), db: Session = Depends(get_db)):
+    window = IngestionLog.run_time >= func.now() - timedelta(hours=hours)
+
+    columns = [
+        IngestionLog.source,
+        func.count().label("runs"),
+        func.sum(IngestionLog.records_fetched).label("fetched"),
+        func.sum(IngestionLog.records_inserted).label("inserted"),
+        func.sum(IngestionLog.duplicate_count).label("duplicates"),
+    ]
+    for name, column in STAT_METRICS.items():
+        for p in STAT_PERCENTILES:
+            columns.append(
+                func.percentile_cont(p).within_group(column.asc()).label(f"{name}_p{int(p * 100)}")
+            )
+
+    rows = db.query(*columns).filter(window).group_by(IngestionLog.source).all()
+
+    # status and HTTP breakdowns are small; fold them in Python
+    statuses = {}
+    http = {}
+    for source, status, http_status in db.query(
+        IngestionLog.source, IngestionLog.status, IngestionLog.http_status
+    ).filter(window):
+        by_status = statuses.setdefault(source, {})
+        by_status[status] = by_status.get(status, 0) + 1
+
+        by_code = http.setdefault(source, {})
+        for code, count in (http_status or {}).items():
+            by_code[code] = by_code.get(code, 0) + count
+
+    result = []
+    for row in rows:
+        stats = row._asdict()
+        fetched = stats["fetched"] or 0
+
+        stats["duplicate_ratio"] = round((stats["duplicates"] or 0) / fetched, 4) if fetched else 0
+        stats["status_breakdown"] = statuses.get(row.source, {})
+        stats["http_status"] = http.get(row.source, {})
+        result.append(stats)
+
+    return {"window_hours": hours, "sources": result}
+
+
+# ------------------------------
+# Source Health (rate limits, circuit breakers, quotas)
+# ------------------------------
+@router.get("/source-health")
+def source_health():
+    return {"sources": get_source_health()}
+
+
+@router.post("/source-health/{source}/reset")
+def reset_source_health(source: str):
+    reset = reset_source(source)
+    if not reset:
+        raise HTTPException(status_code=404, detail=f"No circuit state for source '{source}'")
+    return {"status": "reset", "source": source, "breakers": reset}
+
+
+# ------------------------------
+# Registered Sources
+# ------------------------------
+@router.get("/sources")
+def list_sources():
+    return {
+        "sources": [
+            {
+                "name": name,
+                "fetch": spec.fetch if isinstance(spec.fetch, str)
+                         else f"{spec.fetch.__module__}:{spec.fetch.__name__}",
+                "enabled": spec.enabled,
+                "interval_minutes": spec.interval_minutes,
+                "deadline": spec.deadline,
+                "concurrency": spec.concurrency,
+                "rate_per_minute": spec.rate_per_minute,
+                "daily_quota": spec.daily_quota,
+            }
+            for name, spec in get_sources(include_disabled=True).items()
+        ]
+    }
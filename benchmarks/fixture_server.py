@@ -0,0 +1,503 @@
+# benchmarks/fixture_server.py
+#
+# Local stand-in for the collectors' upstream services:
+#
+#   python -m benchmarks.fixture_server --port 8765 --latency 0.05 --error-rate 0.02
+#
+# Serves synthetic (or recorded, see --fixtures) responses on the same
+# paths the collectors call, so the ingestion path can be exercised and
+# timed without touching NewsAPI, GDELT, YouTube, Telegram or the RSS hosts.
+#
+#   /newsapi/v2/everything        NewsAPI "everything" JSON
+#   /gdelt/api/v2/doc/doc         GDELT DOC API ArtList JSON
+#   /gdeltv2/lastupdate.txt       GDELT 2.0 export index (newest 15-minute slot)
+#   /gdeltv2/<slot>.export.CSV.zip  zipped tab-separated event export
+#   /youtube/v3/search            YouTube Data API search JSON
+#   /rss/<country>/<n>.xml        RSS 2.0 feed, with ETag / 304 support
+#   /telegram/<channel>           JSON list of channel messages
+#
+# Telegram talks MTProto, not HTTP, so it can't be stood in for directly;
+# the benchmark swaps the Telegram collector for one that reads
+# /telegram/<channel> instead.
+
+import os
+import json
+import time
+import random
+import io
+import hashlib
+import zipfile
+import argparse
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+
+# -----------------------------------------------------
+# CONFIG
+# -----------------------------------------------------
+
+class FixtureConfig:
+    """
+    latency / jitter   - seconds added to every response (uniform jitter)
+    error_rate         - fraction of requests answered with error_status
+    stall_rate         - fraction of requests held for stall_seconds
+                         (to trip client timeouts and source deadlines)
+    items              - records per response
+    duplicate_ratio    - fraction of records reusing an earlier title
+    feed_change_every  - seconds an RSS feed keeps the same ETag (0 = a
+                         new version on every request, never 304)
+    fixtures_dir       - directory of recorded bodies served verbatim
+                         instead of synthetic ones: newsapi.json,
+                         gdelt.json, youtube.json, rss.xml, telegram.json,
+                         gdelt_export.zip
+    """
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, error_status=503,
+                 stall_rate=0.0, stall_seconds=30.0, items=50, duplicate_ratio=0.0,
+                 feed_change_every=0, fixtures_dir=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stall_rate = stall_rate
+        self.stall_seconds = stall_seconds
+        self.items = items
+        self.duplicate_ratio = duplicate_ratio
+        self.feed_change_every = feed_change_every
+        self.fixtures_dir = fixtures_dir
+        self.seed = seed
+
+
+# -----------------------------------------------------
+# SYNTHETIC CONTENT
+# -----------------------------------------------------
+# Titles are random word sequences so they neither collide on
+# content_hash nor look like near-duplicates to the SimHash screen;
+# every title carries at least one collector keyword so keyword filters
+# (regional RSS, Telegram) let it through.
+
+TOPIC_WORDS = ["India", "border", "military", "Kashmir", "LOC", "security", "army", "BSF"]
+
+VOCABULARY = (
+    "patrol convoy ceasefire drone sector checkpoint infiltration intelligence "
+    "officials report district village highway bridge troops deployment talks "
+    "minister statement exercise airspace radar navy coastguard vessel fishing "
+    "protest curfew election court ruling agency warning cyber attack outage "
+    "bank network servers flood landslide rescue relief supply camp refugee "
+    "trade route tariff summit delegation envoy treaty monitoring satellite "
+    "seized weapons narcotics smuggling arrested suspects encounter clash "
+    "injured killed evacuated shelling firing violation outpost battalion"
+).split()
+
+
+class ContentGenerator:
+
+    def __init__(self, duplicate_ratio=0.0, seed=None):
+        self.duplicate_ratio = duplicate_ratio
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._counter = 0
+        self._issued = []
+
+    def title(self):
+        with self._lock:
+            if self._issued and self._random.random() < self.duplicate_ratio:
+                return self._random.choice(self._issued)
+
+            self._counter += 1
+            words = self._random.sample(VOCABULARY, 9)
+            words.insert(self._random.randrange(len(words)), self._random.choice(TOPIC_WORDS))
+            title = " ".join(words) + f" #{self._counter}"
+            title = title[0].upper() + title[1:]
+
+            self._issued.append(title)
+            if len(self._issued) > 10_000:
+                del self._issued[:5_000]
+
+            return title
+
+    def token(self):
+        with self._lock:
+            return "%016x" % self._random.getrandbits(64)
+
+    # seeded draws for fixture fields, so --seed reproduces every body
+    def choice(self, options):
+        with self._lock:
+            return self._random.choice(options)
+
+    def uniform(self, low, high):
+        with self._lock:
+            return self._random.uniform(low, high)
+
+    def getrandbits(self, bits):
+        with self._lock:
+            return self._random.getrandbits(bits)
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _iso(dt):
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def newsapi_body(gen, count):
+    now = _iso(_now())
+    articles = [
+        {
+            "source": {"id": None, "name": "Fixture Times"},
+            "author": "fixture",
+            "title": gen.title(),
+            "url": f"https://fixture.example/news/{gen.token()}",
+            "publishedAt": now,
+        }
+        for _ in range(count)
+    ]
+    return {"status": "ok", "totalResults": len(articles), "articles": articles}
+
+
+def gdelt_body(gen, count):
+    seen = _now().strftime("%Y%m%dT%H%M%SZ")
+    return {
+        "articles": [
+            {
+                "url": f"https://fixture.example/gdelt/{gen.token()}",
+                "title": gen.title(),
+                "seendate": seen,
+                "domain": "fixture.example",
+                "language": "English",
+                "sourcecountry": "India",
+            }
+            for _ in range(count)
+        ]
+    }
+
+
+def youtube_body(gen, count):
+    now = _iso(_now())
+    return {
+        "kind": "youtube#searchListResponse",
+        "items": [
+            {
+                "kind": "youtube#searchResult",
+                "id": {"kind": "youtube#video", "videoId": gen.token()[:11]},
+                "snippet": {
+                    "title": gen.title(),
+                    "channelTitle": "Fixture Channel",
+                    "publishedAt": now,
+                },
+            }
+            for _ in range(count)
+        ],
+    }
+
+
+# a quarter of the export rows fall outside the collector's country filter
+GDELT_COUNTRY_CODES = ["IN", "IN", "PK", "CH", "BG", "NP", "US", "UK"]
+
+
+def gdelt_slot(now=None):
+    now = now or _now()
+    return now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0).strftime("%Y%m%d%H%M%S")
+
+
+def gdelt_lastupdate_body(base_url, slot):
+    prefix = f"{base_url}/gdeltv2/{slot}"
+    return "".join(
+        f"0 {hashlib.md5(name.encode()).hexdigest()} {prefix}.{name}\n"
+        for name in ("export.CSV.zip", "mentions.CSV.zip", "gkg.csv.zip")
+    )
+
+
+def gdelt_export_body(gen, count, slot):
+    rows = []
+
+    for _ in range(count):
+        fields = [""] * 61
+        code = gen.choice(GDELT_COUNTRY_CODES)
+
+        fields[0] = str(gen.getrandbits(40))
+        fields[1] = slot[:8]
+        fields[6] = "INDIA"
+        fields[16] = gen.title().split()[0].upper()
+        fields[26] = "190"
+        fields[28] = "19"
+        fields[29] = "4"
+        fields[30] = "-10.0"
+        fields[31] = "3"
+        fields[34] = "-4.2"
+        fields[51] = "4"
+        fields[52] = f"{gen.title()}, Jammu and Kashmir, India"
+        fields[53] = code
+        fields[56] = f"{gen.uniform(8, 35):.4f}"
+        fields[57] = f"{gen.uniform(68, 97):.4f}"
+        fields[59] = slot
+        fields[60] = f"https://fixture.example/gdelt-events/{gen.token()}"
+        rows.append("\t".join(fields))
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(f"{slot}.export.CSV", "\n".join(rows) + "\n")
+
+    return buffer.getvalue()
+
+
+def telegram_body(gen, count, channel, first_id):
+    now = _iso(_now())
+    return [
+        {"id": first_id + i, "channel": channel, "text": gen.title(), "date": now}
+        for i in range(count)
+    ]
+
+
+def rss_body(gen, count, path):
+    items = "".join(
+        "<item>"
+        f"<title>{escape(gen.title())}</title>"
+        f"<link>https://fixture.example{escape(path)}/{gen.token()}</link>"
+        f"<guid>{gen.token()}</guid>"
+        f"<pubDate>{format_datetime(_now())}</pubDate>"
+        "</item>"
+        for _ in range(count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0"><channel>'
+        f"<title>Fixture feed {escape(path)}</title>"
+        f"{items}"
+        "</channel></rss>"
+    )
+
+
+# -----------------------------------------------------
+# HTTP HANDLER
+# -----------------------------------------------------
+
+class FixtureHandler(BaseHTTPRequestHandler):
+
+    server_version = "OsnitFixture/1.0"
+    protocol_version = "HTTP/1.1"      # keep-alive, like the real hosts
+
+    def log_message(self, fmt, *args):
+        pass
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def do_GET(self):
+        self.server.count("requests")
+
+        parsed = urlparse(self.path)
+        path = parsed.path
+        query = parse_qs(parsed.query)
+
+        chance = self.server.random()
+
+        if chance < self.config.stall_rate:
+            self.server.count("stalled")
+            time.sleep(self.config.stall_seconds)
+
+        delay = self.config.latency + self.server.random() * self.config.jitter
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.config.stall_rate <= chance < self.config.stall_rate + self.config.error_rate:
+            self.server.count("errors")
+            return self._send(self.config.error_status, b'{"error": "injected"}', "application/json")
+
+        gen = self.server.generator
+        count = self.config.items
+
+        if path.startswith("/newsapi/"):
+            # past the first page, answer short so paging stops like the real API
+            page = int(query.get("page", ["1"])[0])
+            body = self._recorded("newsapi.json") or newsapi_body(gen, count if page == 1 else 0)
+            return self._json(body)
+
+        if path == "/gdeltv2/lastupdate.txt":
+            body = gdelt_lastupdate_body(self.server.base_url, gdelt_slot())
+            return self._send(200, body.encode("ascii"), "text/plain")
+
+        if path.startswith("/gdeltv2/") and path.endswith(".export.CSV.zip"):
+            slot = path.rsplit("/", 1)[-1][:14]
+            body = self._recorded("gdelt_export.zip") or gdelt_export_body(gen, count * 4, slot)
+            return self._send(200, body, "application/zip")
+
+        if path.startswith("/gdelt/"):
+            return self._json(self._recorded("gdelt.json") or gdelt_body(gen, count))
+
+        if path.endswith("/youtube/v3/search"):
+            return self._json(self._recorded("youtube.json") or youtube_body(gen, count))
+
+        if path.startswith("/telegram/"):
+            channel = path.rsplit("/", 1)[-1]
+            first_id = self.server.next_message_id(channel, count)
+            return self._json(self._recorded("telegram.json") or telegram_body(gen, count, channel, first_id))
+
+        if path.startswith("/rss/"):
+            return self._rss(path)
+
+        self._send(404, b'{"error": "no fixture for this path"}', "application/json")
+
+    # ── responses ──
+
+    def _recorded(self, name):
+        if not self.config.fixtures_dir:
+            return None
+
+        path = os.path.join(self.config.fixtures_dir, name)
+        if not os.path.exists(path):
+            return None
+
+        if name.endswith(".zip"):
+            with open(path, "rb") as f:
+                return f.read()
+
+        with open(path, encoding="utf-8") as f:
+            return f.read() if name.endswith(".xml") else json.load(f)
+
+    def _json(self, body):
+        self._send(200, json.dumps(body).encode("utf-8"), "application/json")
+
+    def _rss(self, path):
+        every = self.config.feed_change_every
+        version = int(time.time() // every) if every else self.server.next_version()
+        etag = '"%s"' % hashlib.sha1(f"{path}:{version}".encode()).hexdigest()[:16]
+
+        if self.headers.get("If-None-Match") == etag:
+            self.server.count("not_modified")
+            return self._send(304, b"", None, {"ETag": etag})
+
+        body = self._recorded("rss.xml") or rss_body(self.server.generator, self.config.items, path)
+        self._send(200, body.encode("utf-8"), "application/rss+xml", {"ETag": etag})
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+
+        if content_type:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+
+# -----------------------------------------------------
+# SERVER
+# -----------------------------------------------------
+
+class FixtureServer(ThreadingHTTPServer):
+    """Threaded fixture server; start() runs it on a daemon thread."""
+
+    daemon_threads = True
+
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        super().__init__((host, port), FixtureHandler)
+
+        self.config = config or FixtureConfig()
+        self.generator = ContentGenerator(self.config.duplicate_ratio, self.config.seed)
+
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._version = 0
+        self._message_ids = {}
+        self.counters = {"requests": 0, "errors": 0, "stalled": 0, "not_modified": 0}
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self):
+        with self._lock:
+            return self._random.random()
+
+    def next_version(self):
+        with self._lock:
+            self._version += 1
+            return self._version
+
+    def next_message_id(self, channel, count):
+        with self._lock:
+            first = self._message_ids.get(channel, 0) + 1
+            self._message_ids[channel] = first + count - 1
+            return first
+
+    def count(self, key):
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fixture-server", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def build_parser(add_help=True):
+    parser = argparse.ArgumentParser(description="Serve synthetic collector responses locally", add_help=add_help)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--stall-rate", type=float, default=0.0)
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument("--items", type=int, default=50, help="records per response")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    parser.add_argument("--feed-change-every", type=float, default=0,
+                        help="seconds an RSS feed keeps its ETag (0 = never 304)")
+    parser.add_argument("--fixtures", dest="fixtures_dir", help="directory of recorded responses")
+    parser.add_argument("--seed", type=int)
+    return parser
+
+
+def config_from_args(args):
+    return FixtureConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        items=args.items,
+        duplicate_ratio=args.duplicate_ratio,
+        feed_change_every=args.feed_change_every,
+        fixtures_dir=args.fixtures_dir,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    server = FixtureServer(config_from_args(args), args.host, args.port)
+    base = server.base_url
+
+    print(f"Fixture server on {base}")
+    print(f"  NEWS_API_URL={base}/newsapi/v2/everything")
+    print(f"  GDELT_DOC_URL={base}/gdelt/api/v2/doc/doc")
+    print(f"  GDELT_LASTUPDATE_URL={base}/gdeltv2/lastupdate.txt")
+    print(f"  YOUTUBE_API_URL={base}/")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
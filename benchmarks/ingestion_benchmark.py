@@ -0,0 +1,268 @@
+# benchmarks/ingestion_benchmark.py
+#
+# Drives run_ingestion against the local fixture server and reports
+# throughput and cycle latency:
+#
+#   python -m benchmarks.ingestion_benchmark --cycles 5 --items 100
+#   python -m benchmarks.ingestion_benchmark --latency 0.2 --error-rate 0.05 --max-p95 20
+#
+# Records are really written, and cursors / feed validators really move,
+# so point DB_NAME at a scratch database before running this.
+
+import time
+import asyncio
+import argparse
+import statistics
+from datetime import datetime
+
+from benchmarks.fixture_server import FixtureServer, config_from_args, build_parser
+
+
+# -----------------------------------------------------
+# POINT THE COLLECTORS AT THE FIXTURE SERVER
+# -----------------------------------------------------
+
+RSS_FEEDS_PER_COUNTRY = 2
+
+
+def _configure_collectors(base_url, feeds_per_country):
+    from ingestion.collectors import news, gdelt, gdelt_events, youtube, regional_rss
+
+    news.NEWS_API_URL = f"{base_url}/newsapi/v2/everything"
+    news.NEWS_API_KEY = news.NEWS_API_KEY or "fixture"
+
+    gdelt.GDELT_DOC_URL = f"{base_url}/gdelt/api/v2/doc/doc"
+    gdelt_events.LASTUPDATE_URL = f"{base_url}/gdeltv2/lastupdate.txt"
+
+    youtube.YOUTUBE_API_URL = f"{base_url}/"
+    youtube.YOUTUBE_API_KEY = youtube.YOUTUBE_API_KEY or "fixture"
+
+    regional_rss.REGIONAL_SOURCES = {
+        country: [
+            f"{base_url}/rss/{country.replace(' ', '-').lower()}/{n}.xml"
+            for n in range(feeds_per_country)
+        ]
+        for country in regional_rss.REGIONAL_SOURCES
+    }
+
+
+def _telegram_stand_in(base_url):
+    """
+    Same record shape and keyword filter as the Telegram collector, read
+    from the fixture server over HTTP instead of MTProto.
+    """
+    from ingestion.fetcher import fetch
+    from ingestion.collectors.telegram import CHANNELS, KEYWORD_MATCHER
+
+    async def iter_telegram_fixture():
+        responses = await asyncio.gather(*(
+            asyncio.to_thread(fetch, f"{base_url}/telegram/{channel}")
+            for channel in CHANNELS
+        ))
+
+        for channel, response in zip(CHANNELS, responses):
+            if not response.ok:
+                continue
+
+            for message in response.json():
+                matched = KEYWORD_MATCHER.find_all(message["text"])
+
+                if matched:
+                    yield {
+                        "source": f"telegram_{channel}",
+                        "content": message["text"],
+                        "url": None,
+                        "country": "external",
+                        "metadata": {
+                            "channel": channel,
+                            "message_id": message["id"],
+                            "date": message["date"],
+                            "matched_keywords": matched
+                        },
+                        "raw": message
+                    }
+
+    return iter_telegram_fixture
+
+
+# -----------------------------------------------------
+# BENCHMARK
+# -----------------------------------------------------
+
+def _counted(name, func, counts):
+    """Wrap a source so every record it yields is counted."""
+    from ingestion.streaming import Checkpoint
+
+    def count(record):
+        if not isinstance(record, Checkpoint):
+            counts[name] = counts.get(name, 0) + 1
+
+    def wrapper():
+        records = func()
+
+        if hasattr(records, "__aiter__"):
+            async def counting():
+                async for record in records:
+                    count(record)
+                    yield record
+            return counting()
+
+        def counting():
+            for record in records:
+                count(record)
+                yield record
+        return counting()
+
+    return wrapper
+
+
+def _percentile(values, p):
+    ordered = sorted(values)
+    index = min(int(round(p / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def _source_breakdown(since):
+    from sqlalchemy import func
+    from database import SessionLocal
+    from models import IngestionLog
+
+    db = SessionLocal()
+    try:
+        return db.query(
+            IngestionLog.source,
+            func.count(IngestionLog.id),
+            func.sum(IngestionLog.records_fetched),
+            func.sum(IngestionLog.records_inserted),
+            func.avg(IngestionLog.duration_seconds),
+            func.max(IngestionLog.duration_seconds),
+        ).filter(
+            IngestionLog.run_time >= since
+        ).group_by(IngestionLog.source).order_by(IngestionLog.source).all()
+    finally:
+        db.close()
+
+
+def run_benchmark(config, cycles=5, concurrent=True, feeds_per_country=RSS_FEEDS_PER_COUNTRY,
+                  archive=False, port=0):
+
+    from ingestion import archive as archive_module
+    from ingestion.registry import get_sources
+    from ingestion.runner import run_ingestion
+
+    archive_module.ARCHIVE_ENABLED = archive
+
+    server = FixtureServer(config, port=port)
+    base_url = server.start()
+
+    _configure_collectors(base_url, feeds_per_country)
+
+    sources = {name: spec.load() for name, spec in get_sources().items()}
+    if "telegram" in sources:
+        sources["telegram"] = _telegram_stand_in(base_url)
+
+    counts = {}
+    sources = {name: _counted(name, func, counts) for name, func in sources.items()}
+
+    started_at = datetime.now()
+    cycle_seconds = []
+    fetched = 0
+    inserted = 0
+
+    try:
+        for cycle in range(1, cycles + 1):
+            counts.clear()
+
+            started = time.monotonic()
+            cycle_inserted = run_ingestion(concurrent=concurrent, sources=sources)
+            elapsed = time.monotonic() - started
+
+            cycle_fetched = sum(counts.values())
+            cycle_seconds.append(elapsed)
+            fetched += cycle_fetched
+            inserted += cycle_inserted
+
+            print(
+                f"cycle {cycle:>3}: {elapsed:>7.2f}s | "
+                f"{cycle_fetched:>6} fetched | {cycle_inserted:>6} inserted | "
+                f"{cycle_fetched / max(elapsed, 1e-6):>8.1f} rec/s"
+            )
+
+    finally:
+        server.stop()
+
+    total = sum(cycle_seconds)
+
+    return {
+        "cycles": cycles,
+        "fetched": fetched,
+        "inserted": inserted,
+        "fetched_per_sec": round(fetched / max(total, 1e-6), 1),
+        "inserted_per_sec": round(inserted / max(total, 1e-6), 1),
+        "cycle_p50": round(statistics.median(cycle_seconds), 3),
+        "cycle_p95": round(_percentile(cycle_seconds, 95), 3),
+        "cycle_max": round(max(cycle_seconds), 3),
+        "server": dict(server.counters),
+        "started_at": started_at,
+    }
+
+
+def _print_report(result):
+    print()
+    print(f"cycles          {result['cycles']}")
+    print(f"fetched         {result['fetched']:,}  ({result['fetched_per_sec']} rec/s)")
+    print(f"inserted        {result['inserted']:,}  ({result['inserted_per_sec']} rec/s)")
+    print(f"cycle latency   p50 {result['cycle_p50']}s | p95 {result['cycle_p95']}s | max {result['cycle_max']}s")
+    print(f"fixture server  {result['server']}")
+
+    try:
+        rows = _source_breakdown(result["started_at"])
+    except Exception as e:
+        print("per-source breakdown unavailable:", e)
+        return
+
+    print()
+    print(f"{'source':<16}{'runs':>6}{'fetched':>10}{'inserted':>10}{'avg s':>9}{'max s':>9}")
+    for source, runs, src_fetched, src_inserted, avg_s, max_s in rows:
+        print(
+            f"{source:<16}{runs:>6}{src_fetched or 0:>10}{src_inserted or 0:>10}"
+            f"{avg_s or 0:>9.2f}{max_s or 0:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark run_ingestion against the local fixture server",
+        parents=[build_parser(add_help=False)],
+        conflict_handler="resolve"
+    )
+    parser.add_argument("--port", type=int, default=0, help="fixture server port (default: any free port)")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--sequential", action="store_true", help="use the sequential runner")
+    parser.add_argument("--feeds-per-country", type=int, default=RSS_FEEDS_PER_COUNTRY)
+    parser.add_argument("--archive", action="store_true", help="keep the raw payload archive on")
+    parser.add_argument("--min-rate", type=float, help="fail if fetched rec/s falls below this")
+    parser.add_argument("--max-p95", type=float, help="fail if p95 cycle latency (s) exceeds this")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        config_from_args(args),
+        cycles=args.cycles,
+        concurrent=not args.sequential,
+        feeds_per_country=args.feeds_per_country,
+        archive=args.archive,
+        port=args.port,
+    )
+
+    _print_report(result)
+
+    failures = []
+    if args.min_rate is not None and result["fetched_per_sec"] < args.min_rate:
+        failures.append(f"throughput {result['fetched_per_sec']} rec/s < {args.min_rate}")
+    if args.max_p95 is not None and result["cycle_p95"] > args.max_p95:
+        failures.append(f"p95 cycle latency {result['cycle_p95']}s > {args.max_p95}s")
+
+    if failures:
+        print()
+        print("REGRESSION:", "; ".join(failures))
+        raise SystemExit(1)
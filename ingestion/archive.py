@@ -0,0 +1,280 @@
+# ingestion/archive.py
+
+import os
+import gzip
+import json
+import asyncio
+import argparse
+import threading
+from datetime import datetime, timezone
+
+from ingestion.streaming import Checkpoint, stream_records
+
+
+# -----------------------------------------------------
+# ARCHIVE SETTINGS
+# -----------------------------------------------------
+# Layout:
+#   ARCHIVE_DIR/<source>/<YYYYMMDD>/<source>-<YYYYMMDDTHHMMSSffffffZ>-<seq>.ndjson.gz
+#       (UTC open time; every run opens its own writer, so segments are
+#        never reopened, and an existing file is never overwritten)
+#   ARCHIVE_DIR/index.jsonl  - one line per closed segment:
+#       {"source", "path", "first_ts", "last_ts", "count", "bytes"}
+
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
+
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024     # uncompressed bytes before rotating within a run
+
+INDEX_FILE = "index.jsonl"
+
+_index_lock = threading.Lock()
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+# -----------------------------------------------------
+# WRITER
+# -----------------------------------------------------
+
+class ArchiveWriter:
+    """
+    Append-only, gzip-compressed NDJSON writer for one source. Every
+    collected record (including its "raw" upstream payload) becomes one
+    line. One writer covers one collector run: its segment is closed
+    (and added to the index) when the run ends, or earlier once it
+    reaches SEGMENT_MAX_BYTES.
+    """
+
+    def __init__(self, source, root=ARCHIVE_DIR):
+        self.source = source
+        self.root = root
+        self._lock = threading.Lock()
+        self._file = None
+        self._seq = 0
+
+    def _open(self):
+        opened = _now()
+        folder = os.path.join(self.root, self.source, opened.strftime("%Y%m%d"))
+        os.makedirs(folder, exist_ok=True)
+
+        stamp = opened.strftime("%Y%m%dT%H%M%S%fZ")
+
+        # "x": a name already taken (a concurrent run) moves on to the next seq
+        while self._file is None:
+            self._seq += 1
+            self._path = os.path.join(folder, f"{self.source}-{stamp}-{self._seq:04d}.ndjson.gz")
+            try:
+                self._file = gzip.open(self._path, "xt", encoding="utf-8")
+            except FileExistsError:
+                continue
+
+        self._first_ts = None
+        self._last_ts = None
+        self._count = 0
+        self._bytes = 0
+
+    def write(self, record):
+        ts = _now().isoformat()
+        line = json.dumps({"ts": ts, "record": record}, default=str, ensure_ascii=False) + "\n"
+
+        with self._lock:
+            if self._file is None:
+                self._open()
+
+            self._file.write(line)
+            self._first_ts = self._first_ts or ts
+            self._last_ts = ts
+            self._count += 1
+            self._bytes += len(line)
+
+            if self._bytes >= SEGMENT_MAX_BYTES:
+                self._close()
+
+    def _close(self):
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+
+        if not self._count:
+            os.remove(self._path)
+            return
+
+        entry = {
+            "source": self.source,
+            "path": os.path.relpath(self._path, self.root),
+            "first_ts": self._first_ts,
+            "last_ts": self._last_ts,
+            "count": self._count,
+            "bytes": self._bytes
+        }
+
+        with _index_lock:
+            with open(os.path.join(self.root, INDEX_FILE), "a", encoding="utf-8") as index:
+                index.write(json.dumps(entry) + "\n")
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+
+def archived(records, writer):
+    """Pass records through unchanged, archiving each one on the way."""
+    try:
+        for record in records:
+            if not isinstance(record, Checkpoint):
+                writer.write(record)
+            yield record
+    finally:
+        writer.close()
+
+
+async def archived_async(records, writer):
+    # runs on the shared ingestion loop: gzip compression and segment
+    # rotation go to a worker thread (one write at a time, in order)
+    try:
+        async for record in records:
+            if not isinstance(record, Checkpoint):
+                await asyncio.to_thread(writer.write, record)
+            yield record
+    finally:
+        await asyncio.to_thread(writer.close)
+
+
+def archive_stream(records, source):
+    """Wrap a collector's iterator (sync or async) with an ArchiveWriter."""
+    if not ARCHIVE_ENABLED:
+        return records
+
+    writer = ArchiveWriter(source)
+
+    if hasattr(records, "__aiter__"):
+        return archived_async(records, writer)
+
+    return archived(records, writer)
+
+
+# -----------------------------------------------------
+# READER / REPLAY
+# -----------------------------------------------------
+
+def iter_segments(source=None, since=None, until=None, root=ARCHIVE_DIR):
+    """Index entries overlapping [since, until] (ISO timestamps), oldest first."""
+    path = os.path.join(root, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+
+    segments = []
+
+    with open(path, encoding="utf-8") as index:
+        for line in index:
+            entry = json.loads(line)
+
+            if source and entry["source"] != source:
+                continue
+            if since and entry["last_ts"] < since:
+                continue
+            if until and entry["first_ts"] > until:
+                continue
+
+            segments.append(entry)
+
+    return sorted(segments, key=lambda e: e["first_ts"])
+
+
+def iter_archived(source=None, since=None, until=None, root=ARCHIVE_DIR):
+    """Stream archived records back, segment by segment."""
+    for entry in iter_segments(source, since, until, root):
+
+        with gzip.open(os.path.join(root, entry["path"]), "rt", encoding="utf-8") as segment:
+            for line in segment:
+                item = json.loads(line)
+
+                if since and item["ts"] < since:
+                    continue
+                if until and item["ts"] > until:
+                    continue
+
+                yield item["record"]
+
+
+def replay(source=None, since=None, until=None, target="insert"):
+    """
+    Push archived records back through ingestion without calling any
+    upstream API.
+
+    target="insert"   - stream into insert_records (dedup drops known rows)
+    target="pipeline" - re-run the AI pipeline on the stored rows they map to
+    """
+    records = iter_archived(source, since, until)
+
+    if target == "insert":
+        stats = stream_records(records)
+        return {"fetched": stats.fetched, "inserted": stats.inserted}
+
+    if target == "pipeline":
+        return _replay_pipeline(records)
+
+    raise ValueError(f"unknown replay target: {target}")
+
+
+def _replay_pipeline(records, batch_size=500):
+    from database import SessionLocal
+    from models import RawOSINT
+    from ingestion.utils import generate_hash
+    from ai_engine.pipeline import process_records
+
+    totals = {"fetched": 0, "processed_count": 0, "failed_count": 0}
+    hashes = []
+
+    def flush():
+        db = SessionLocal()
+        try:
+            ids = [
+                record_id for (record_id,) in db.query(RawOSINT.id).filter(
+                    RawOSINT.content_hash.in_(hashes)
+                )
+            ]
+        finally:
+            db.close()
+
+        if ids:
+            result = process_records(ids, include_processed=True)
+            totals["processed_count"] += result["processed_count"]
+            totals["failed_count"] += result["failed_count"]
+
+        hashes.clear()
+
+    for record in records:
+        totals["fetched"] += 1
+
+        if record.get("content"):
+            hashes.append(generate_hash(record["content"]))
+
+        if len(hashes) >= batch_size:
+            flush()
+
+    if hashes:
+        flush()
+
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay archived collector payloads")
+    parser.add_argument("command", choices=["replay", "list"])
+    parser.add_argument("--source")
+    parser.add_argument("--since", help="ISO timestamp, e.g. 2024-05-01T00:00:00")
+    parser.add_argument("--until", help="ISO timestamp")
+    parser.add_argument("--target", choices=["insert", "pipeline"], default="insert")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for entry in iter_segments(args.source, args.since, args.until):
+            print(f"{entry['first_ts']}  {entry['source']:<14} {entry['count']:>7}  {entry['path']}")
+    else:
+        print(replay(args.source, args.since, args.until, args.target))
@@ -0,0 +1,271 @@
+# ingestion/backfill.py
+#
+# Bulk loader for historical dumps:
+#
+#   python -m ingestion.backfill dump.ndjson --source archive_2023
+#   python -m ingestion.backfill dump.csv --workers 8 --chunk-size 100000
+#
+# Each chunk is hashed in worker processes, COPY'd into a temporary
+# staging table and merged into raw_osint with one set-based
+# INSERT ... SELECT DISTINCT ON ... ON CONFLICT DO NOTHING, which skips
+# rows clashing on either content_hash or canonical_url. A checkpoint
+# file is written after every merged chunk; re-running the same command
+# resumes after the last merged record.
+
+import io
+import os
+import csv
+import gzip
+import json
+import time
+import argparse
+from itertools import islice
+from multiprocessing import Pool
+
+from database import engine
+from ingestion.urls import canonicalize_url
+from ingestion.utils import generate_hash
+
+
+# -----------------------------------------------------
+# SETTINGS
+# -----------------------------------------------------
+
+CHUNK_SIZE = 50_000        # records per COPY + merge + checkpoint
+WORKER_BATCH = 2_000       # records per task handed to a worker process
+
+STAGING_TABLE = "raw_osint_staging"
+
+STAGING_COLUMNS = [
+    "source", "content", "url", "canonical_url", "country", "state",
+    "geo_lat", "geo_lon", "metadata", "content_hash"
+]
+
+# created inside each chunk's transaction and dropped by its commit:
+# private to the connection, so concurrent backfills never share it, and
+# never left behind without newer columns
+CREATE_STAGING = f"""
+    CREATE TEMP TABLE {STAGING_TABLE} (
+        source        TEXT,
+        content       TEXT,
+        url           TEXT,
+        canonical_url TEXT,
+        country       TEXT,
+        state         TEXT,
+        geo_lat       DOUBLE PRECISION,
+        geo_lon       DOUBLE PRECISION,
+        metadata      JSON,
+        content_hash  TEXT
+    ) ON COMMIT DROP
+"""
+
+MERGE_STAGING = f"""
+    INSERT INTO raw_osint ({', '.join(STAGING_COLUMNS)}, processed)
+    SELECT DISTINCT ON (content_hash)
+           {', '.join(STAGING_COLUMNS)}, FALSE
+    FROM {STAGING_TABLE}
+    ORDER BY content_hash
+    ON CONFLICT DO NOTHING
+"""
+
+
+# -----------------------------------------------------
+# READING (main process)
+# -----------------------------------------------------
+
+def _detect_format(path):
+    return "csv" if path.lower().endswith((".csv", ".csv.gz")) else "ndjson"
+
+
+def _open(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+
+    return open(path, encoding="utf-8", newline="")
+
+
+def _iter_items(handle, fmt):
+    # NDJSON lines are parsed in the workers; CSV has to be split here
+    # because quoted fields may span lines
+    if fmt == "csv":
+        yield from csv.DictReader(handle)
+    else:
+        for line in handle:
+            if line.strip():
+                yield line
+
+
+# -----------------------------------------------------
+# HASHING (worker processes)
+# -----------------------------------------------------
+
+def _coordinate(value):
+    # CSV gives strings (empty for missing); COPY must not see junk
+    try:
+        return float(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _prepare_batch(args):
+    items, fmt, default_source = args
+    rows = []
+
+    for item in items:
+        try:
+            record = json.loads(item) if fmt == "ndjson" else item
+        except ValueError:
+            continue
+
+        content = record.get("content")
+        if not content:
+            continue
+
+        metadata = record.get("metadata")
+        if metadata is not None and not isinstance(metadata, str):
+            metadata = json.dumps(metadata, default=str)
+
+        rows.append((
+            record.get("source") or default_source,
+            content,
+            record.get("url"),
+            canonicalize_url(record.get("url")),
+            record.get("country"),
+            record.get("state"),
+            _coordinate(record.get("geo_lat")),
+            _coordinate(record.get("geo_lon")),
+            metadata,
+            generate_hash(content)
+        ))
+
+    return rows
+
+
+# -----------------------------------------------------
+# COPY + MERGE (one transaction per chunk)
+# -----------------------------------------------------
+
+def _copy_and_merge(conn, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in rows:
+        # COPY csv reads an unquoted empty field as NULL
+        writer.writerow(["" if value is None else value for value in row])
+
+    buffer.seek(0)
+
+    with conn.cursor() as cur:
+        cur.execute(CREATE_STAGING)
+        cur.copy_expert(
+            f"COPY {STAGING_TABLE} ({', '.join(STAGING_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+        cur.execute(MERGE_STAGING)
+        inserted = cur.rowcount
+
+    # also drops the staging table
+    conn.commit()
+    return inserted
+
+
+# -----------------------------------------------------
+# CHECKPOINTS
+# -----------------------------------------------------
+
+def _checkpoint_path(path):
+    return f"{path}.checkpoint.json"
+
+
+def _load_checkpoint(path):
+    try:
+        with open(_checkpoint_path(path), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"records_done": 0, "inserted": 0}
+
+
+def _save_checkpoint(path, state):
+    tmp = _checkpoint_path(path) + ".tmp"
+
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+    os.replace(tmp, _checkpoint_path(path))
+
+
+# -----------------------------------------------------
+# LOADER
+# -----------------------------------------------------
+
+def _batches(items, size):
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def backfill(path, source="backfill", workers=None, chunk_size=CHUNK_SIZE, restart=False):
+
+    fmt = _detect_format(path)
+    state = {"records_done": 0, "inserted": 0} if restart else _load_checkpoint(path)
+
+    conn = engine.raw_connection()
+    started = time.monotonic()
+    read_this_run = 0
+
+    try:
+        with _open(path) as handle, Pool(processes=workers) as pool:
+
+            items = _iter_items(handle, fmt)
+
+            if state["records_done"]:
+                print(f"Resuming after {state['records_done']} records")
+                for _ in islice(items, state["records_done"]):
+                    pass
+
+            for chunk in _batches(items, chunk_size):
+
+                tasks = [(batch, fmt, source) for batch in _batches(iter(chunk), WORKER_BATCH)]
+
+                rows = []
+                for prepared in pool.imap(_prepare_batch, tasks):
+                    rows.extend(prepared)
+
+                inserted = _copy_and_merge(conn, rows) if rows else 0
+
+                state["records_done"] += len(chunk)
+                state["inserted"] += inserted
+                _save_checkpoint(path, state)
+
+                read_this_run += len(chunk)
+                rate = read_this_run / max(time.monotonic() - started, 1e-6)
+
+                print(
+                    f"{state['records_done']:>12,} read | "
+                    f"{state['inserted']:>12,} inserted | "
+                    f"{rate:>10,.0f} rec/s"
+                )
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        conn.close()
+
+    return state
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-load historical OSINT dumps into raw_osint")
+    parser.add_argument("path", help="NDJSON or CSV file (optionally .gz)")
+    parser.add_argument("--source", default="backfill", help="source for records that don't carry one")
+    parser.add_argument("--workers", type=int, default=None, help="hashing processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    result = backfill(args.path, args.source, args.workers, args.chunk_size, args.restart)
+    print(f"Done: {result['records_done']:,} read, {result['inserted']:,} inserted")
@@ -1,46 +1,103 @@
 # ingestion/collectors/gdelt.py
 
-import requests
-import urllib.parse
+import os
+from functools import partial
+from datetime import datetime, timedelta, timezone
 
-def collect_gdelt():
-    records = []
+from ingestion.fetcher import fetch
+from ingestion.cursors import load_cursors, save_cursors
+from ingestion.streaming import Checkpoint, records_only
+from ingestion.telemetry import timed
 
-    query = "India"
-    encoded_query = urllib.parse.quote(query)
+GDELT_DOC_URL = os.getenv("GDELT_DOC_URL", "https://api.gdeltproject.org/api/v2/doc/doc")
 
-    url = (
-        "https://api.gdeltproject.org/api/v2/doc/doc?"
-        f"query={encoded_query}"
-        "&mode=ArtList"
-        "&maxrecords=20"
-        "&format=json"
-    )
+CURSOR_SOURCE = "gdelt"
 
-    try:
-        response = requests.get(url, timeout=30)
+PAGE_SIZE = 250           # DOC API maximum
+MAX_PAGES = 10
+FIRST_RUN_WINDOW = timedelta(hours=1)
+
+
+def _fetch_page(start):
+
+    params = {
+        "query": "India",
+        "mode": "ArtList",
+        "maxrecords": PAGE_SIZE,
+        "format": "json",
+        "sort": "DateAsc",
+        "startdatetime": start
+    }
+
+    response = fetch(GDELT_DOC_URL, params=params, timeout=30, source=CURSOR_SOURCE)
 
-        if response.status_code != 200:
-            print("GDELT HTTP error:", response.status_code)
-            return []
+    if response.error:
+        print("GDELT failed:", response.error)
+        return None
 
-        data = response.json()
+    if response.status != 200:
+        print("GDELT HTTP error:", response.status)
+        return None
+
+    try:
+        with timed("parse"):
+            return response.json().get("articles", [])
 
     except Exception as e:
         print("GDELT failed:", str(e))
-        return []
-
-    for article in data.get("articles", []):
-        records.append({
-            "source": "gdelt",
-            "content": article.get("title"),
-            "url": article.get("url"),
-            "country": article.get("sourceCountry"),
-            "metadata": {
-                "domain": article.get("domain"),
-                "language": article.get("language"),
-                "tone": article.get("tone")
+        return None
+
+
+def _to_gdelt_time(seendate):
+    # seendate looks like 20240101T121500Z, startdatetime wants 20240101121500
+    return seendate.replace("T", "").replace("Z", "")
+
+
+def iter_gdelt():
+
+    # seendate of the newest article the previous run read
+    start = load_cursors(CURSOR_SOURCE).get("startdatetime")
+
+    if not start:
+        first = datetime.now(timezone.utc) - FIRST_RUN_WINDOW
+        start = first.strftime("%Y%m%d%H%M%S")
+
+    # oldest first: page forward from the cursor until a short page
+    for _ in range(MAX_PAGES):
+
+        articles = _fetch_page(start)
+        if not articles:
+            break
+
+        for article in articles:
+            yield {
+                "source": "gdelt",
+                "content": article.get("title"),
+                "url": article.get("url"),
+                "country": article.get("sourceCountry"),
+                "metadata": {
+                    "domain": article.get("domain"),
+                    "language": article.get("language"),
+                    "tone": article.get("tone"),
+                    "seendate": article.get("seendate")
+                },
+                "raw": article
             }
-        })
 
-    return records
+        last_seen = articles[-1].get("seendate")
+        next_start = _to_gdelt_time(last_seen) if last_seen else start
+
+        # oldest first, so the page's last seendate is a gap-free cursor;
+        # the writer saves it once the page has been committed
+        if next_start != start:
+            yield Checkpoint(partial(save_cursors, CURSOR_SOURCE, {"startdatetime": next_start}))
+
+        # the window boundary is inclusive; repeats are dropped by content_hash
+        if len(articles) < PAGE_SIZE or next_start == start:
+            break
+
+        start = next_start
+
+
+def collect_gdelt():
+    return records_only(iter_gdelt())
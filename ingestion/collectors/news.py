@@ -1,11 +1,17 @@
-import requests
 import os
+from functools import partial
 from dotenv import load_dotenv
 
+from ingestion.fetcher import fetch
+from ingestion.cursors import load_cursors, save_cursors
+from ingestion.streaming import Checkpoint, records_only
+from ingestion.telemetry import timed
+
 load_dotenv()
 
 
 NEWS_API_KEY = os.getenv("NEWS_API_KEY")
+NEWS_API_URL = os.getenv("NEWS_API_URL", "https://newsapi.org/v2/everything")
 
 INDIA_KEYWORDS = (
     "India OR Kashmir OR LOC OR border OR military "
@@ -13,43 +19,108 @@ INDIA_KEYWORDS = (
 )
 
 
-def collect_news():
-    records = []
+CURSOR_SOURCE = "newsapi"
+
+PAGE_SIZE = 100
+
+# NewsAPI caps how deep an account can page: 100 results on the developer
+# plan, where asking for page 2 is an error that still spends quota
+MAX_RESULTS = int(os.getenv("NEWSAPI_MAX_RESULTS", "100"))
+MAX_PAGES = max(MAX_RESULTS // PAGE_SIZE, 1)
 
-    url = "https://newsapi.org/v2/everything"
+
+def _fetch_page(page, since):
 
     params = {
         "q": INDIA_KEYWORDS,
         "language": "en",
         "sortBy": "publishedAt",
-        "pageSize": 30,
+        "pageSize": PAGE_SIZE,
+        "page": page,
+        "from": since,
         "apiKey": NEWS_API_KEY
     }
 
-    try:
-        response = requests.get(url, params=params, timeout=15)
+    response = fetch(NEWS_API_URL, params=params, timeout=15, source=CURSOR_SOURCE)
 
-        if response.status_code != 200:
-            print("NewsAPI error:", response.text)
-            return []
+    if response.error:
+        print("NewsAPI failed:", response.error)
+        return None
 
-        data = response.json()
+    if response.status != 200:
+        print("NewsAPI error:", response.text)
+        return None
+
+    try:
+        with timed("parse"):
+            return response.json().get("articles", [])
 
     except Exception as e:
         print("NewsAPI failed:", e)
-        return []
-
-    for article in data.get("articles", []):
-        records.append({
-            "source": "newsapi",
-            "content": article.get("title"),
-            "url": article.get("url"),
-            "country": "India",
-            "metadata": {
-                "author": article.get("author"),
-                "published_at": article.get("publishedAt"),
-                "source_name": article.get("source", {}).get("name")
+        return None
+
+
+def iter_news():
+
+    # publishedAt high-water mark of the previous run (ISO-8601, UTC)
+    since = load_cursors(CURSOR_SOURCE).get("published_at")
+    newest = since
+
+    # newest first: page back until we cross the previous high-water mark,
+    # run out of results, or hit the plan's paging cap
+    failed = False
+
+    for page in range(1, MAX_PAGES + 1):
+
+        articles = _fetch_page(page, since)
+        if articles is None:
+            failed = True
+            break
+
+        reached_cursor = not since
+
+        for article in articles:
+            published_at = article.get("publishedAt")
+
+            # "from" is inclusive; boundary repeats are dropped by content_hash
+            if since and published_at and published_at < since:
+                reached_cursor = True
+                continue
+
+            if published_at and (newest is None or published_at > newest):
+                newest = published_at
+
+            yield {
+                "source": "newsapi",
+                "content": article.get("title"),
+                "url": article.get("url"),
+                "country": "India",
+                "metadata": {
+                    "author": article.get("author"),
+                    "published_at": published_at,
+                    "source_name": article.get("source", {}).get("name")
+                },
+                "raw": article
             }
-        })
 
-    return records
+        if reached_cursor or len(articles) < PAGE_SIZE:
+            break
+
+    else:
+        # more new articles than the plan lets us page through: the older
+        # ones are out of reach anyway, so the cursor moves on rather than
+        # every run spending its quota on the same pages
+        print(f"NewsAPI: more than {MAX_RESULTS} articles since {since}, older ones skipped")
+
+    # a failed page leaves older articles unfetched: keep the old cursor
+    # so the next run pages back over them (repeats dedup by content_hash)
+    if failed:
+        return
+
+    # saved by the writer once everything above has been committed
+    if newest and newest != since:
+        yield Checkpoint(partial(save_cursors, CURSOR_SOURCE, {"published_at": newest}))
+
+
+def collect_news():
+    return records_only(iter_news())
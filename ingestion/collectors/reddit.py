@@ -1,12 +1,11 @@
 import praw
 import os
 from dotenv import load_dotenv
-from ingestion.utils import insert_record
 import logging
 
 load_dotenv()
 
-def collect_reddit():
+def iter_reddit():
     logging.info("Starting Reddit ingestion...")
 
     reddit = praw.Reddit(
@@ -15,20 +14,26 @@ def collect_reddit():
         user_agent=os.getenv("REDDIT_USER_AGENT")
     )
 
-    inserted = 0
-
+    # praw blocks; the registry drives this generator from a worker thread
     for post in reddit.subreddit("worldnews").new(limit=20):
-        success = insert_record(
-            source="reddit",
-            content=post.title,
-            url=post.url,
-            metadata={
+        yield {
+            "source": "reddit",
+            "content": post.title,
+            "url": post.url,
+            "metadata": {
                 "subreddit": post.subreddit.display_name,
                 "score": post.score
+            },
+            "raw": {
+                "id": post.id,
+                "title": post.title,
+                "url": post.url,
+                "permalink": post.permalink,
+                "created_utc": post.created_utc,
+                "score": post.score
             }
-        )
+        }
 
-        if success:
-            inserted += 1
 
-    logging.info(f"Reddit inserted: {inserted}")
+def collect_reddit():
+    return list(iter_reddit())
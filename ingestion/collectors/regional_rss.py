@@ -1,6 +1,11 @@
 
 import feedparser
-import requests
+
+from ingestion.fetcher import fetch_many
+from ingestion.feed_cache import FeedCache
+from ingestion.streaming import Checkpoint, records_only
+from ingestion.matcher import KeywordMatcher
+from ingestion.telemetry import timed
 
 REGIONAL_SOURCES = {
     "Pakistan": [
@@ -28,37 +33,62 @@ KEYWORDS = [
     "army"
 ]
 
+# compiled once; substring semantics as before ("India" also hits "Indian")
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
 
-def collect_regional_rss():
 
-    records = []
+def iter_regional_rss():
+
+    feeds = [
+        (country, feed_url)
+        for country, urls in REGIONAL_SOURCES.items()
+        for feed_url in urls
+    ]
+
+    urls = [feed_url for _, feed_url in feeds]
+    cache = FeedCache(urls)
 
-    for country, feeds in REGIONAL_SOURCES.items():
+    responses = fetch_many(urls, timeout=8, headers_by_url=cache.headers_by_url(urls), source="regional_rss")
 
-        for feed_url in feeds:
+    for (country, feed_url), response in zip(feeds, responses):
 
-            try:
-                response = requests.get(feed_url, timeout=8)
+        # 304 Not Modified -> nothing new, skip parsing entirely
+        if not response.ok:
+            continue
+
+        try:
+            with timed("parse"):
                 feed = feedparser.parse(response.content)
 
-            except Exception:
-                continue
+        except Exception:
+            continue
+
+        cache.update(feed_url, response)
+
+        for entry in cache.unseen(feed_url, feed.entries[:15]):
 
-            for entry in feed.entries[:15]:
+            title = entry.get("title", "")
+            matched = KEYWORD_MATCHER.find_all(title)
 
-                title = entry.get("title", "")
+            if matched:
 
-                if any(keyword.lower() in title.lower() for keyword in KEYWORDS):
+                yield {
+                    "source": "regional_rss",
+                    "content": title,
+                    "url": entry.get("link"),
+                    "country": country,
+                    "metadata": {
+                        "feed_url": feed_url,
+                        "published": entry.get("published"),
+                        "matched_keywords": matched
+                    },
+                    "raw": dict(entry)
+                }
 
-                    records.append({
-                        "source": "regional_rss",
-                        "content": title,
-                        "url": entry.get("link"),
-                        "country": country,
-                        "metadata": {
-                            "feed_url": feed_url,
-                            "published": entry.get("published")
-                        }
-                    })
+    # seen GUIDs and validators are saved only once the entries above
+    # are committed, or a failed insert would hide them for good
+    yield Checkpoint(cache.save)
 
-    return records
+
+def collect_regional_rss():
+    return records_only(iter_regional_rss())
@@ -1,37 +1,55 @@
 import feedparser
 import logging
-from ingestion.utils import insert_record
+
+from ingestion.fetcher import fetch_many
+from ingestion.feed_cache import FeedCache
+from ingestion.streaming import Checkpoint, records_only
+from ingestion.telemetry import timed
 
 RSS_FEEDS = [
     "https://feeds.bbci.co.uk/news/world/rss.xml",
     "https://rss.nytimes.com/services/xml/rss/nyt/World.xml"
 ]
 
-def collect_rss():
+def iter_rss():
     logging.info("Starting RSS ingestion...")
 
-    inserted = 0
+    cache = FeedCache(RSS_FEEDS)
+    responses = fetch_many(RSS_FEEDS, headers_by_url=cache.headers_by_url(RSS_FEEDS), source="rss")
+
+    for feed_url, response in zip(RSS_FEEDS, responses):
+        if response.status == 304:
+            continue
 
-    for feed_url in RSS_FEEDS:
-        feed = feedparser.parse(feed_url)
+        if not response.ok:
+            logging.warning(f"RSS fetch failed for {feed_url}: {response.error or response.status}")
+            continue
 
-        for entry in feed.entries:
+        with timed("parse"):
+            feed = feedparser.parse(response.content)
+        cache.update(feed_url, response)
+
+        for entry in cache.unseen(feed_url, feed.entries):
             content = entry.get("summary") or entry.get("title")
 
             if not content:
                 continue
 
-            success = insert_record(
-                source="rss",
-                content=content,
-                url=entry.get("link"),
-                metadata={
+            yield {
+                "source": "rss",
+                "content": content,
+                "url": entry.get("link"),
+                "metadata": {
                     "feed_source": feed.feed.get("title"),
                     "published": entry.get("published")
-                }
-            )
+                },
+                "raw": dict(entry)
+            }
+
+    # seen GUIDs and validators are saved only once the entries above
+    # are committed, or a failed insert would hide them for good
+    yield Checkpoint(cache.save)
 
-            if success:
-                inserted += 1
 
-    logging.info(f"RSS inserted: {inserted}")
+def collect_rss():
+    return records_only(iter_rss())
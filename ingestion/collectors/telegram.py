@@ -2,9 +2,16 @@
 
 import os
 import asyncio
+from functools import partial
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from dotenv import load_dotenv
 
+from ingestion.cursors import load_cursors, save_cursors
+from ingestion.matcher import KeywordMatcher
+from ingestion.resilience import get_guard
+from ingestion.streaming import Checkpoint, records_only
+
 load_dotenv()
 
 API_ID = os.getenv("TELEGRAM_API_ID")
@@ -27,34 +34,132 @@ KEYWORDS = [
     "military"
 ]
 
-async def collect_telegram_async():
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
+
+CURSOR_SOURCE = "telegram"
+
+FIRST_RUN_LIMIT = 50          # history pulled for a channel with no watermark
+MAX_MESSAGES_PER_RUN = 500    # new messages per channel per run, rest next run
+CHANNEL_CONCURRENCY = 4       # channels fetched at once on the shared session
+MAX_FLOOD_WAIT = 60           # sleep through flood waits up to this many seconds
+
+
+async def _collect_channel(client, channel, last_id, slots, emit):
+
+    watermark = last_id
+    guard = get_guard(CURSOR_SOURCE)
+
+    async with slots:
+        wait = guard.admit()
+        if wait is None:
+            print(f"Telegram skipped {channel}:", guard.unavailable_reason())
+            return
+        probe = guard.claimed_probe()
+
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+
+            if last_id:
+                # oldest-first from the watermark, so a run that stops early
+                # still leaves a gap-free watermark behind
+                messages = client.iter_messages(
+                    channel, min_id=last_id, limit=MAX_MESSAGES_PER_RUN, reverse=True
+                )
+            else:
+                messages = client.iter_messages(channel, limit=FIRST_RUN_LIMIT)
+
+            async for message in messages:
+                watermark = max(watermark, message.id)
+
+                matched = KEYWORD_MATCHER.find_all(message.text) if message.text else []
+
+                if matched:
+                    await emit({
+                        "source": f"telegram_{channel}",
+                        "content": message.text,
+                        "url": None,
+                        "country": "external",
+                        "metadata": {
+                            "channel": channel,
+                            "message_id": message.id,
+                            "date": str(message.date),
+                            "matched_keywords": matched
+                        },
+                        "raw": message.to_dict()
+                    })
+
+            guard.record_success()
+
+        except FloodWaitError as e:
+            # longer than telethon would sleep through: the whole account is
+            # throttled, so stop calling Telegram until the wait is over
+            guard.record_failure(f"flood wait {e.seconds}s on {channel}", retry_after=e.seconds)
+            print(f"Telegram flood wait on {channel}: {e.seconds}s, skipping until next run")
+
+        except Exception as e:
+            guard.record_failure(str(e))
+            print("Telegram error:", e)
+
+        finally:
+            # cancelled before an outcome was recorded: free a half-open probe
+            if probe:
+                guard.release_probe()
+
+    # queued behind this channel's messages: the writer saves the
+    # watermark only once every one of them has been committed
+    if watermark > last_id:
+        await emit(Checkpoint(partial(save_cursors, CURSOR_SOURCE, {channel: watermark})))
+
+
+async def iter_telegram_async():
     if not API_ID or not API_HASH:
         print("Telegram credentials missing")
-        return []
+        return
+
+    # runs on the shared ingestion loop: keep DB calls off it
+    cursors = await asyncio.to_thread(load_cursors, CURSOR_SOURCE)
+    watermarks = {k: int(v) for k, v in cursors.items()}
+    slots = asyncio.Semaphore(CHANNEL_CONCURRENCY)
 
-    records = []
+    # channels run concurrently and feed one queue that this generator drains
+    pending = asyncio.Queue(maxsize=CHANNEL_CONCURRENCY * 100)
+    done = object()
 
     async with TelegramClient("osnit_session", int(API_ID), API_HASH) as client:
-        for channel in CHANNELS:
+        # short flood waits are slept through by telethon itself
+        client.flood_sleep_threshold = MAX_FLOOD_WAIT
+
+        async def run_channels():
             try:
-                async for message in client.iter_messages(channel, limit=50):
-                    if message.text:
-                        text = message.text.lower()
-                        if any(k.lower() in text for k in KEYWORDS):
-                            records.append({
-                                "source": f"telegram_{channel}",
-                                "content": message.text,
-                                "url": None,
-                                "country": "external",
-                                "metadata": {
-                                    "channel": channel,
-                                    "date": str(message.date)
-                                }
-                            })
+                await asyncio.gather(*(
+                    _collect_channel(client, channel, watermarks.get(channel, 0), slots, pending.put)
+                    for channel in CHANNELS
+                ))
+            except asyncio.CancelledError:
+                # the consumer has gone; nobody is waiting for done
+                raise
             except Exception as e:
                 print("Telegram error:", e)
 
-    return records
+            await pending.put(done)
+
+        task = asyncio.ensure_future(run_channels())
+
+        try:
+            while (record := await pending.get()) is not done:
+                yield record
+
+            await task
+
+        finally:
+            # stopped early (deadline, failed insert): don't leave the
+            # channel fetches running on the shared loop
+            task.cancel()
+
+
+async def collect_telegram_async():
+    return records_only([record async for record in iter_telegram_async()])
 
 def collect_telegram():
     return asyncio.run(collect_telegram_async())
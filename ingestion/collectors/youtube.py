@@ -4,19 +4,30 @@ from googleapiclient.discovery import build
 import os
 from dotenv import load_dotenv
 
+from ingestion.resilience import get_guard
+
 load_dotenv()
 
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
-def collect_youtube():
+# override to point the client at a stand-in (e.g. the benchmark fixture server)
+YOUTUBE_API_URL = os.getenv("YOUTUBE_API_URL")
+
+def iter_youtube():
     if not YOUTUBE_API_KEY:
         print("YOUTUBE_API_KEY missing")
-        return []
+        return
+
+    guard = get_guard("youtube")
 
-    records = []
+    # every search.list call costs quota, so a refused call is never sent
+    if not guard.acquire():
+        print("YouTube skipped:", guard.unavailable_reason())
+        return
 
     try:
-        youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
+        client_options = {"api_endpoint": YOUTUBE_API_URL} if YOUTUBE_API_URL else None
+        youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY, client_options=client_options)
 
         request = youtube.search().list(
             q="India border OR Kashmir OR military",
@@ -25,14 +36,18 @@ def collect_youtube():
             type="video"
         )
 
-        response = request.execute()
+        # the client retries 429/5xx itself with backoff
+        response = request.execute(num_retries=guard.policy.max_retries)
 
     except Exception as e:
+        guard.record_failure(str(e))
         print("YouTube error:", e)
-        return []
+        return
+
+    guard.record_success()
 
     for item in response.get("items", []):
-        records.append({
+        yield {
             "source": "youtube",
             "content": item["snippet"]["title"],
             "url": f"https://youtube.com/watch?v={item['id']['videoId']}",
@@ -40,7 +55,11 @@ def collect_youtube():
             "metadata": {
                 "channel": item["snippet"]["channelTitle"],
                 "published_at": item["snippet"]["publishedAt"]
-            }
-        })
+            },
+            "raw": item
+        }
+
+
+def collect_youtube():
+    return list(iter_youtube())
 
-    return records
@@ -0,0 +1,46 @@
+# ingestion/cursors.py
+
+from database import SessionLocal
+from models import CollectorCursor
+
+
+# -----------------------------------------------------
+# PER-SOURCE CURSORS (watermarks between runs)
+# -----------------------------------------------------
+
+def load_cursors(source):
+    """Return {key: value} of every cursor stored for a source."""
+
+    db = SessionLocal()
+
+    try:
+        rows = db.query(CollectorCursor).filter(
+            CollectorCursor.source == source
+        ).all()
+
+        return {row.key: row.value for row in rows}
+
+    finally:
+        db.close()
+
+
+def save_cursors(source, cursors):
+    """Upsert {key: value} cursors for a source in one transaction."""
+
+    if not cursors:
+        return
+
+    db = SessionLocal()
+
+    try:
+        for key, value in cursors.items():
+            db.merge(CollectorCursor(source=source, key=key, value=str(value)))
+
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
@@ -0,0 +1,157 @@
+# ingestion/dedup.py
+
+import math
+import threading
+
+from database import SessionLocal
+from models import RawOSINT
+
+
+# -----------------------------------------------------
+# FILTER SIZING
+# -----------------------------------------------------
+
+FILTER_CAPACITY = 200_000     # recent hashes per generation
+FILTER_ERROR_RATE = 0.01      # target false-positive rate at capacity
+
+
+# -----------------------------------------------------
+# CONTENT HASH FILTER (two-generation Bloom filter)
+# -----------------------------------------------------
+
+class HashFilter:
+    """
+    Memory-bounded Bloom filter of recent content_hash values.
+
+    A miss means the hash is definitely not among the recent inserts, so
+    the DB lookup can be skipped. A hit only means "possibly seen" and
+    must be confirmed against the DB - a false positive never drops a
+    record. When the current generation fills up it becomes the previous
+    one and a fresh generation starts, so memory stays fixed and old
+    hashes age out.
+    """
+
+    def __init__(self, capacity=FILTER_CAPACITY, error_rate=FILTER_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.num_bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+
+        self._current = bytearray((self.num_bits + 7) // 8)
+        self._previous = bytearray((self.num_bits + 7) // 8)
+        self._current_count = 0
+        self._previous_count = 0
+
+        self._lock = threading.Lock()
+        self.warmed = False
+
+        # counters for sizing
+        self.lookups = 0
+        self.filter_hits = 0
+        self.confirmed_hits = 0
+
+    def _positions(self, content_hash):
+        # content_hash is already a SHA-256 hex digest: reuse its bits
+        # for double hashing instead of hashing again
+        h1 = int(content_hash[:16], 16)
+        h2 = int(content_hash[16:32], 16) | 1
+
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _test(bits, positions):
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in positions)
+
+    def add(self, content_hash):
+        positions = self._positions(content_hash)
+
+        with self._lock:
+            if self._test(self._current, positions):
+                return
+
+            if self._current_count >= self.capacity:
+                self._previous = self._current
+                self._previous_count = self._current_count
+                self._current = bytearray(len(self._previous))
+                self._current_count = 0
+
+            for p in positions:
+                self._current[p >> 3] |= 1 << (p & 7)
+
+            self._current_count += 1
+
+    def might_contain(self, content_hash):
+        positions = self._positions(content_hash)
+
+        with self._lock:
+            hit = self._test(self._current, positions) or self._test(self._previous, positions)
+
+            self.lookups += 1
+            if hit:
+                self.filter_hits += 1
+
+        return hit
+
+    def record_confirmed(self, count=1):
+        """Count filter hits that the DB confirmed as real duplicates."""
+        with self._lock:
+            self.confirmed_hits += count
+
+    def stats(self):
+        with self._lock:
+            false_positives = self.filter_hits - self.confirmed_hits
+
+            return {
+                "capacity": self.capacity,
+                "target_error_rate": self.error_rate,
+                "num_bits": self.num_bits,
+                "num_hashes": self.num_hashes,
+                "memory_bytes": len(self._current) + len(self._previous),
+                "items_current": self._current_count,
+                "items_previous": self._previous_count,
+                "warmed": self.warmed,
+                "lookups": self.lookups,
+                "filter_hits": self.filter_hits,
+                "confirmed_hits": self.confirmed_hits,
+                "hit_rate": round(self.filter_hits / self.lookups, 4) if self.lookups else 0,
+                "observed_false_positive_rate": (
+                    round(false_positives / self.lookups, 4) if self.lookups else 0
+                ),
+            }
+
+    def warm(self, limit=None):
+        """Load the most recent content hashes from raw_osint."""
+        db = SessionLocal()
+
+        try:
+            rows = (
+                db.query(RawOSINT.content_hash)
+                .filter(RawOSINT.content_hash != None)  # noqa: E711
+                .order_by(RawOSINT.id.desc())
+                .limit(limit or self.capacity)
+                .yield_per(5000)
+            )
+
+            # oldest first so the newest end up in the current generation
+            for (content_hash,) in reversed(list(rows)):
+                self.add(content_hash)
+
+            self.warmed = True
+
+        finally:
+            db.close()
+
+
+_content_filter = HashFilter()
+_warm_lock = threading.Lock()
+
+
+def get_content_filter():
+    """Shared filter, warmed from raw_osint on first use."""
+    if not _content_filter.warmed:
+        with _warm_lock:
+            if not _content_filter.warmed:
+                _content_filter.warm()
+
+    return _content_filter
@@ -0,0 +1,297 @@
+# ingestion/enrichment.py
+#
+# Optional article-body enrichment. Collectors only store headlines; when
+# ENRICH_BODIES is on, the pipeline asks fetch_bodies() for the article
+# text behind each record's url before analysing it:
+#
+#   python -m ingestion.enrichment https://example.com/some-article
+#
+# Bodies are fetched concurrently on the shared fetcher loop, rate limited
+# per domain through the "enrichment" source policy (which also caps how
+# many are in flight, so collectors sharing the pool keep their slots),
+# extracted from <p> blocks and cached by canonical URL in article_cache,
+# so a link seen again (or syndicated under another spelling) is never
+# fetched twice. Every article has its own timeout, the whole call a
+# deadline, and failures just mean "no body".
+
+import os
+import re
+import sys
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+from database import SessionLocal
+from models import ArticleCache
+from ingestion.fetcher import fetch_many, fetch_many_async, submit
+from ingestion.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------------------------------
+# SETTINGS
+# -----------------------------------------------------
+
+ENRICH_BODIES = os.getenv("ENRICH_BODIES", "false").lower() == "true"
+
+FETCH_TIMEOUT = 10            # per article
+ENRICH_DEADLINE = 20          # per fetch_bodies() call, all articles together
+MAX_TEXT_CHARS = 20_000       # stored / returned body length cap
+MIN_PARAGRAPH_CHARS = 40      # shorter <p> blocks are usually captions or chrome
+FAILURE_RETRY = timedelta(hours=6)
+
+SOURCE = "enrichment"         # per-domain policy in ingestion.resilience
+
+# links that never lead to an article page worth extracting
+SKIP_HOSTS = {"youtube.com", "youtu.be", "t.me", "twitter.com", "x.com"}
+
+OK = "ok"
+EMPTY = "empty"
+FAILED = "failed"
+
+
+# -----------------------------------------------------
+# EXTRACTION
+# -----------------------------------------------------
+
+class _ParagraphExtractor(HTMLParser):
+    """Collects the text of <p> blocks outside page chrome."""
+
+    SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "aside", "form", "figure"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self.title = None
+
+        self._skip_depth = 0
+        self._in_title = False
+        self._paragraph = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and self.title is None:
+            self._in_title = True
+            self.title = ""
+        elif tag == "p" and not self._skip_depth:
+            self._close_paragraph()
+            self._paragraph = []
+        elif tag == "br" and self._paragraph is not None:
+            self._paragraph.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "p":
+            self._close_paragraph()
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif self._paragraph is not None and not self._skip_depth:
+            self._paragraph.append(data)
+
+    def _close_paragraph(self):
+        if self._paragraph is not None:
+            text = re.sub(r"\s+", " ", "".join(self._paragraph)).strip()
+            if len(text) >= MIN_PARAGRAPH_CHARS:
+                self.paragraphs.append(text)
+            self._paragraph = None
+
+    def close(self):
+        super().close()
+        self._close_paragraph()
+
+
+def extract_article(html):
+    """Return (title, text) for an HTML page; text is "" when nothing looks like an article."""
+    parser = _ParagraphExtractor()
+
+    try:
+        parser.feed(html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"[Enrichment] HTML parse stopped early: {e}")
+
+    text = "\n\n".join(parser.paragraphs)[:MAX_TEXT_CHARS]
+    title = re.sub(r"\s+", " ", parser.title or "").strip() or None
+
+    return title, text
+
+
+def _decode(response):
+    content_type = response.headers.get("Content-Type", "")
+    match = re.search(r"charset=([\w-]+)", content_type, re.I)
+
+    try:
+        return response.content.decode(match.group(1) if match else "utf-8", errors="replace")
+    except LookupError:
+        return response.text
+
+
+def _is_html(response):
+    content_type = response.headers.get("Content-Type", "").lower()
+    return not content_type or "html" in content_type
+
+
+# -----------------------------------------------------
+# CACHE
+# -----------------------------------------------------
+
+def _load_cached(db, canonical_urls):
+    rows = db.query(ArticleCache).filter(ArticleCache.canonical_url.in_(canonical_urls)).all()
+    return {row.canonical_url: row for row in rows}
+
+
+def _is_fresh(row):
+    # ok / empty pages don't change; failures are retried after a while
+    if row.status != FAILED or row.fetched_at is None:
+        return True
+
+    fetched_at = row.fetched_at
+    if fetched_at.tzinfo is None:
+        fetched_at = fetched_at.replace(tzinfo=timezone.utc)
+
+    return datetime.now(timezone.utc) - fetched_at < FAILURE_RETRY
+
+
+def _result_row(canonical, url, response):
+    row = ArticleCache(canonical_url=canonical, url=url, http_status=response.status or None)
+
+    if not response.ok:
+        row.status = FAILED
+        row.error = response.error or f"HTTP {response.status}"
+        return row
+
+    if not _is_html(response):
+        row.status = EMPTY
+        row.error = f"not HTML ({response.headers.get('Content-Type')})"
+        return row
+
+    row.title, row.text = extract_article(_decode(response))
+    row.status = OK if row.text else EMPTY
+    return row
+
+
+# -----------------------------------------------------
+# PUBLIC API
+# -----------------------------------------------------
+
+def _wanted(urls):
+    # canonical url -> the links (as collected) that lead to it
+    wanted = {}
+    for url in urls:
+        canonical = canonicalize_url(url)
+        if canonical and urlsplit(canonical).hostname not in SKIP_HOSTS:
+            wanted.setdefault(canonical, []).append(url)
+    return wanted
+
+
+def _read_cache(wanted):
+    """({url: text} for cached bodies, canonical urls still to fetch)."""
+    db = SessionLocal()
+    bodies = {}
+
+    try:
+        cached = _load_cached(db, list(wanted))
+    finally:
+        db.close()
+
+    for canonical, row in cached.items():
+        if row.status == OK:
+            for url in wanted[canonical]:
+                bodies[url] = row.text
+
+    missing = [c for c in wanted if c not in cached or not _is_fresh(cached[c])]
+    return bodies, missing
+
+
+def _store_results(wanted, missing, responses):
+    """Extract and cache fetched pages; {url: text} for those with a body."""
+    db = SessionLocal()
+    bodies = {}
+
+    try:
+        for canonical, response in zip(missing, responses):
+            # only answers from the server are cached; timeouts, the
+            # deadline and open circuits are tried again next time
+            if not response.status:
+                continue
+
+            row = _result_row(canonical, wanted[canonical][0], response)
+            db.merge(row)
+
+            if row.status == OK:
+                for url in wanted[canonical]:
+                    bodies[url] = row.text
+
+        db.commit()
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+    return bodies
+
+
+async def fetch_bodies_async(urls, deadline=ENRICH_DEADLINE):
+    """
+    Article text for each url that has one: {url: text}. Cached bodies
+    are returned without a request; the rest are fetched concurrently on
+    the shared loop, FETCH_TIMEOUT per article and deadline seconds in
+    all. Cache reads / writes and HTML extraction run in a worker thread
+    so the loop stays free for collectors. Never raises for a fetch or
+    parse failure.
+    """
+    wanted = _wanted(urls)
+    if not wanted:
+        return {}
+
+    bodies = {}
+
+    try:
+        cached_bodies, missing = await asyncio.to_thread(_read_cache, wanted)
+        bodies.update(cached_bodies)
+
+        if missing:
+            # the canonical form is a key, not an address (www./AMP are
+            # stripped): fetch the link as a collector saw it
+            responses = await fetch_many_async(
+                [wanted[c][0] for c in missing], timeout=FETCH_TIMEOUT, source=SOURCE, deadline=deadline
+            )
+            bodies.update(await asyncio.to_thread(_store_results, wanted, missing, responses))
+
+            fetched = sum(1 for r in responses if r.ok)
+            logger.info(
+                f"[Enrichment] {len(wanted)} urls — {len(wanted) - len(missing)} cached, "
+                f"{fetched}/{len(missing)} fetched, {len(bodies)} with text"
+            )
+
+    except Exception as e:
+        logger.warning(f"[Enrichment] skipped: {e}")
+
+    return bodies
+
+
+def fetch_bodies(urls, deadline=ENRICH_DEADLINE):
+    """
+    Blocking form of fetch_bodies_async() for the AI pipeline (never
+    called on the ingest path). Must not be called from the shared loop.
+    """
+    return submit(fetch_bodies_async(list(urls), deadline=deadline)).result()
+
+
+if __name__ == "__main__":
+    for arg in sys.argv[1:]:
+        result = fetch_many([arg], timeout=FETCH_TIMEOUT)[0]
+        title, text = extract_article(_decode(result)) if result.ok else (None, "")
+        print(f"# {title or arg} ({result.status or result.error})\n\n{text}\n")
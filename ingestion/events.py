@@ -0,0 +1,91 @@
+# ingestion/events.py
+
+import queue
+import threading
+
+from sqlalchemy import text
+
+
+# -----------------------------------------------------
+# INSERT EVENTS (ingestion -> AI pipeline handoff)
+# -----------------------------------------------------
+# Freshly inserted raw_osint ids are announced two ways:
+#   * in-process: put on every subscriber queue (same-process dispatcher)
+#   * Postgres NOTIFY on INSERT_CHANNEL, sent inside the insert transaction
+#     so listeners in other processes only hear about committed rows
+
+INSERT_CHANNEL = "raw_osint_inserted"
+NOTIFY_INSERTS = True
+
+# NOTIFY payloads must stay under 8000 bytes
+_MAX_PAYLOAD = 7900
+
+_subscribers = []
+_lock = threading.Lock()
+
+
+def subscribe(maxsize=10000):
+    """Register an in-process queue that receives lists of inserted ids."""
+    q = queue.Queue(maxsize=maxsize)
+
+    with _lock:
+        _subscribers.append(q)
+
+    return q
+
+
+def unsubscribe(q):
+    with _lock:
+        if q in _subscribers:
+            _subscribers.remove(q)
+
+
+def publish_inserted(ids):
+    """Hand committed ids to in-process subscribers; never blocks ingestion."""
+    if not ids:
+        return
+
+    with _lock:
+        subscribers = list(_subscribers)
+
+    for q in subscribers:
+        try:
+            q.put_nowait(list(ids))
+        except queue.Full:
+            # the interval sweep picks these up instead
+            pass
+
+
+def _payloads(ids):
+    chunk = []
+    size = 0
+
+    for record_id in ids:
+        token = str(record_id)
+
+        if chunk and size + len(token) + 1 > _MAX_PAYLOAD:
+            yield ",".join(chunk)
+            chunk = []
+            size = 0
+
+        chunk.append(token)
+        size += len(token) + 1
+
+    if chunk:
+        yield ",".join(chunk)
+
+
+def notify_inserted(db, ids):
+    """Queue a NOTIFY for the ids; delivered by Postgres when db commits."""
+    if not NOTIFY_INSERTS or not ids:
+        return
+
+    for payload in _payloads(ids):
+        db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": INSERT_CHANNEL, "payload": payload}
+        )
+
+
+def parse_payload(payload):
+    return [int(token) for token in payload.split(",") if token]
@@ -0,0 +1,125 @@
+# ingestion/feed_cache.py
+
+import logging
+
+from database import SessionLocal
+from models import FeedValidator
+
+
+logger = logging.getLogger(__name__)
+
+# GUIDs remembered per feed; comfortably above any feed's page size
+MAX_SEEN_GUIDS = 500
+
+
+def entry_guid(entry):
+    return entry.get("id") or entry.get("link") or entry.get("title")
+
+
+# -----------------------------------------------------
+# VALIDATOR CACHE (ETag / Last-Modified + seen GUIDs)
+# -----------------------------------------------------
+
+class FeedCache:
+    """
+    Per-feed HTTP validators and recently seen entry GUIDs, persisted in
+    feed_validators. Load once per cycle; update() and unseen() only
+    change the in-memory state, and save() persists it. Collectors hand
+    save() to the stream writer as a Checkpoint, so nothing is marked
+    seen (or not modified) before its entries are committed.
+    """
+
+    def __init__(self, urls):
+        self._state = {}
+        self._dirty = set()
+
+        db = SessionLocal()
+
+        try:
+            rows = db.query(FeedValidator).filter(
+                FeedValidator.url.in_(list(urls))
+            ).all()
+
+            for row in rows:
+                self._state[row.url] = {
+                    "etag": row.etag,
+                    "last_modified": row.last_modified,
+                    "seen_guids": list(row.seen_guids or [])
+                }
+
+        finally:
+            db.close()
+
+    def headers(self, url):
+        state = self._state.get(url, {})
+        headers = {}
+
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+
+        return headers
+
+    def headers_by_url(self, urls):
+        return {url: self.headers(url) for url in urls}
+
+    def update(self, url, response):
+        state = self._state.setdefault(url, {"seen_guids": []})
+
+        state["etag"] = response.headers.get("ETag")
+        state["last_modified"] = response.headers.get("Last-Modified")
+
+        self._dirty.add(url)
+
+    def unseen(self, url, entries):
+        """Yield entries whose GUID hasn't been seen yet and remember them."""
+        state = self._state.setdefault(url, {"seen_guids": []})
+        seen = set(state["seen_guids"])
+        new_guids = []
+
+        for entry in entries:
+            guid = entry_guid(entry)
+
+            if guid and guid in seen:
+                continue
+
+            if guid:
+                seen.add(guid)
+                new_guids.append(guid)
+
+            yield entry
+
+        if new_guids:
+            state["seen_guids"] = (state["seen_guids"] + new_guids)[-MAX_SEEN_GUIDS:]
+            self._dirty.add(url)
+
+    def save(self):
+
+        if not self._dirty:
+            return
+
+        db = SessionLocal()
+
+        try:
+            for url in self._dirty:
+                state = self._state[url]
+
+                db.merge(FeedValidator(
+                    url=url,
+                    etag=state.get("etag"),
+                    last_modified=state.get("last_modified"),
+                    seen_guids=state.get("seen_guids", [])
+                ))
+
+            db.commit()
+            self._dirty.clear()
+
+        except Exception as e:
+            # next cycle re-fetches and dedup drops what's already stored
+            db.rollback()
+            logger.warning(f"[FeedCache] Validators not saved: {e}")
+
+        finally:
+            db.close()
@@ -0,0 +1,477 @@
+# ingestion/fetcher.py
+
+import json
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+from ingestion.telemetry import current_run
+from ingestion.resilience import (
+    get_guard, backoff_delay, retry_after_seconds,
+    RETRYABLE_STATUS, FAILURE_STATUS, MAX_RETRY_AFTER, CLOSED
+)
+
+
+# -----------------------------------------------------
+# POOL LIMITS
+# -----------------------------------------------------
+
+MAX_CONNECTIONS = 64        # bounded total concurrency across all collectors
+MAX_PER_HOST = 4            # politeness limit per feed host
+KEEPALIVE_TIMEOUT = 60      # seconds an idle connection is kept for reuse
+DEFAULT_TIMEOUT = 15
+STREAM_CHUNK_SIZE = 64 * 1024   # bytes read per step from a streamed body
+
+USER_AGENT = "OsnitShield/1.0 (+ingestion)"
+
+
+# -----------------------------------------------------
+# RESULT
+# -----------------------------------------------------
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    content: bytes = b""
+    headers: CIMultiDict = field(default_factory=CIMultiDict)
+    error: Optional[str] = None
+    elapsed: float = 0.0
+    streamed_bytes: int = 0     # body bytes read through fetch_stream (content stays empty)
+
+    def __post_init__(self):
+        # header names are case-insensitive (HTTP/2 sends them lower-case),
+        # so lookups like headers.get("ETag") must be too
+        self.headers = CIMultiDict(self.headers or {})
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+# -----------------------------------------------------
+# SHARED EVENT LOOP + SESSION
+# -----------------------------------------------------
+# One background loop is the ingestion runtime: async collectors run on
+# it directly (see ingestion.registry), and sync collectors, running in
+# worker threads, hand their requests to it. Either way a single aiohttp
+# session (and its keep-alive pool) is shared by all of them.
+#
+# Code running ON the loop must use the async API; the sync API blocks
+# on the loop and would deadlock there.
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+_session: Optional[aiohttp.ClientSession] = None
+_total_slots: Optional[asyncio.Semaphore] = None
+_host_slots: dict = {}
+_source_slots: dict = {}
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=_loop.run_forever,
+                name="fetcher-loop",
+                daemon=True
+            ).start()
+
+    return _loop
+
+
+def _get_session() -> aiohttp.ClientSession:
+    # only ever called from inside the fetcher loop, so no locking needed
+    global _session, _total_slots
+
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=MAX_CONNECTIONS,
+            limit_per_host=MAX_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300
+        )
+        _session = aiohttp.ClientSession(
+            connector=connector,
+            headers={"User-Agent": USER_AGENT}
+        )
+        _total_slots = asyncio.Semaphore(MAX_CONNECTIONS)
+
+    return _session
+
+
+def _host_slot(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).netloc.lower()
+
+    if host not in _host_slots:
+        _host_slots[host] = asyncio.Semaphore(MAX_PER_HOST)
+
+    return _host_slots[host]
+
+
+def _source_slot(guard) -> Optional[asyncio.Semaphore]:
+    # per-source cap on in-flight requests (SourcePolicy.concurrency),
+    # shared by all of a per_host source's guards ("<source>/<host>")
+    if not guard.policy.concurrency:
+        return None
+
+    source = guard.name.split("/", 1)[0]
+    if source not in _source_slots:
+        _source_slots[source] = asyncio.Semaphore(guard.policy.concurrency)
+
+    return _source_slots[source]
+
+
+# -----------------------------------------------------
+# ASYNC API (runs on the fetcher loop)
+# -----------------------------------------------------
+
+async def _fetch_once(url, params, headers, timeout, sending=None) -> FetchResult:
+
+    session = _get_session()
+    result = FetchResult(url=url)
+
+    # requests silently dropped None params; aiohttp rejects them
+    if params:
+        params = {k: v for k, v in params.items() if v is not None}
+
+    # wait for a slot first so queueing time doesn't eat into the timeout
+    async with _total_slots, _host_slot(url):
+
+        if sending is not None:
+            sending.set()
+        started = time.monotonic()
+
+        try:
+            async with session.get(
+                url,
+                params=params,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                result.status = response.status
+                result.headers = CIMultiDict(response.headers)
+                result.content = await response.read()
+
+        except asyncio.TimeoutError:
+            result.error = f"timeout after {timeout}s"
+
+        except aiohttp.ClientError as e:
+            result.error = str(e) or e.__class__.__name__
+
+        result.elapsed = time.monotonic() - started
+
+    return result
+
+
+def _failed(result):
+    return result.error is not None or result.status in FAILURE_STATUS
+
+
+def _describe(result):
+    return result.error or f"HTTP {result.status}"
+
+
+async def fetch_async(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, source=None) -> FetchResult:
+    """
+    One GET on the shared session. With source=, the request goes through
+    that source's rate limiter and circuit breaker (see ingestion.resilience)
+    and retryable failures are retried with jittered exponential backoff.
+    A refused request comes back as a FetchResult with error set.
+    """
+    if source is None:
+        return await _fetch_once(url, params, headers, timeout)
+
+    guard = get_guard(source, urlsplit(url).netloc.lower())
+    retries = guard.policy.max_retries
+
+    for attempt in range(retries + 1):
+
+        wait = guard.admit()
+        if wait is None:
+            return FetchResult(url=url, error=f"{guard.name} unavailable: {guard.unavailable_reason()}")
+        probe = guard.claimed_probe()
+
+        slot = _source_slot(guard)
+        sending = asyncio.Event()
+
+        try:
+            if wait:
+                await asyncio.sleep(wait)
+
+            if slot is None:
+                result = await _fetch_once(url, params, headers, timeout, sending)
+            else:
+                async with slot:
+                    result = await _fetch_once(url, params, headers, timeout, sending)
+
+        except asyncio.CancelledError:
+            # cut off by a caller's deadline mid-request: too slow counts
+            # against the source. Cancelled while still waiting for the
+            # bucket or our own slots says nothing about the source.
+            if sending.is_set():
+                guard.record_failure("cancelled")
+            raise
+
+        finally:
+            # no outcome recorded (cancelled while waiting): a half-open
+            # probe must not stay claimed forever
+            if probe:
+                guard.release_probe()
+
+        if not _failed(result):
+            guard.record_success()
+            return result
+
+        retry_after = retry_after_seconds(result.headers)
+
+        # told to stay away for longer than a cycle should wait: open the circuit
+        if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+            guard.record_failure(_describe(result), retry_after=retry_after)
+            return result
+
+        # a half-open probe gets one shot
+        retryable = result.error is not None or result.status in RETRYABLE_STATUS
+        if attempt < retries and retryable and guard.breaker.state == CLOSED:
+            await asyncio.sleep(max(retry_after or 0, backoff_delay(attempt)))
+            continue
+
+        break
+
+    guard.record_failure(_describe(result))
+    return result
+
+
+async def fetch_many_async(urls, timeout=DEFAULT_TIMEOUT, headers_by_url=None, source=None,
+                           deadline=None) -> list[FetchResult]:
+    headers_by_url = headers_by_url or {}
+
+    tasks = [
+        asyncio.ensure_future(
+            fetch_async(url, headers=headers_by_url.get(url), timeout=timeout, source=source)
+        )
+        for url in urls
+    ]
+
+    if not tasks:
+        return []
+
+    # deadline bounds the whole batch, queueing for slots included;
+    # whatever hasn't finished by then is cancelled
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.wait(pending)
+
+    return [
+        task.result() if task in done else FetchResult(url=url, error=f"deadline of {deadline}s exceeded")
+        for url, task in zip(urls, tasks)
+    ]
+
+
+# -----------------------------------------------------
+# STREAMED BODIES (large downloads)
+# -----------------------------------------------------
+# The response stays open on the fetcher loop and the caller pulls it
+# one chunk at a time, so only STREAM_CHUNK_SIZE bytes are ever held.
+# The connection slots are kept until the stream is closed.
+
+class StreamedResponse:
+
+    def __init__(self, result, response=None, slots=(), guard=None):
+        self.result = result
+        self._response = response
+        self._slots = slots
+        self._guard = guard
+
+    @property
+    def ok(self) -> bool:
+        return self.result.ok
+
+    def chunks(self, size=STREAM_CHUNK_SIZE):
+        """Yield body chunks; a mid-body failure ends iteration and sets result.error."""
+        if self._response is None or not self.ok:
+            return
+
+        while True:
+            try:
+                chunk = _run(self._response.content.read(size))
+
+            except asyncio.TimeoutError:
+                self.result.error = "timeout while reading body"
+                return
+
+            except aiohttp.ClientError as e:
+                self.result.error = str(e) or e.__class__.__name__
+                return
+
+            if not chunk:
+                return
+
+            self.result.streamed_bytes += len(chunk)
+            yield chunk
+
+    async def _close(self):
+        if self._response is not None:
+            self._response.release()
+            self._response = None
+
+        for slot in self._slots:
+            slot.release()
+        self._slots = ()
+
+    def close(self):
+        _run(self._close())
+
+        if self._guard is not None:
+            if _failed(self.result):
+                self._guard.record_failure(_describe(self.result))
+            else:
+                self._guard.record_success()
+            self._guard = None
+
+
+async def _open_stream(url, headers, timeout, source) -> StreamedResponse:
+
+    session = _get_session()
+    result = FetchResult(url=url)
+    guard = None
+    wait = 0
+    probe = False
+
+    if source is not None:
+        guard = get_guard(source, urlsplit(url).netloc.lower())
+
+        # no in-call retries: a big body is retried on the next cycle instead
+        wait = guard.admit()
+        if wait is None:
+            result.error = f"{guard.name} unavailable: {guard.unavailable_reason()}"
+            return StreamedResponse(result)
+        probe = guard.claimed_probe()
+
+    acquired = []
+
+    try:
+        if wait:
+            await asyncio.sleep(wait)
+
+        for slot in (_total_slots, _host_slot(url)):
+            await slot.acquire()
+            acquired.append(slot)
+
+    except asyncio.CancelledError:
+        # cancelled before sending: nothing to count against the source
+        for slot in acquired:
+            slot.release()
+        if probe:
+            guard.release_probe()
+        raise
+
+    stream = StreamedResponse(result, slots=tuple(acquired), guard=guard)
+
+    try:
+        # no total timeout: the body may take a while, but it must keep moving
+        stream._response = await session.get(
+            url,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+        )
+        result.status = stream._response.status
+        result.headers = CIMultiDict(stream._response.headers)
+
+    except asyncio.TimeoutError:
+        result.error = f"timeout after {timeout}s"
+
+    except aiohttp.ClientError as e:
+        result.error = str(e) or e.__class__.__name__
+
+    except asyncio.CancelledError:
+        # the caller never gets the stream to close: free its slots here
+        await stream._close()
+        if guard is not None:
+            guard.record_failure("cancelled")
+        raise
+
+    return stream
+
+
+# -----------------------------------------------------
+# SYNC API (for collectors)
+# -----------------------------------------------------
+
+def submit(coro):
+    """Schedule a coroutine on the shared loop; returns a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop())
+
+
+def _run(coro):
+    return submit(coro).result()
+
+
+def _record(results, started):
+    run = current_run()
+    if run is not None:
+        run.record_responses(results, time.monotonic() - started)
+
+
+def fetch(url, params=None, headers=None, timeout=DEFAULT_TIMEOUT, source=None) -> FetchResult:
+    started = time.monotonic()
+    result = _run(fetch_async(url, params=params, headers=headers, timeout=timeout, source=source))
+
+    _record([result], started)
+    return result
+
+
+def fetch_many(urls, timeout=DEFAULT_TIMEOUT, headers_by_url=None, source=None, deadline=None) -> list[FetchResult]:
+    """Fetch all urls concurrently; results come back in input order."""
+    started = time.monotonic()
+    results = _run(fetch_many_async(
+        list(urls), timeout=timeout, headers_by_url=headers_by_url, source=source, deadline=deadline
+    ))
+
+    _record(results, started)
+    return results
+
+
+@contextmanager
+def fetch_stream(url, headers=None, timeout=DEFAULT_TIMEOUT, source=None):
+    """
+    GET url and stream the body:
+
+        with fetch_stream(url, source="gdelt_events") as response:
+            if response.ok:
+                for chunk in response.chunks():
+                    ...
+
+    response.result is the usual FetchResult (status, headers, error),
+    with streamed_bytes instead of content.
+    """
+    started = time.monotonic()
+    stream = _run(_open_stream(url, headers, timeout, source))
+
+    try:
+        yield stream
+    finally:
+        stream.close()
+        stream.result.elapsed = time.monotonic() - started
+        _record([stream.result], started)
@@ -0,0 +1,184 @@
+# ingestion/matcher.py
+
+import unicodedata
+from collections import deque
+from typing import NamedTuple, Any
+
+
+# -----------------------------------------------------
+# BOUNDARY MODES
+# -----------------------------------------------------
+# None     - plain substring match ("army" matches "armyman")
+# "word"   - match must start and end on a word boundary
+# "prefix" - match must start on a word boundary but may run into a
+#            longer word ("hack" matches "hackers", not "shack")
+
+WORD = "word"
+PREFIX = "prefix"
+
+_DEFAULT = object()
+
+
+class Match(NamedTuple):
+    start: int
+    end: int
+    keyword: str
+    value: Any
+
+
+def _is_word_char(ch):
+    # combining marks (Devanagari vowel signs, virama, ...) sit inside words
+    return ch.isalnum() or unicodedata.category(ch).startswith("M")
+
+
+# -----------------------------------------------------
+# AHO-CORASICK MATCHER
+# -----------------------------------------------------
+
+class KeywordMatcher:
+    """
+    Multi-pattern matcher compiled once from a keyword list. One pass
+    over the text finds every keyword, so the per-text cost grows with
+    the text length and the number of hits, not with the number of
+    keywords.
+
+    keywords may be an iterable of strings or a {keyword: value} dict;
+    the value is handed back on every match (e.g. a category name).
+    Matching is case-insensitive unless case_sensitive=True.
+    """
+
+    def __init__(self, keywords=(), boundary=None, case_sensitive=False):
+        self.boundary = boundary
+        self.case_sensitive = case_sensitive
+
+        self._patterns = []      # (keyword, value, boundary)
+        self._compiled = False
+
+        items = keywords.items() if isinstance(keywords, dict) else ((k, None) for k in keywords)
+        for keyword, value in items:
+            self.add(keyword, value)
+
+    def add(self, keyword, value=None, boundary=_DEFAULT):
+        if not keyword:
+            return
+
+        boundary = self.boundary if boundary is _DEFAULT else boundary
+        self._patterns.append((keyword, value, boundary))
+        self._compiled = False
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def _fold(self, text):
+        return text if self.case_sensitive else text.lower()
+
+    # ── build ──
+
+    def compile(self):
+        goto = [{}]
+        outputs = [[]]
+
+        for pattern_id, (keyword, _, _) in enumerate(self._patterns):
+            node = 0
+
+            for ch in self._fold(keyword):
+                nxt = goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[node][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                node = nxt
+
+            outputs[node].append(pattern_id)
+
+        # breadth-first failure links; each node inherits the outputs of
+        # its failure node so matching never has to walk the chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+
+        while queue:
+            node = queue.popleft()
+
+            for ch, nxt in goto[node].items():
+                queue.append(nxt)
+
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+
+                fail[nxt] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != nxt else 0
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._lengths = [len(self._fold(k)) for k, _, _ in self._patterns]
+        self._compiled = True
+
+    # ── scan ──
+
+    def _scan(self, text):
+        """Yield (end_index_exclusive, pattern_id) over the original text."""
+        if not self._compiled:
+            self.compile()
+
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+
+        folded = self._fold(text)
+
+        if len(folded) == len(text):
+            chars = enumerate(folded)
+        else:
+            # a few characters change length when lowered; fold one at a
+            # time so indexes still point into the original text
+            chars = ((i, c) for i, ch in enumerate(text) for c in self._fold(ch))
+
+        node = 0
+        for i, ch in chars:
+            while node and ch not in goto[node]:
+                node = fail[node]
+
+            node = goto[node].get(ch, 0)
+
+            for pattern_id in outputs[node]:
+                yield i + 1, pattern_id
+
+    def _boundary_ok(self, text, start, end, boundary):
+        if boundary is None:
+            return True
+
+        if start > 0 and _is_word_char(text[start - 1]) and _is_word_char(text[start]):
+            return False
+
+        if boundary == WORD and end < len(text) and _is_word_char(text[end]) and _is_word_char(text[end - 1]):
+            return False
+
+        return True
+
+    def finditer(self, text):
+        """Yield every Match (overlapping matches included), in text order by end."""
+        if not text:
+            return
+
+        for end, pattern_id in self._scan(text):
+            keyword, value, boundary = self._patterns[pattern_id]
+            start = max(end - self._lengths[pattern_id], 0)
+
+            if self._boundary_ok(text, start, end, boundary):
+                yield Match(start, end, keyword, value)
+
+    def find_all(self, text):
+        """Distinct matched keywords, in order of first appearance."""
+        return list(dict.fromkeys(m.keyword for m in self.finditer(text)))
+
+    def counts(self, text):
+        """{keyword: number of occurrences}."""
+        result = {}
+        for m in self.finditer(text):
+            result[m.keyword] = result.get(m.keyword, 0) + 1
+        return result
+
+    def search(self, text):
+        """True as soon as any keyword matches."""
+        return next(self.finditer(text), None) is not None
@@ -0,0 +1,254 @@
+# ingestion/near_dup.py
+
+import os
+import re
+import hashlib
+import threading
+from collections import deque
+
+from database import SessionLocal
+from models import RawOSINT
+
+
+# -----------------------------------------------------
+# TUNING
+# -----------------------------------------------------
+
+# "link" (default) inserts near-duplicates with
+# metadata["near_duplicate_of"] pointing at the original's content_hash
+# (the AI pipeline then reuses the original's analysis), "suppress" drops
+# them before insert, "off" disables the stage.
+NEAR_DUP_MODE = os.getenv("NEAR_DUP_MODE", "link")
+
+# Structured sources whose identity is an upstream id, not their text:
+# a GDELT event string differs from another event's by little more than
+# actor order, so it is never screened
+EXEMPT_SOURCES = {"gdelt_events"}
+
+# Signatures are built from word shingles, so word order counts:
+# "India accuses Pakistan" and "Pakistan accuses India" hash apart
+SHINGLE_SIZES = (2, 3)
+
+# Max Hamming distance between 64-bit SimHashes to call two items
+# near-identical (similarity = 1 - distance / 64). Must stay below
+# NUM_BANDS so the banded lookup is guaranteed to find every match.
+# Unrelated headlines sit 18+ bits apart; re-titled copies within ~7.
+MAX_DISTANCE = int(os.getenv("NEAR_DUP_MAX_DISTANCE", "7"))
+NUM_BANDS = 8
+
+# Texts with fewer tokens than this are too short to fingerprint safely
+MIN_TOKENS = 4
+
+# Recent signatures kept in memory
+INDEX_SIZE = 50_000
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or",
+    "is", "are", "was", "were", "by", "with", "as", "from", "after", "over",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+# -----------------------------------------------------
+# SIMHASH
+# -----------------------------------------------------
+
+def _tokens(text):
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _shingles(tokens, sizes=SHINGLE_SIZES):
+    return [
+        " ".join(tokens[i:i + size])
+        for size in sizes
+        for i in range(len(tokens) - size + 1)
+    ]
+
+
+def simhash(text):
+    """64-bit SimHash over word shingles, or None if the text is too short."""
+
+    tokens = _tokens(text)
+    if len(tokens) < MIN_TOKENS:
+        return None
+
+    weights = [0] * 64
+
+    for shingle in _shingles(tokens):
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    signature = 0
+    for bit in range(64):
+        if weights[bit] > 0:
+            signature |= 1 << bit
+
+    return signature
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+# -----------------------------------------------------
+# BANDED INDEX
+# -----------------------------------------------------
+
+class SimHashIndex:
+    """
+    Splits each signature into NUM_BANDS bands; two signatures within
+    MAX_DISTANCE bits must agree exactly on at least one band, so only
+    items sharing a band bucket are compared. Bounded to `size` entries,
+    oldest evicted first.
+    """
+
+    def __init__(self, size=INDEX_SIZE, max_distance=MAX_DISTANCE, num_bands=NUM_BANDS):
+        if max_distance >= num_bands:
+            raise ValueError("max_distance must be smaller than num_bands")
+
+        self.size = size
+        self.max_distance = max_distance
+        self.num_bands = num_bands
+        self._band_bits = 64 // num_bands
+        self._mask = (1 << self._band_bits) - 1
+
+        self._buckets = {}
+        self._order = deque()
+        self._lock = threading.Lock()
+        self.warmed = False
+
+    def _band_keys(self, signature):
+        return [
+            (band, signature >> (band * self._band_bits) & self._mask)
+            for band in range(self.num_bands)
+        ]
+
+    def find(self, signature):
+        """Return the content_hash of a near-identical item, or None."""
+        with self._lock:
+            for key in self._band_keys(signature):
+                for other, content_hash in self._buckets.get(key, ()):
+                    if hamming(signature, other) <= self.max_distance:
+                        return content_hash
+
+        return None
+
+    def add(self, signature, content_hash):
+        with self._lock:
+            entry = (signature, content_hash)
+
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(entry)
+
+            self._order.append(entry)
+
+            if len(self._order) > self.size:
+                old = self._order.popleft()
+
+                for key in self._band_keys(old[0]):
+                    bucket = self._buckets.get(key)
+                    if bucket:
+                        bucket.remove(old)
+                        if not bucket:
+                            del self._buckets[key]
+
+    def __len__(self):
+        return len(self._order)
+
+    def warm(self):
+        """Fingerprint the most recent raw_osint rows."""
+        db = SessionLocal()
+
+        try:
+            rows = (
+                db.query(RawOSINT.content, RawOSINT.content_hash)
+                .filter(RawOSINT.source.notin_(EXEMPT_SOURCES))
+                .order_by(RawOSINT.id.desc())
+                .limit(self.size)
+                .all()
+            )
+
+            for content, content_hash in reversed(rows):
+                signature = simhash(content or "")
+                if signature is not None:
+                    self.add(signature, content_hash)
+
+            self.warmed = True
+
+        finally:
+            db.close()
+
+
+_index = SimHashIndex()
+_warm_lock = threading.Lock()
+
+
+def get_near_dup_index():
+    if not _index.warmed:
+        with _warm_lock:
+            if not _index.warmed:
+                _index.warm()
+
+    return _index
+
+
+# -----------------------------------------------------
+# INSERT-TIME SCREENING
+# -----------------------------------------------------
+
+def screen_rows(rows):
+    """
+    Screen prepared raw_osint rows against recent items and against each
+    other. Returns (rows_to_insert, signatures, suppressed_count).
+    Call remember(signatures) once the rows are committed.
+    """
+
+    if NEAR_DUP_MODE == "off":
+        return rows, [], 0
+
+    index = get_near_dup_index()
+    batch = SimHashIndex(size=max(len(rows), 1), max_distance=index.max_distance, num_bands=index.num_bands)
+
+    kept = []
+    signatures = []
+    suppressed = 0
+
+    for row in rows:
+        if row["source"] in EXEMPT_SOURCES:
+            kept.append(row)
+            continue
+
+        signature = simhash(row["content"])
+
+        if signature is None:
+            kept.append(row)
+            continue
+
+        original = index.find(signature) or batch.find(signature)
+
+        if original and NEAR_DUP_MODE == "suppress":
+            suppressed += 1
+            continue
+
+        if original:
+            row["extra_metadata"] = dict(row["extra_metadata"] or {}, near_duplicate_of=original)
+
+        batch.add(signature, row["content_hash"])
+        signatures.append((signature, row["content_hash"]))
+        kept.append(row)
+
+    return kept, signatures, suppressed
+
+
+def remember(signatures):
+    # nothing to remember with the stage off, and no index to warm for it
+    if NEAR_DUP_MODE == "off" or not signatures:
+        return
+
+    index = get_near_dup_index()
+
+    for signature, content_hash in signatures:
+        index.add(signature, content_hash)
@@ -0,0 +1,186 @@
+# ingestion/registry.py
+
+import os
+import json
+import asyncio
+import importlib
+import threading
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Optional, Union
+
+from ingestion.resilience import set_policy
+
+
+# -----------------------------------------------------
+# SOURCE SPEC
+# -----------------------------------------------------
+# Every source declares how it is fetched and how it is scheduled and
+# throttled. fetch is a callable (or "module:function" path, imported
+# on first use) returning an async iterator of record dicts. A plain
+# iterator is accepted too and is driven from a worker thread, so
+# blocking clients (praw, googleapiclient, feedparser) never stall the
+# shared loop.
+
+DEFAULT_INTERVAL = 15       # minutes between scheduled runs
+DEFAULT_DEADLINE = 60       # seconds a run may take
+
+SOURCES_CONFIG = os.getenv(
+    "INGESTION_SOURCES",
+    os.path.join(os.path.dirname(__file__), "sources.json")
+)
+
+THREAD_CHUNK = 50           # records pulled per hop from a sync collector's thread
+
+
+@dataclass
+class SourceSpec:
+    name: str
+    fetch: Union[Callable, str]
+    interval_minutes: int = DEFAULT_INTERVAL
+    deadline: int = DEFAULT_DEADLINE
+    enabled: bool = True
+
+    # throttling; None keeps the defaults in ingestion.resilience
+    concurrency: Optional[int] = None
+    rate_per_minute: Optional[float] = None
+    burst: Optional[int] = None
+    daily_quota: Optional[int] = None
+
+    options: dict = field(default_factory=dict)     # free-form, for the collector's own use
+
+    def load(self) -> Callable:
+        if isinstance(self.fetch, str):
+            module, _, attr = self.fetch.partition(":")
+            self.fetch = getattr(importlib.import_module(module), attr)
+
+        return self.fetch
+
+    def open(self) -> Any:
+        """Start a run: the source's records as an async iterator."""
+        records = self.load()()
+
+        if hasattr(records, "__aiter__"):
+            return records
+
+        return iterate_in_thread(records)
+
+
+def _take(iterator, count):
+    items = []
+    for item in iterator:
+        items.append(item)
+        if len(items) >= count:
+            break
+    return items
+
+
+async def iterate_in_thread(records, chunk=THREAD_CHUNK):
+    """Async view of a blocking iterator, advanced in a worker thread."""
+    iterator = iter(records)
+
+    try:
+        while True:
+            # to_thread carries our context, so telemetry still attributes
+            # the collector's fetches to its run
+            items = await asyncio.to_thread(_take, iterator, chunk)
+            if not items:
+                return
+
+            for item in items:
+                yield item
+
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                # cancelled mid-_take: the thread is still inside the
+                # generator and will finish on its own
+                pass
+
+
+# -----------------------------------------------------
+# REGISTRY
+# -----------------------------------------------------
+
+_specs: dict = {}
+_lock = threading.Lock()
+_loaded = False
+
+_SPEC_FIELDS = {f.name for f in fields(SourceSpec)}
+
+
+def register(spec: SourceSpec) -> SourceSpec:
+    """Add or replace a source. Its throttling settings become its policy."""
+    with _lock:
+        _specs[spec.name] = spec
+
+    set_policy(
+        spec.name,
+        concurrency=spec.concurrency,
+        rate_per_minute=spec.rate_per_minute,
+        burst=spec.burst,
+        daily_quota=spec.daily_quota
+    )
+    return spec
+
+
+def source(name, **settings):
+    """Decorator form of register() for collectors defined in code."""
+    def decorator(func):
+        register(SourceSpec(name=name, fetch=func, **settings))
+        return func
+    return decorator
+
+
+def load_config(path=SOURCES_CONFIG):
+    """
+    Register sources from a JSON file: {name: {"fetch": "module:function",
+    ...SourceSpec fields}}. Entries for an already registered name update it.
+    """
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    for name, settings in config.items():
+        unknown = set(settings) - (_SPEC_FIELDS - {"name"})
+        if unknown:
+            raise ValueError(f"source '{name}': unknown settings {sorted(unknown)}")
+
+        existing = _specs.get(name)
+        if existing is not None:
+            merged = {f: getattr(existing, f) for f in _SPEC_FIELDS}
+            merged.update(settings)
+            register(SourceSpec(**merged))
+        else:
+            register(SourceSpec(name=name, **settings))
+
+
+def _ensure_loaded():
+    global _loaded
+
+    if _loaded:
+        return
+
+    with _lock:
+        if _loaded:
+            return
+        _loaded = True
+
+    if os.path.exists(SOURCES_CONFIG):
+        load_config(SOURCES_CONFIG)
+
+
+def get_source(name) -> Optional[SourceSpec]:
+    _ensure_loaded()
+    return _specs.get(name)
+
+
+def get_sources(include_disabled=False) -> dict:
+    _ensure_loaded()
+
+    with _lock:
+        return {
+            name: spec for name, spec in _specs.items()
+            if include_disabled or spec.enabled
+        }
@@ -0,0 +1,412 @@
+# ingestion/resilience.py
+
+import os
+import time
+import random
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+
+# -----------------------------------------------------
+# PER-SOURCE POLICIES
+# -----------------------------------------------------
+# rate_per_minute / burst  - token bucket in front of every request
+# daily_quota              - requests per UTC day (None = untracked)
+# failure_threshold        - consecutive failures before the circuit opens
+# cooldown / max_cooldown  - first open period, doubled on every re-trip
+# max_retries              - in-call retries (backoff + jitter) per request
+# per_host                 - keep one breaker per upstream host instead of
+#                            one for the whole source (feed lists)
+# concurrency              - max requests in flight for the source (None = no cap)
+
+class SourcePolicy:
+
+    def __init__(self, rate_per_minute=60, burst=5, daily_quota=None,
+                 failure_threshold=3, cooldown=300, max_cooldown=3600,
+                 max_retries=2, per_host=False, concurrency=None):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.daily_quota = daily_quota
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.max_retries = max_retries
+        self.per_host = per_host
+        self.concurrency = concurrency
+
+
+def _quota(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+DEFAULT_POLICY = SourcePolicy()
+
+SOURCE_POLICIES = {
+    # developer plan: 100 requests/day
+    "newsapi": SourcePolicy(rate_per_minute=30, burst=5, daily_quota=_quota("NEWSAPI_DAILY_QUOTA", 100)),
+    # 10,000 units/day at 100 units per search.list call
+    "youtube": SourcePolicy(rate_per_minute=10, burst=2, daily_quota=_quota("YOUTUBE_DAILY_QUOTA", 100)),
+    "gdelt": SourcePolicy(rate_per_minute=60, burst=10),
+    "gdelt_events": SourcePolicy(rate_per_minute=30, burst=10),
+    "regional_rss": SourcePolicy(rate_per_minute=120, burst=20, per_host=True),
+    "rss": SourcePolicy(rate_per_minute=120, burst=20, per_host=True),
+    # article pages: polite per publisher domain, no retries (best effort),
+    # and never more than a few of the shared pool's connections
+    "enrichment": SourcePolicy(rate_per_minute=20, burst=2, max_retries=0, cooldown=600, per_host=True,
+                               concurrency=8),
+    # flood waits open the circuit straight away (see telegram collector)
+    "telegram": SourcePolicy(rate_per_minute=30, burst=5, max_retries=0),
+}
+
+BACKOFF_BASE = 1.0          # seconds; doubled per retry, full jitter
+BACKOFF_CAP = 30.0
+MAX_RETRY_AFTER = 60        # longer Retry-After hints open the circuit instead
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+FAILURE_STATUS = RETRYABLE_STATUS | {401, 403}
+
+
+def set_policy(source, **overrides):
+    """
+    Override fields of a source's policy (e.g. from the source registry).
+    Takes effect for guards created afterwards.
+    """
+    base = SOURCE_POLICIES.get(source, DEFAULT_POLICY)
+    fields = dict(vars(base))
+    fields.update({k: v for k, v in overrides.items() if v is not None})
+
+    SOURCE_POLICIES[source] = SourcePolicy(**fields)
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_CAP):
+    """Full-jitter exponential backoff for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def retry_after_seconds(headers):
+    """Retry-After as seconds (delta or HTTP date), or None."""
+    value = (headers or {}).get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _utc_day():
+    return datetime.now(timezone.utc).date()
+
+
+# -----------------------------------------------------
+# TOKEN BUCKET
+# -----------------------------------------------------
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. reserve() takes a token now and returns how
+    long the caller must wait before using it, so sync callers can
+    time.sleep() and async callers asyncio.sleep() on the same bucket.
+    """
+
+    def __init__(self, rate_per_minute, burst):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+
+            # in debt: wait until the bucket has refilled back to zero
+            return -self._tokens / self.rate
+
+    @property
+    def tokens(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+# -----------------------------------------------------
+# CIRCUIT BREAKER
+# -----------------------------------------------------
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    closed    - calls go through; consecutive failures are counted
+    open      - calls are refused until the cooldown has passed
+    half_open - one probe call is let through; success closes the
+                circuit, failure re-opens it with a doubled cooldown
+    """
+
+    def __init__(self, failure_threshold, cooldown, max_cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self.state = CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_error = None
+        self.last_failure_at = None
+        self.last_success_at = None
+
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+
+            if self.state == OPEN:
+                if time.monotonic() < self.open_until:
+                    return False
+                self.state = HALF_OPEN
+                self._probing = False
+
+            # half open: a single probe at a time
+            if self._probing:
+                return False
+
+            self._probing = True
+            return True
+
+    def release_probe(self):
+        """
+        Give back a half-open probe that ended without an outcome (e.g.
+        cancelled before it was sent); no-op once success or failure
+        has been recorded.
+        """
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def available(self):
+        """Like allow(), without claiming the half-open probe."""
+        with self._lock:
+            return self.state != OPEN or time.monotonic() >= self.open_until
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+            self.last_success_at = datetime.now(timezone.utc)
+
+    def record_failure(self, error=None, retry_after=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            self.last_failure_at = datetime.now(timezone.utc)
+
+            if (self.state == HALF_OPEN or self.failures >= self.failure_threshold
+                    or retry_after is not None):
+                self._open(retry_after)
+
+    def _open(self, retry_after=None):
+        cooldown = min(self.cooldown * 2 ** self.trips, self.max_cooldown)
+        # jitter so sources tripped together don't all probe together
+        cooldown *= random.uniform(0.9, 1.1)
+
+        if retry_after is not None:
+            cooldown = max(cooldown, retry_after)
+
+        self.state = OPEN
+        self.trips += 1
+        self.open_until = time.monotonic() + cooldown
+        self._probing = False
+
+    def reset(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.trips = 0
+            self._probing = False
+
+    def retry_in(self):
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(self.open_until - time.monotonic(), 0.0)
+
+
+# -----------------------------------------------------
+# SOURCE GUARD (bucket + breaker + quota)
+# -----------------------------------------------------
+
+class SourceGuard:
+
+    def __init__(self, name, policy):
+        self.name = name
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate_per_minute, policy.burst)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.cooldown, policy.max_cooldown)
+
+        self._quota_day = _utc_day()
+        self.quota_used = 0
+        self._lock = threading.Lock()
+
+    # ── quota ──
+
+    def _roll_quota(self):
+        today = _utc_day()
+        if today != self._quota_day:
+            self._quota_day = today
+            self.quota_used = 0
+
+    def quota_exhausted(self):
+        if self.policy.daily_quota is None:
+            return False
+
+        with self._lock:
+            self._roll_quota()
+            return self.quota_used >= self.policy.daily_quota
+
+    def _spend_quota(self):
+        with self._lock:
+            self._roll_quota()
+            self.quota_used += 1
+
+    # ── gate ──
+
+    def available(self):
+        return self.breaker.available() and not self.quota_exhausted()
+
+    def unavailable_reason(self):
+        if self.quota_exhausted():
+            return f"daily quota of {self.policy.daily_quota} requests used"
+
+        retry_in = self.breaker.retry_in()
+        if retry_in:
+            return f"circuit open for another {retry_in:.0f}s ({self.breaker.last_error})"
+
+        if self.breaker.state == HALF_OPEN:
+            return f"half-open, probe in flight ({self.breaker.last_error})"
+
+        return None
+
+    def admit(self):
+        """
+        Claim permission for one request. Returns the seconds to wait
+        before sending it, or None if the request must not be sent.
+        """
+        if self.quota_exhausted() or not self.breaker.allow():
+            return None
+
+        self._spend_quota()
+        return self.bucket.reserve()
+
+    def claimed_probe(self):
+        """True right after an admit() that took the half-open probe."""
+        return self.breaker.state == HALF_OPEN
+
+    def release_probe(self):
+        self.breaker.release_probe()
+
+    def acquire(self):
+        """Blocking admit() for sync callers; False if refused."""
+        wait = self.admit()
+        if wait is None:
+            return False
+
+        if wait:
+            time.sleep(wait)
+        return True
+
+    def record_success(self):
+        self.breaker.record_success()
+
+    def record_failure(self, error=None, retry_after=None):
+        self.breaker.record_failure(error, retry_after)
+
+    def snapshot(self):
+        breaker = self.breaker
+        retry_in = breaker.retry_in()
+
+        return {
+            "source": self.name,
+            "state": breaker.state,
+            "available": self.available(),
+            "consecutive_failures": breaker.failures,
+            "trips": breaker.trips,
+            "retry_in_seconds": round(retry_in, 1),
+            "open_until": (
+                (datetime.now(timezone.utc) + timedelta(seconds=retry_in)).isoformat()
+                if retry_in else None
+            ),
+            "last_error": breaker.last_error,
+            "last_failure_at": breaker.last_failure_at.isoformat() if breaker.last_failure_at else None,
+            "last_success_at": breaker.last_success_at.isoformat() if breaker.last_success_at else None,
+            "tokens": round(self.bucket.tokens, 2),
+            "rate_per_minute": self.policy.rate_per_minute,
+            "quota_used": self.quota_used,
+            "daily_quota": self.policy.daily_quota,
+        }
+
+
+# -----------------------------------------------------
+# REGISTRY
+# -----------------------------------------------------
+# Guards live in-process: the scheduler and the operations API see the
+# same state when they run in the same process.
+
+_guards = {}
+_guards_lock = threading.Lock()
+
+
+def get_guard(source, host=None):
+    policy = SOURCE_POLICIES.get(source, DEFAULT_POLICY)
+    key = f"{source}/{host}" if host and policy.per_host else source
+
+    with _guards_lock:
+        guard = _guards.get(key)
+        if guard is None:
+            guard = _guards[key] = SourceGuard(key, policy)
+
+    return guard
+
+
+def source_health():
+    with _guards_lock:
+        guards = list(_guards.values())
+
+    return sorted((guard.snapshot() for guard in guards), key=lambda s: s["source"])
+
+
+def reset_source(source):
+    """Close every breaker belonging to source; returns how many."""
+    with _guards_lock:
+        guards = [g for key, g in _guards.items() if key == source or key.startswith(f"{source}/")]
+
+    for guard in guards:
+        guard.breaker.reset()
+
+    return len(guards)
@@ -1,34 +1,109 @@
-from ingestion.collectors.news import collect_news
-from ingestion.collectors.regional_rss import collect_regional_rss
-from ingestion.collectors.youtube import collect_youtube
-from ingestion.collectors.telegram import collect_telegram
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-from ingestion.utils import insert_records, log_ingestion
+from ingestion.utils import log_ingestion
+from ingestion.streaming import stream_records, StreamStats
+from ingestion.archive import archive_stream
+from ingestion.telemetry import SourceRun, bind
+from ingestion.resilience import get_guard
+from ingestion.registry import SourceSpec, get_source, get_sources
 
 
-def run_ingestion():
+# -----------------------------------------------------
+# SOURCES
+# -----------------------------------------------------
+# Sources, their deadlines and schedules come from ingestion.registry
+# (ingestion/sources.json). Collectors run on the shared ingestion loop;
+# the runner's threads only drain their records into the DB.
 
-    sources = {
-        "newsapi": collect_news,
-        "regional_rss": collect_regional_rss,
-        "youtube": collect_youtube,
-        "telegram": collect_telegram
-    }
+def _resolve(sources):
+    """None (all enabled), names, or {name: fetch callable} -> {name: SourceSpec}."""
+    if sources is None:
+        return get_sources()
+
+    if isinstance(sources, dict):
+        resolved = {}
+        for name, fetch in sources.items():
+            if isinstance(fetch, SourceSpec):
+                resolved[name] = fetch
+                continue
+
+            # ad-hoc callable (benchmarks, tests): keep the registered deadline
+            registered = get_source(name)
+            resolved[name] = SourceSpec(
+                name=name,
+                fetch=fetch,
+                deadline=registered.deadline if registered else SourceSpec.deadline
+            )
+        return resolved
+
+    resolved = {}
+    for name in sources:
+        spec = get_source(name)
+        if spec is None:
+            raise ValueError(f"unknown source: {name}")
+        resolved[name] = spec
+    return resolved
+
+
+def _available(sources):
+
+    # an open circuit or a spent quota costs nothing this cycle
+    runnable = {}
+
+    for name, spec in sources.items():
+        guard = get_guard(name)
+
+        if guard.available():
+            runnable[name] = spec
+            continue
+
+        log_ingestion(
+            source=name,
+            fetched=0,
+            inserted=0,
+            status="circuit_open",
+            error_message=guard.unavailable_reason(),
+            duration=0
+        )
+
+    return runnable
+
+
+def _collect_and_insert(name, spec, cancelled, stats, run):
+
+    # records are written in micro-batches while the collector is still
+    # running; once cancelled, nothing more is written
+    started = time.monotonic()
+
+    with bind(run):
+        stream_records(archive_stream(spec.open(), name), cancelled=cancelled, stats=stats)
+
+    return stats.fetched, stats.inserted, time.monotonic() - started
+
+
+def _run_sequential(sources):
 
     total_inserted = 0
 
-    for name, func in sources.items():
+    for name, spec in sources.items():
+
+        started = time.monotonic()
+        stats = StreamStats()
+        run = SourceRun(name)
 
         try:
-            records = func()
-            inserted = insert_records(records)
+            fetched, inserted, duration = _collect_and_insert(name, spec, threading.Event(), stats, run)
 
             log_ingestion(
                 source=name,
-                fetched=len(records),
+                fetched=fetched,
                 inserted=inserted,
                 status="success",
-                error_message=None
+                error_message=None,
+                duration=duration,
+                run=run
             )
 
             total_inserted += inserted
@@ -36,10 +111,103 @@ def run_ingestion():
         except Exception as e:
             log_ingestion(
                 source=name,
-                fetched=0,
-                inserted=0,
+                fetched=stats.fetched,
+                inserted=stats.inserted,
                 status="failed",
-                error_message=str(e)
+                error_message=str(e),
+                duration=time.monotonic() - started,
+                run=run
             )
 
     return total_inserted
+
+
+def _run_concurrent(sources):
+
+    total_inserted = 0
+    cycle_start = time.monotonic()
+
+    executor = ThreadPoolExecutor(
+        max_workers=len(sources),
+        thread_name_prefix="ingestion"
+    )
+
+    jobs = {}
+    for name, spec in sources.items():
+        cancelled = threading.Event()
+        stats = StreamStats()
+        run = SourceRun(name)
+        jobs[name] = (executor.submit(_collect_and_insert, name, spec, cancelled, stats, run), cancelled, stats, run)
+
+    try:
+        for name, (future, cancelled, stats, run) in jobs.items():
+
+            deadline = sources[name].deadline
+            remaining = max(deadline - (time.monotonic() - cycle_start), 0)
+
+            try:
+                fetched, inserted, duration = future.result(timeout=remaining)
+
+                log_ingestion(
+                    source=name,
+                    fetched=fetched,
+                    inserted=inserted,
+                    status="success",
+                    error_message=None,
+                    duration=duration,
+                    run=run
+                )
+
+                total_inserted += inserted
+
+            except FutureTimeout:
+                # cancels the collector on the shared loop and stops the
+                # writer; batches flushed before the deadline are kept
+                cancelled.set()
+                future.cancel()
+
+                log_ingestion(
+                    source=name,
+                    fetched=stats.fetched,
+                    inserted=stats.inserted,
+                    status="timeout",
+                    error_message=f"deadline of {deadline}s exceeded",
+                    duration=time.monotonic() - cycle_start,
+                    run=run
+                )
+
+            except Exception as e:
+                # stream_records has already stopped the collector; make sure
+                cancelled.set()
+
+                log_ingestion(
+                    source=name,
+                    fetched=stats.fetched,
+                    inserted=stats.inserted,
+                    status="failed",
+                    error_message=str(e),
+                    duration=time.monotonic() - cycle_start,
+                    run=run
+                )
+
+    finally:
+        # don't block the cycle on sources that blew their deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return total_inserted
+
+
+def run_ingestion(concurrent=True, sources=None):
+    """
+    One ingestion cycle. sources: None for every enabled registered
+    source, a list of source names, or {name: fetch callable}.
+    """
+    sources = _available(_resolve(sources))
+
+    if not sources:
+        return 0
+
+    if concurrent:
+        return _run_concurrent(sources)
+
+    return _run_sequential(sources)
@@ -1,32 +1,47 @@
 from apscheduler.schedulers.blocking import BlockingScheduler
 import logging
 
-from ingestion.collectors.news import collect_news
 from ai_engine.pipeline import process_unprocessed_records
+from ai_engine.dispatcher import PipelineDispatcher
 from ingestion.runner import run_ingestion
+from ingestion.registry import get_sources
 
 
 logging.basicConfig(level=logging.INFO)
 
 scheduler = BlockingScheduler()
 
+# Pushes freshly inserted IDs straight into the AI pipeline
+dispatcher = PipelineDispatcher(mode="local")
 
 
-def ingestion_job():
-    print("Running ingestion pipeline...")
-    run_ingestion()
+def ingestion_job(source):
+    print(f"Running ingestion for {source}...")
+    run_ingestion(sources=[source])
 
 def ai_processing_job():
     logging.info("Running AI processing job...")
     process_unprocessed_records()
 
 
+# One job per registered source, on its own interval (ingestion/sources.json);
+# a source still running when its next turn comes is not started twice
+for name, spec in get_sources().items():
+    scheduler.add_job(
+        ingestion_job, 'interval',
+        minutes=spec.interval_minutes,
+        args=[name],
+        id=f"ingest:{name}",
+        max_instances=1,
+        coalesce=True
+    )
+
 # Run every 15 minutes
-scheduler.add_job(ingestion_job, 'interval', minutes=15)
+# (the AI job is now a sweep for anything the dispatcher missed or failed)
 scheduler.add_job(ai_processing_job, 'interval', minutes=15)
 
 
 if __name__ == "__main__":
     logging.info("🚀 OSNIT Full Pipeline Scheduler Started...")
+    dispatcher.start()
     scheduler.start()
-
@@ -0,0 +1,242 @@
+# ingestion/streaming.py
+
+import queue
+import logging
+import asyncio
+import threading
+import contextvars
+import time
+import concurrent.futures
+
+from ingestion.utils import insert_records
+from ingestion.telemetry import timed
+from ingestion.fetcher import submit
+
+
+# -----------------------------------------------------
+# STREAM TUNING
+# -----------------------------------------------------
+
+QUEUE_SIZE = 1000        # records buffered between a collector and its writer
+BATCH_SIZE = 200         # micro-batch size handed to insert_records
+FLUSH_INTERVAL = 2.0     # max seconds a partial batch waits before flushing
+PUT_POLL = 0.5           # how often a blocked producer re-checks cancellation
+
+_DONE = object()
+
+logger = logging.getLogger(__name__)
+
+
+class StreamStats:
+    """Running counts, readable while the stream is still in progress."""
+
+    def __init__(self):
+        self.fetched = 0
+        self.inserted = 0
+        self.batches = 0
+
+
+# -----------------------------------------------------
+# CHECKPOINTS (progress saved only once it is committed)
+# -----------------------------------------------------
+# A collector's cursors, watermarks and feed caches must not move past
+# records that never reached the DB. Instead of saving them itself, a
+# collector yields a Checkpoint after the records it covers; the writer
+# flushes everything before it and only then calls on_commit(). A stream
+# that fails or is cancelled first never calls it, so the next run
+# starts from the last committed position.
+
+class Checkpoint:
+
+    def __init__(self, on_commit):
+        self.on_commit = on_commit
+
+
+def records_only(items):
+    """The records of a collector's output, without its checkpoints."""
+    return [item for item in items if not isinstance(item, Checkpoint)]
+
+
+# -----------------------------------------------------
+# PRODUCER (collector -> bounded queue)
+# -----------------------------------------------------
+# A collector is any iterator or async iterator of record dicts.
+# The producer thread blocks when the queue is full, so a fast collector
+# can never buffer more than QUEUE_SIZE records ahead of the writer.
+# Async collectors run on the shared ingestion loop (ingestion.fetcher)
+# rather than a loop of their own, and are cancelled outright when the
+# run is.
+
+def _put(buffer, item, cancelled):
+    while not cancelled.is_set():
+        try:
+            buffer.put(item, timeout=PUT_POLL)
+            return True
+        except queue.Full:
+            continue
+
+    return False
+
+
+async def _drain_async(records, buffer, cancelled):
+    try:
+        async for record in records:
+            if cancelled.is_set():
+                return
+
+            try:
+                buffer.put_nowait(record)
+            except queue.Full:
+                # don't stall the collector's event loop while waiting for space
+                if not await asyncio.to_thread(_put, buffer, record, cancelled):
+                    return
+
+    finally:
+        # a collector stopped early still gets to clean up (sessions, cursors)
+        aclose = getattr(records, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def _run_on_loop(coro, cancelled):
+    future = submit(coro)
+
+    while True:
+        try:
+            return future.result(timeout=PUT_POLL)
+        except concurrent.futures.TimeoutError:
+            if cancelled.is_set():
+                # raises CancelledError inside the collector at its next await
+                future.cancel()
+        except concurrent.futures.CancelledError:
+            return
+
+
+def _produce(records, buffer, cancelled, errors):
+    try:
+        if hasattr(records, "__aiter__"):
+            _run_on_loop(_drain_async(records, buffer, cancelled), cancelled)
+        else:
+            try:
+                for record in records:
+                    if not _put(buffer, record, cancelled):
+                        return
+            finally:
+                close = getattr(records, "close", None)
+                if close is not None:
+                    close()
+
+    except Exception as e:
+        errors.append(e)
+
+    finally:
+        _put(buffer, _DONE, cancelled)
+
+
+# -----------------------------------------------------
+# WRITER (bounded queue -> insert_records micro-batches)
+# -----------------------------------------------------
+
+def _drain(buffer):
+    while True:
+        try:
+            buffer.get_nowait()
+        except queue.Empty:
+            return
+
+
+def _commit(checkpoint):
+    try:
+        checkpoint.on_commit()
+    except Exception as e:
+        # the records are in; the next run re-reads them and dedup drops them
+        logger.warning(f"[Ingestion] Checkpoint not saved: {e}")
+
+
+def stream_records(records, cancelled=None, stats=None,
+                   batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+    """
+    Drain a collector's iterator into the DB in micro-batches as records
+    arrive. Returns the StreamStats; re-raises a collector error after
+    everything yielded before it has been written. A failed insert is
+    raised too, once the collector has been stopped. cancelled is set
+    when the stream ends, either way. Checkpoints are committed in order
+    as the records before them are written.
+    """
+
+    cancelled = cancelled or threading.Event()
+    stats = stats or StreamStats()
+    buffer = queue.Queue(maxsize=QUEUE_SIZE)
+    errors = []
+
+    # the producer inherits our context so its fetches count towards the
+    # same telemetry run
+    context = contextvars.copy_context()
+
+    producer = threading.Thread(
+        target=context.run,
+        args=(_produce, records, buffer, cancelled, errors),
+        name="ingestion-producer",
+        daemon=True
+    )
+    producer.start()
+
+    batch = []
+    batch_started = None
+
+    def flush():
+        nonlocal batch, batch_started
+
+        if batch and not cancelled.is_set():
+            with timed("insert"):
+                stats.inserted += insert_records(batch, bulk=True)
+            stats.batches += 1
+
+        batch = []
+        batch_started = None
+
+    try:
+        while not cancelled.is_set():
+
+            timeout = flush_interval
+            if batch_started is not None:
+                timeout = max(flush_interval - (time.monotonic() - batch_started), 0)
+
+            try:
+                item = buffer.get(timeout=timeout)
+            except queue.Empty:
+                flush()
+                continue
+
+            if item is _DONE:
+                break
+
+            if isinstance(item, Checkpoint):
+                flush()
+                if not cancelled.is_set():
+                    _commit(item)
+                continue
+
+            stats.fetched += 1
+            batch.append(item)
+
+            if batch_started is None:
+                batch_started = time.monotonic()
+
+            if len(batch) >= batch_size:
+                flush()
+
+        flush()
+
+    finally:
+        # however the writer stops (done, cancelled, or a failed insert),
+        # stop the producer too: a blocked _put returns, an async
+        # collector is cancelled on the shared loop
+        cancelled.set()
+        _drain(buffer)
+        producer.join(timeout=PUT_POLL * 2)
+
+    if errors:
+        raise errors[0]
+
+    return stats
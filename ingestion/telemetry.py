@@ -0,0 +1,81 @@
+# ingestion/telemetry.py
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+
+# -----------------------------------------------------
+# PER-SOURCE RUN TELEMETRY
+# -----------------------------------------------------
+# The runner binds one SourceRun per source for the duration of its
+# collection. Anything running in that context (fetcher calls, collector
+# parsing, the stream writer) adds to it through current_run(), and the
+# totals land in that source's IngestionLog row.
+
+_current = contextvars.ContextVar("ingestion_source_run", default=None)
+
+
+class SourceRun:
+
+    def __init__(self, source):
+        self.source = source
+
+        self.fetch_seconds = 0.0
+        self.parse_seconds = 0.0
+        self.insert_seconds = 0.0
+        self.bytes_downloaded = 0
+        self.http_status = {}
+
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            setattr(self, f"{stage}_seconds", getattr(self, f"{stage}_seconds") + seconds)
+
+    def record_responses(self, results, wall_seconds):
+        """Account for one fetch()/fetch_many() call (wall time, not summed)."""
+        with self._lock:
+            self.fetch_seconds += wall_seconds
+
+            for result in results:
+                self.bytes_downloaded += len(result.content) + result.streamed_bytes
+
+                key = "error" if result.error else str(result.status)
+                self.http_status[key] = self.http_status.get(key, 0) + 1
+
+    def as_columns(self):
+        with self._lock:
+            return {
+                "fetch_seconds": round(self.fetch_seconds, 4),
+                "parse_seconds": round(self.parse_seconds, 4),
+                "insert_seconds": round(self.insert_seconds, 4),
+                "bytes_downloaded": self.bytes_downloaded,
+                "http_status": dict(self.http_status),
+            }
+
+
+def current_run():
+    return _current.get()
+
+
+@contextmanager
+def bind(run):
+    token = _current.set(run)
+    try:
+        yield run
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(stage):
+    """Add the block's wall time to the current run's <stage>_seconds."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        run = _current.get()
+        if run is not None:
+            run.add_time(stage, time.monotonic() - started)
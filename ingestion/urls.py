@@ -0,0 +1,116 @@
+# ingestion/urls.py
+
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, unquote
+
+
+# -----------------------------------------------------
+# URL CANONICALIZATION
+# -----------------------------------------------------
+# One spelling per article, so caches and dedup keyed on URLs don't miss
+# on cosmetic differences: the same story reaches us from NewsAPI, GDELT
+# and RSS with different tracking parameters, hosts and AMP variants.
+# The canonical form is an identity key, not necessarily a fetchable
+# address (the scheme is always https, "www." is dropped).
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# host prefixes that serve the same page as the bare domain
+HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+
+# query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "ito", "ns_mchannel",
+    "ns_source", "ns_campaign", "ns_linkname", "ns_fee", "ocid", "smid", "sr_share",
+    "_ga", "_gl", "amp", "outputtype",
+    # added by the AMP cache / Google viewer
+    "amp_js_v", "amp_gsa", "amp_r", "usqp",
+}
+TRACKING_PREFIXES = ("utm_", "pk_", "mtm_")
+
+# Google AMP cache: https://example-com.cdn.ampproject.org/c/s/example.com/story
+AMP_CACHE_SUFFIX = ".cdn.ampproject.org"
+_AMP_CACHE_PATH = re.compile(r"^/[a-z](?:/s)?/(?P<url>.+)$")
+
+# /amp, /amp/, .amp, .amp.html and /amp/<rest> spellings of an article path
+_AMP_PATH_SUFFIX = re.compile(r"(?:/amp/?|\.amp)(\.html?)?$", re.I)
+_AMP_PATH_PREFIX = re.compile(r"^/amp(?=/)", re.I)
+
+
+def _is_tracking(name):
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+def _strip_amp_path(path):
+    path = _AMP_PATH_PREFIX.sub("", path)
+    return _AMP_PATH_SUFFIX.sub(lambda m: m.group(1) or "", path) or "/"
+
+
+def _resolve_amp_cache(host, path, query):
+    """Origin (host, path, query) behind an AMP cache URL, or None."""
+    if not host.endswith(AMP_CACHE_SUFFIX):
+        return None
+
+    match = _AMP_CACHE_PATH.match(path)
+    if not match:
+        return None
+
+    origin = urlsplit("https://" + unquote(match.group("url")))
+    if not origin.hostname:
+        return None
+
+    # the path can't carry a "?": the cache URL's own query is the origin's
+    return origin.hostname, origin.path, origin.query or query
+
+
+def canonicalize_url(url):
+    """
+    Canonical spelling of an article URL: https scheme, lower-case host
+    without "www."/"m."/"amp." prefixes or default ports, AMP cache and
+    AMP path variants resolved to the article, tracking parameters
+    (utm_*, fbclid, ...) dropped and the rest sorted, no fragment and no
+    trailing slash. Returns None for anything that isn't an http(s) URL.
+    """
+    if not url:
+        return None
+
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower().rstrip(".")
+    path = parts.path
+    query = parts.query
+
+    origin = _resolve_amp_cache(host, path, query)
+    if origin:
+        host, path, query = origin
+        host = host.lower()
+        port = None
+
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+
+    if port and port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{port}"
+
+    path = _strip_amp_path(path or "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    params = sorted(
+        (name, value) for name, value in parse_qsl(query, keep_blank_values=True)
+        if not _is_tracking(name)
+    )
+
+    return urlunsplit(("https", host, path, urlencode(params), ""))
@@ -1,8 +1,21 @@
 # ingestion/utils.py
 
 import hashlib
+import logging
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from database import SessionLocal
 from models import RawOSINT, IngestionLog
+from ingestion.dedup import get_content_filter
+from ingestion.near_dup import screen_rows, remember
+from ingestion.events import notify_inserted, publish_inserted
+from ingestion.urls import canonicalize_url
+
+
+logger = logging.getLogger(__name__)
+
+# rows per multi-row INSERT statement in bulk mode
+BULK_CHUNK_SIZE = 500
 
 
 # -----------------------------------------------------
@@ -17,9 +30,13 @@ def generate_hash(text: str) -> str:
 # INSERT RECORDS SAFELY (DUPLICATE-PROOF)
 # -----------------------------------------------------
 
-def insert_records(records):
+def insert_records(records, bulk=False):
+
+    if bulk:
+        return insert_records_bulk(records)
 
     db = SessionLocal()
+    seen = get_content_filter()
     inserted = 0
 
     for record in records:
@@ -30,30 +47,39 @@ def insert_records(records):
 
         content_hash = generate_hash(content)
 
-        # Check if already exists
-        exists = db.query(RawOSINT.id).filter(
-            RawOSINT.content_hash == content_hash
-        ).first()
+        # Only a possible filter hit needs the DB to confirm
+        if seen.might_contain(content_hash):
+            exists = db.query(RawOSINT.id).filter(
+                RawOSINT.content_hash == content_hash
+            ).first()
+
+            if exists:
+                seen.record_confirmed()
+                continue
 
-        if exists:
+        row = _build_row(record, content, content_hash)
+
+        # Same article under another headline / tracking link?
+        if row["canonical_url"] and db.query(RawOSINT.id).filter(
+            RawOSINT.canonical_url == row["canonical_url"]
+        ).first():
+            continue
+
+        # Near-identical to something recent (re-titled wire copy)?
+        rows, signatures, _ = screen_rows([row])
+        if not rows:
             continue
 
         try:
-            obj = RawOSINT(
-                source=record.get("source"),
-                content=content,
-                url=record.get("url"),
-                country=record.get("country"),
-                state=record.get("state"),
-                geo_lat=record.get("geo_lat"),
-                geo_lon=record.get("geo_lon"),
-                extra_metadata=record.get("metadata"),
-                content_hash=content_hash,
-                processed=False
-            )
+            obj = RawOSINT(**rows[0])
 
             db.add(obj)
+            db.flush()
+            notify_inserted(db, [obj.id])
             db.commit()   # commit per record
+            seen.add(content_hash)
+            remember(signatures)
+            publish_inserted([obj.id])
             inserted += 1
 
         except Exception:
@@ -64,11 +90,208 @@ def insert_records(records):
     return inserted
 
 
+# -----------------------------------------------------
+# BULK INSERT (ONE TRANSACTION, SET-BASED DEDUP)
+# -----------------------------------------------------
+
+def _canonical_url(record):
+    # collectors whose url is provenance rather than identity (one
+    # article, many events) opt out with an explicit None
+    if "canonical_url" in record:
+        return record["canonical_url"]
+
+    return canonicalize_url(record.get("url"))
+
+
+def _build_row(record, content, content_hash):
+    return {
+        "source": record.get("source"),
+        "content": content,
+        "url": record.get("url"),
+        "canonical_url": _canonical_url(record),
+        "country": record.get("country"),
+        "state": record.get("state"),
+        "geo_lat": record.get("geo_lat"),
+        "geo_lon": record.get("geo_lon"),
+        "extra_metadata": record.get("metadata"),
+        "content_hash": content_hash,
+        "processed": False
+    }
+
+
+def _prepare_rows(records):
+    """
+    Hash the batch and drop in-batch duplicates (same content or same
+    canonical URL), keeping the first seen.
+    """
+
+    rows = {}
+    urls = set()
+
+    for record in records:
+
+        content = record.get("content")
+        if not content:
+            continue
+
+        content_hash = generate_hash(content)
+        if content_hash in rows:
+            continue
+
+        row = _build_row(record, content, content_hash)
+
+        canonical_url = row["canonical_url"]
+        if canonical_url:
+            if canonical_url in urls:
+                continue
+            urls.add(canonical_url)
+
+        rows[content_hash] = row
+
+    return list(rows.values())
+
+
+def _table_row(row):
+    # rows are keyed by model attribute (RawOSINT(**row) in the single
+    # path); a Core INSERT needs column names: extra_metadata -> "metadata"
+    columns = RawOSINT.__mapper__.columns
+    return {columns[attr].name: value for attr, value in row.items()}
+
+
+def _bulk_insert_statement(rows):
+    table = RawOSINT.__table__
+
+    return (
+        pg_insert(table)
+        .values([_table_row(row) for row in rows])
+        .on_conflict_do_nothing()
+        .returning(table.c.id)
+    )
+
+
+def _first_line(error):
+    # DB errors carry the statement and every parameter set; the first line is enough
+    return str(error).split("\n", 1)[0]
+
+
+def _insert_chunk(db, rows):
+    """
+    One multi-row INSERT in a savepoint. If a row's data makes it fail,
+    the rows are retried one by one so only the bad ones are skipped.
+    Connection-level errors are raised: nothing can be written then.
+    Returns (inserted_ids, rejected_rows).
+    """
+    try:
+        with db.begin_nested():
+            return [record_id for (record_id,) in db.execute(_bulk_insert_statement(rows))], []
+
+    except OperationalError:
+        raise
+
+    except SQLAlchemyError as e:
+        logger.warning(f"[Ingestion] Batch of {len(rows)} failed ({_first_line(e)}); retrying row by row")
+
+    inserted_ids = []
+    rejected = []
+
+    for row in rows:
+        try:
+            with db.begin_nested():
+                inserted_ids.extend(record_id for (record_id,) in db.execute(_bulk_insert_statement([row])))
+
+        except OperationalError:
+            raise
+
+        except SQLAlchemyError as e:
+            rejected.append(row)
+            logger.error(f"[Ingestion] Rejected {row['source']} row {row['content_hash'][:12]}: {_first_line(e)}")
+
+    return inserted_ids, rejected
+
+
+def insert_records_bulk(records):
+    """
+    Insert a batch with multi-row INSERT ... ON CONFLICT DO NOTHING
+    RETURNING id. The conflict covers both unique keys (content_hash and
+    canonical_url), and the returned ids give the exact number of rows
+    actually written, so duplicates are never counted as inserted. A
+    row the DB rejects is logged and skipped without failing the rest
+    of its chunk; a lost connection fails the whole batch.
+    """
+
+    rows = _prepare_rows(records)
+    if not rows:
+        return 0
+
+    seen = get_content_filter()
+    db = SessionLocal()
+    inserted_ids = []
+
+    try:
+        # Confirm possible filter hits with one IN query and drop the real
+        # duplicates; definite misses go straight to the INSERT
+        maybe = [row["content_hash"] for row in rows if seen.might_contain(row["content_hash"])]
+
+        if maybe:
+            existing = {
+                content_hash for (content_hash,) in db.query(RawOSINT.content_hash).filter(
+                    RawOSINT.content_hash.in_(maybe)
+                )
+            }
+            seen.record_confirmed(len(existing))
+            rows = [row for row in rows if row["content_hash"] not in existing]
+
+        # Same article already stored under another title: one IN query
+        # against the canonical_url index for the whole batch
+        urls = [row["canonical_url"] for row in rows if row["canonical_url"]]
+
+        if urls:
+            existing_urls = {
+                canonical_url for (canonical_url,) in db.query(RawOSINT.canonical_url).filter(
+                    RawOSINT.canonical_url.in_(urls)
+                )
+            }
+            rows = [row for row in rows if row["canonical_url"] not in existing_urls]
+
+        rows, signatures, _ = screen_rows(rows)
+
+        rejected = set()
+
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+
+            ids, bad_rows = _insert_chunk(db, rows[start:start + BULK_CHUNK_SIZE])
+            inserted_ids.extend(ids)
+            rejected.update(row["content_hash"] for row in bad_rows)
+
+        notify_inserted(db, inserted_ids)
+        db.commit()
+
+        if rejected:
+            rows = [row for row in rows if row["content_hash"] not in rejected]
+            signatures = [s for s in signatures if s[1] not in rejected]
+
+        # inserted or lost a race to a concurrent writer: either way it's in the DB now
+        for row in rows:
+            seen.add(row["content_hash"])
+
+        remember(signatures)
+        publish_inserted(inserted_ids)
+
+    except Exception:
+        db.rollback()
+        raise
+
+    finally:
+        db.close()
+
+    return len(inserted_ids)
+
+
 # -----------------------------------------------------
 # INGESTION LOGGING
 # -----------------------------------------------------
 
-def log_ingestion(source, fetched, inserted, status, error_message):
+def log_ingestion(source, fetched, inserted, status, error_message, duration=None, run=None):
 
     db = SessionLocal()
 
@@ -78,14 +301,20 @@ def log_ingestion(source, fetched, inserted, status, error_message):
             records_fetched=fetched,
             records_inserted=inserted,
             status=status,
-            error_message=error_message
+            error_message=error_message,
+            duration_seconds=duration,
+            # not inserted = exact or near duplicate (or empty content)
+            duplicate_count=max(fetched - inserted, 0),
+            **(run.as_columns() if run else {})
         )
 
         db.add(log)
         db.commit()
 
-    except Exception:
+    except Exception as e:
+        # the run itself went through; only its log row is lost
         db.rollback()
+        logger.error(f"[Ingestion] Could not log {source} run: {_first_line(e)}")
 
     finally:
         db.close()
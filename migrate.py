@@ -0,0 +1,162 @@
+"""
+migrate.py
+-----------
+Brings an existing database up to the current models. Safe to re-run:
+missing tables are created, columns / indexes added to tables that
+predate them use IF NOT EXISTS (Postgres), and rows stored before
+canonical_url existed get theirs filled in before its unique index.
+Usage:
+    python migrate.py
+"""
+
+from sqlalchemy import bindparam, text
+
+from database import Base, engine
+from ingestion.urls import canonicalize_url
+from models import IngestionLog, RawOSINT
+
+
+# -----------------------------------------------------
+# COLUMNS ADDED TO EXISTING TABLES
+# -----------------------------------------------------
+# create_all() never alters a table that already exists
+
+COLUMNS = [
+    # ingestion run timing (concurrent runner)
+    IngestionLog.__table__.c.duration_seconds,
+    # per-source telemetry
+    IngestionLog.__table__.c.fetch_seconds,
+    IngestionLog.__table__.c.parse_seconds,
+    IngestionLog.__table__.c.insert_seconds,
+    IngestionLog.__table__.c.bytes_downloaded,
+    IngestionLog.__table__.c.duplicate_count,
+    IngestionLog.__table__.c.http_status,
+    # cross-source dedup key
+    RawOSINT.__table__.c.canonical_url,
+]
+
+INDEXES = [
+    # same name Postgres gives the inline UNIQUE of a freshly created table,
+    # so this is a no-op there. Created after the canonical_url backfill.
+    "CREATE UNIQUE INDEX IF NOT EXISTS raw_osint_canonical_url_key ON raw_osint (canonical_url)",
+]
+
+
+def column_statements(dialect) -> list[str]:
+    """The ALTER TABLE statements, compiled for dialect."""
+    return [
+        f"ALTER TABLE {column.table.name} ADD COLUMN IF NOT EXISTS "
+        f"{column.name} {column.type.compile(dialect=dialect)}"
+        for column in COLUMNS
+    ]
+
+
+def statements(dialect) -> list[str]:
+    """The ALTER TABLE / CREATE INDEX statements, compiled for dialect."""
+    return column_statements(dialect) + INDEXES
+
+
+# -----------------------------------------------------
+# CANONICAL URL BACKFILL
+# -----------------------------------------------------
+
+BACKFILL_BATCH = 5_000
+
+SELECT_UNCANONICAL = text("""
+    SELECT id, url FROM raw_osint
+    WHERE canonical_url IS NULL AND url IS NOT NULL AND id > :after
+    ORDER BY id
+    LIMIT :limit
+""")
+
+SELECT_TAKEN = text(
+    "SELECT canonical_url FROM raw_osint WHERE canonical_url IN :urls"
+).bindparams(bindparam("urls", expanding=True))
+
+UPDATE_CANONICAL = text("UPDATE raw_osint SET canonical_url = :canonical_url WHERE id = :id")
+
+SELECT_COLLISIONS = text("""
+    SELECT canonical_url, COUNT(*) FROM raw_osint
+    WHERE canonical_url IS NOT NULL
+    GROUP BY canonical_url
+    HAVING COUNT(*) > 1
+    LIMIT 5
+""")
+
+
+def backfill_canonical_urls(bind=engine, batch_size=BACKFILL_BATCH) -> int:
+    """
+    Fill canonical_url for rows stored before it existed, one committed
+    batch at a time in id order. A row whose canonical URL is already
+    taken (by a newer row or an earlier one in the backfill) is a copy
+    of that article and keeps NULL. Returns the number of rows filled.
+    """
+    filled = 0
+    after = 0
+
+    while True:
+        with bind.begin() as conn:
+            rows = conn.execute(SELECT_UNCANONICAL, {"after": after, "limit": batch_size}).all()
+            if not rows:
+                return filled
+            after = rows[-1].id
+
+            # {canonical_url: id}; the first row of the batch keeps it
+            canonical = {}
+            for row in rows:
+                url = canonicalize_url(row.url)
+                if url:
+                    canonical.setdefault(url, row.id)
+
+            if not canonical:
+                continue
+
+            taken = set(conn.execute(SELECT_TAKEN, {"urls": list(canonical)}).scalars())
+            updates = [
+                {"id": row_id, "canonical_url": url}
+                for url, row_id in canonical.items() if url not in taken
+            ]
+            if updates:
+                conn.execute(UPDATE_CANONICAL, updates)
+            filled += len(updates)
+
+
+def check_canonical_collisions(bind=engine) -> None:
+    """Refuse to build the unique index over duplicate canonical URLs."""
+    with bind.connect() as conn:
+        collisions = conn.execute(SELECT_COLLISIONS).all()
+
+    if collisions:
+        examples = ", ".join(f"{url} ({count}x)" for url, count in collisions)
+        raise RuntimeError(
+            f"raw_osint has duplicate canonical_url values, e.g. {examples}; "
+            "resolve them before creating raw_osint_canonical_url_key"
+        )
+
+
+def migrate(bind=engine) -> int:
+    """Apply every step; returns how many canonical URLs were backfilled."""
+    # new tables (feed_validators, collector_cursors, article_cache, ...)
+    Base.metadata.create_all(bind)
+
+    with bind.begin() as conn:
+        for statement in column_statements(bind.dialect):
+            conn.execute(text(statement))
+
+    filled = backfill_canonical_urls(bind)
+    check_canonical_collisions(bind)
+
+    with bind.begin() as conn:
+        for statement in INDEXES:
+            conn.execute(text(statement))
+
+    return filled
+
+
+if __name__ == "__main__":
+    filled = migrate()
+
+    for statement in statements(engine.dialect):
+        print(f"✓ {statement}")
+    print(f"✓ canonical_url filled in for {filled} existing rows")
+    print("✅ Database schema is up to date.")
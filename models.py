@@ -34,6 +34,10 @@ class RawOSINT(Base):
 
     content_hash = Column(Text, unique=True)
 
+    # ingestion.urls.canonicalize_url(url): the same article reached
+    # through different sources / tracking links is stored once
+    canonical_url = Column(Text, unique=True)
+
     # models.py mein ye line add karein
     summary = Column(Text, nullable=True)
 
@@ -67,9 +71,74 @@ class IngestionLog(Base):
     status = Column(Text)
     error_message = Column(Text)
 
+    # wall-clock time of the collect + insert for this source
+    duration_seconds = Column(Float)
+
+    # where that time went, and what came over the wire
+    fetch_seconds = Column(Float)
+    parse_seconds = Column(Float)
+    insert_seconds = Column(Float)
+    bytes_downloaded = Column(Integer)
+    duplicate_count = Column(Integer)
+    http_status = Column(JSON)          # {"200": 12, "304": 40, "error": 1}
+
     run_time = Column(TIMESTAMP, server_default=func.now())
 
 
+# -----------------------------------------------------
+# FEED VALIDATORS TABLE (conditional GET cache)
+# -----------------------------------------------------
+
+class FeedValidator(Base):
+    __tablename__ = "feed_validators"
+
+    url = Column(Text, primary_key=True)
+
+    etag = Column(Text)
+    last_modified = Column(Text)
+
+    # GUIDs of the most recent entries already handed to ingestion
+    seen_guids = Column(JSON)
+
+    checked_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+# -----------------------------------------------------
+# COLLECTOR CURSORS TABLE (incremental pull watermarks)
+# -----------------------------------------------------
+
+class CollectorCursor(Base):
+    __tablename__ = "collector_cursors"
+
+    source = Column(Text, primary_key=True)
+    key = Column(Text, primary_key=True)
+
+    value = Column(Text)
+
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+# -----------------------------------------------------
+# ARTICLE CACHE TABLE (extracted article bodies)
+# -----------------------------------------------------
+
+class ArticleCache(Base):
+    __tablename__ = "article_cache"
+
+    # syndicated copies of a link share one row
+    canonical_url = Column(Text, primary_key=True)
+    url = Column(Text)
+
+    status = Column(Text)           # "ok", "empty" (no article text), "failed"
+    title = Column(Text)
+    text = Column(Text)
+
+    http_status = Column(Integer)
+    error = Column(Text)
+
+    fetched_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
 # -----------------------------------------------------
 # ALERTS TABLE
 # -----------------------------------------------------
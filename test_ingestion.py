@@ -0,0 +1,1336 @@
+"""
+test_ingestion.py
+------------------
+Checks for the ingestion layer that need no Postgres server or network
+(DB-facing code runs against in-memory SQLite).
+Usage:
+    python test_ingestion.py
+"""
+
+import sys
+import traceback
+
+GREEN  = "\033[92m"
+RED    = "\033[91m"
+YELLOW = "\033[93m"
+CYAN   = "\033[96m"
+RESET  = "\033[0m"
+BOLD   = "\033[1m"
+
+passed = 0
+failed = 0
+
+def ok(label, detail=""):
+    global passed
+    passed += 1
+    suffix = f"  {YELLOW}({detail}){RESET}" if detail else ""
+    print(f"  {GREEN}✓ PASS{RESET}  {label}{suffix}")
+
+def fail(label, error=""):
+    global failed
+    failed += 1
+    print(f"  {RED}✗ FAIL{RESET}  {label}")
+    if error:
+        print(f"         {RED}{error}{RESET}")
+
+def section(title):
+    print(f"\n{BOLD}{CYAN}── {title} ──{RESET}")
+
+
+# ══════════════════════════════════════════════
+# 1. BULK INSERT — compiles against Postgres
+# ══════════════════════════════════════════════
+section("1. Bulk Insert Statement")
+try:
+    from sqlalchemy.dialects import postgresql
+    from ingestion.utils import _prepare_rows, _bulk_insert_statement
+
+    rows = _prepare_rows([
+        {"source": "test", "content": "Troops deployed near the border", "url": "https://www.example.com/a?utm_source=x",
+         "metadata": {"author": "desk"}},
+        {"source": "test", "content": "Flood relief camps set up in Assam", "url": "https://example.com/b"},
+        {"source": "test", "content": "Troops deployed near the border"},        # same content
+        {"source": "test", "content": "Same story, new title", "url": "https://example.com/a"},   # same canonical url
+        {"source": "test", "content": ""},
+    ])
+    assert len(rows) == 2, f"expected 2 rows after in-batch dedup, got {len(rows)}"
+    ok("_prepare_rows() in-batch dedup", f"{len(rows)} rows")
+
+    compiled = _bulk_insert_statement(rows).compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "metadata" in sql and "extra_metadata" not in sql, "metadata column not named by table column"
+    assert "ON CONFLICT DO NOTHING" in sql, "missing ON CONFLICT DO NOTHING"
+    assert "RETURNING raw_osint.id" in sql, "missing RETURNING id"
+    assert {"author": "desk"} in compiled.params.values(), "metadata value not bound"
+    ok("Bulk INSERT compiles (postgresql)", "metadata / ON CONFLICT / RETURNING")
+except AssertionError as e:
+    fail("Bulk insert assertion", str(e))
+except Exception as e:
+    fail("Bulk insert import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 2. SIMHASH — near-duplicate thresholds
+# ══════════════════════════════════════════════
+section("2. SimHash Near-Duplicates")
+try:
+    from ingestion import near_dup
+    from ingestion.near_dup import simhash, hamming, SimHashIndex, MAX_DISTANCE
+
+    near = [
+        ("Indian army kills three militants in Kupwara encounter",
+         "Indian army kills three militants in Kupwara encounter: officials"),
+        ("Heavy floods hit Assam as Brahmaputra crosses danger mark, thousands displaced",
+         "Heavy floods hit Assam as Brahmaputra crosses danger mark; thousands displaced - report"),
+    ]
+    distinct = [
+        ("India accuses Pakistan of ceasefire violation along LoC",
+         "Pakistan accuses India of ceasefire violation along LoC"),
+        ("Fight: INDIA -> PAKISTAN in Kashmir, India (2024-05-01)",
+         "Fight: PAKISTAN -> INDIA in Kashmir, India (2024-05-01)"),
+        ("Terror attack in Pulwama kills five CRPF personnel",
+         "Terror attack in Pulwama kills five BSF personnel"),
+    ]
+    for a, b in near:
+        distance = hamming(simhash(a), simhash(b))
+        assert distance <= MAX_DISTANCE, f"{distance} bits apart: {b!r}"
+        ok(f'Near: "{b[:40]}..."', f"{distance} bits")
+    for a, b in distinct:
+        distance = hamming(simhash(a), simhash(b))
+        assert distance > MAX_DISTANCE, f"only {distance} bits apart: {b!r}"
+        ok(f'Distinct: "{b[:40]}..."', f"{distance} bits")
+
+    assert simhash("Army on alert") is None, "short text fingerprinted"
+    ok("Short text not fingerprinted")
+
+    # banded lookup finds everything within MAX_DISTANCE
+    index = SimHashIndex(size=10)
+    base = simhash(near[0][0])
+    index.add(base, "h0")
+    flipped = base ^ sum(1 << bit for bit in range(0, 64, 64 // MAX_DISTANCE)[:MAX_DISTANCE])
+    assert index.find(flipped) == "h0", "match within MAX_DISTANCE missed"
+    assert index.find(base ^ 0xFFFF) is None, "match beyond MAX_DISTANCE returned"
+    ok("Banded index lookup", f"<= {MAX_DISTANCE} bits")
+
+    # screening: default mode links, exempt sources pass untouched
+    near_dup._index.warmed = True     # empty in-memory index, no DB warm-up
+    rows = [
+        {"source": "newsapi", "content": near[0][0], "content_hash": "a", "extra_metadata": None},
+        {"source": "gdelt", "content": near[0][1], "content_hash": "b", "extra_metadata": None},
+        {"source": "gdelt_events", "content": distinct[1][0], "content_hash": "c", "extra_metadata": None},
+        {"source": "gdelt_events", "content": distinct[1][0] + " ", "content_hash": "d", "extra_metadata": None},
+    ]
+    kept, signatures, suppressed = near_dup.screen_rows(rows)
+    assert near_dup.NEAR_DUP_MODE == "link", near_dup.NEAR_DUP_MODE
+    assert len(kept) == 4 and suppressed == 0, f"{len(kept)} kept, {suppressed} suppressed"
+    assert kept[1]["extra_metadata"] == {"near_duplicate_of": "a"}, kept[1]["extra_metadata"]
+    assert kept[3]["extra_metadata"] is None, "exempt source was linked"
+    assert len(signatures) == 2, "exempt sources must not be fingerprinted"
+    ok("screen_rows() link mode + exempt sources")
+except AssertionError as e:
+    fail("SimHash assertion", str(e))
+except Exception as e:
+    fail("SimHash import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 3. STREAM WRITER — failures stop the collector
+# ══════════════════════════════════════════════
+section("3. Stream Writer")
+try:
+    import time
+    import threading
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base
+    from models import RawOSINT
+    from ingestion import streaming
+    from ingestion.utils import _insert_chunk
+
+    def producers_alive():
+        return [t for t in threading.enumerate() if t.name == "ingestion-producer" and t.is_alive()]
+
+    def failing_insert(batch, bulk=False):
+        raise RuntimeError("connection refused")
+
+    def endless():
+        n = 0
+        while True:
+            n += 1
+            yield {"source": "test", "content": f"record {n}"}
+
+    closed = threading.Event()
+
+    async def endless_async():
+        try:
+            n = 0
+            while True:
+                n += 1
+                yield {"source": "test", "content": f"record {n}"}
+        finally:
+            closed.set()
+
+    real_insert = streaming.insert_records
+    streaming.insert_records = failing_insert
+    try:
+        for label, collector in (("sync", endless()), ("async", endless_async())):
+            cancelled = threading.Event()
+            try:
+                streaming.stream_records(collector, cancelled=cancelled, batch_size=50)
+                raise AssertionError(f"{label}: insert failure was swallowed")
+            except RuntimeError:
+                pass
+
+            assert cancelled.is_set(), f"{label}: cancelled not set after a failed flush"
+            time.sleep(streaming.PUT_POLL * 2)
+            assert not producers_alive(), f"{label}: producer thread still running"
+            ok(f"Failed insert stops the {label} producer")
+
+        assert closed.wait(2), "async collector never cancelled on the shared loop"
+        ok("Async collector cancelled on the shared loop")
+    finally:
+        streaming.insert_records = real_insert
+
+    # one bad row is skipped, the rest of its chunk is written
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[RawOSINT.__table__])
+    session = sessionmaker(bind=engine)()
+
+    chunk = _prepare_rows([{"source": "test", "content": f"row {i}"} for i in range(5)])
+    chunk[2]["extra_metadata"] = {"unserialisable": object()}
+    ids, rejected = _insert_chunk(session, chunk)
+    session.commit()
+    stored = [content for (content,) in session.query(RawOSINT.content).order_by(RawOSINT.id)]
+    assert stored == ["row 0", "row 1", "row 3", "row 4"], stored
+    assert len(ids) == 4 and [r["content"] for r in rejected] == ["row 2"], (ids, rejected)
+    ok("Bad row isolated within its chunk", "4 written, 1 rejected")
+    session.close()
+except AssertionError as e:
+    fail("Stream writer assertion", str(e))
+except Exception as e:
+    fail("Stream writer import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 4. CHECKPOINTS — progress saved only after commit
+# ══════════════════════════════════════════════
+section("4. Checkpoints")
+
+class FakeInsert:
+    """Stands in for insert_records; fails from batch number fail_at on."""
+
+    def __init__(self, fail_at=None):
+        self.fail_at = fail_at
+        self.batches = []
+
+    def __call__(self, batch, bulk=False):
+        if self.fail_at is not None and len(self.batches) + 1 >= self.fail_at:
+            raise RuntimeError("insert failed")
+        self.batches.append([record["content"] for record in batch])
+        return len(batch)
+
+
+def run_stream(items, insert, **kwargs):
+    """stream_records over items with insert_records swapped; returns the error, if any."""
+    real_insert = streaming.insert_records
+    streaming.insert_records = insert
+    try:
+        streaming.stream_records(iter(items), **kwargs)
+        return None
+    except RuntimeError as e:
+        return e
+    finally:
+        streaming.insert_records = real_insert
+
+try:
+    import asyncio
+    from ingestion.streaming import Checkpoint, records_only
+
+    saved = []
+    items = [
+        {"source": "test", "content": "a"}, {"source": "test", "content": "b"},
+        Checkpoint(lambda: saved.append("first")),
+        {"source": "test", "content": "c"},
+        Checkpoint(lambda: saved.append("second")),
+    ]
+
+    insert = FakeInsert()
+    assert run_stream(items, insert) is None
+    assert insert.batches == [["a", "b"], ["c"]], insert.batches
+    assert saved == ["first", "second"], saved
+    ok("Checkpoint flushes the records before it, then commits")
+
+    saved.clear()
+    error = run_stream(items, FakeInsert(fail_at=2))
+    assert error is not None, "failed insert swallowed"
+    assert saved == ["first"], f"checkpoint after a failed insert was saved: {saved}"
+    ok("No checkpoint past a failed insert")
+
+    saved.clear()
+    cancelled = threading.Event()
+    cancelled.set()
+    run_stream(items, FakeInsert(), cancelled=cancelled)
+    assert saved == [], saved
+    ok("No checkpoint once cancelled")
+
+    assert records_only(items) == [items[0], items[1], items[3]]
+    ok("records_only() drops checkpoints")
+
+    # Telegram: a channel's watermark is a checkpoint queued behind its messages
+    from ingestion.collectors import telegram
+
+    class FakeMessage:
+        def __init__(self, message_id, text):
+            self.id, self.text, self.date = message_id, text, "2024-05-01"
+
+        def to_dict(self):
+            return {"id": self.id, "message": self.text}
+
+    class FakeClient:
+        def iter_messages(self, channel, **kwargs):
+            async def messages():
+                for message_id, text in ((11, "Troops on the Kashmir border"), (12, "weather"), (13, "India says")):
+                    yield FakeMessage(message_id, text)
+            return messages()
+
+    async def collect_channel():
+        emitted = []
+
+        async def emit(item):
+            emitted.append(item)
+
+        await telegram._collect_channel(FakeClient(), "TestChannel", 10, asyncio.Semaphore(1), emit)
+        return emitted
+
+    cursors = []
+    real_save = telegram.save_cursors
+    telegram.save_cursors = lambda source, values: cursors.append((source, values))
+    try:
+        emitted = asyncio.run(collect_channel())
+        assert isinstance(emitted[-1], Checkpoint) and len(records_only(emitted)) == 2, emitted
+        assert cursors == [], "watermark saved before the writer committed"
+
+        error = run_stream(emitted, FakeInsert(fail_at=1))
+        assert error is not None and cursors == [], f"watermark saved after a failed insert: {cursors}"
+        ok("Telegram watermark kept after a failed insert")
+
+        run_stream(emitted, FakeInsert())
+        assert cursors == [("telegram", {"TestChannel": 13})], cursors
+        ok("Telegram watermark saved after commit", "TestChannel -> 13")
+    finally:
+        telegram.save_cursors = real_save
+except AssertionError as e:
+    fail("Checkpoint assertion", str(e))
+except Exception as e:
+    fail("Checkpoint import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 5. NEWSAPI / GDELT CURSORS
+# ══════════════════════════════════════════════
+section("5. NewsAPI / GDELT Cursors")
+try:
+    from ingestion.collectors import news, gdelt
+
+    def patched(module, **attrs):
+        originals = {name: getattr(module, name) for name in attrs}
+        for name, value in attrs.items():
+            setattr(module, name, value)
+        return originals
+
+    # NewsAPI, developer plan: one full page of newer articles
+    pages = []
+
+    def news_page(page, since):
+        pages.append(page)
+        return [
+            {"title": f"Border news {n}", "url": f"https://example.com/{n}",
+             "publishedAt": f"2024-05-02T{23 - n // 60:02d}:{59 - n % 60:02d}:00Z"}
+            for n in range(news.PAGE_SIZE)
+        ]
+
+    cursors = []
+    originals = patched(
+        news,
+        _fetch_page=news_page,
+        load_cursors=lambda source: {"published_at": "2024-05-01T00:00:00Z"},
+        save_cursors=lambda source, values: cursors.append(values),
+        MAX_PAGES=news.MAX_PAGES,
+    )
+    try:
+        assert news.MAX_PAGES == 1, f"developer plan pages through {news.MAX_PAGES} pages"
+
+        items = list(news.iter_news())
+        assert pages == [1], f"fetched pages {pages}"
+        assert len(records_only(items)) == news.PAGE_SIZE and isinstance(items[-1], Checkpoint)
+        assert cursors == [], "cursor saved before the writer committed"
+        ok("NewsAPI pages capped to the plan", f"{len(pages)} request")
+
+        assert run_stream(items, FakeInsert(fail_at=1)) is not None and cursors == []
+        ok("NewsAPI cursor kept after a failed insert")
+
+        run_stream(items, FakeInsert())
+        assert cursors == [{"published_at": "2024-05-02T23:59:00Z"}], cursors
+        ok("NewsAPI cursor advanced to the newest committed item", cursors[0]["published_at"])
+
+        # paid plan, page 2 fails: page 1 is still ingested, the cursor stays put
+        pages.clear()
+        cursors.clear()
+        news.MAX_PAGES = 3
+        news._fetch_page = lambda page, since: news_page(page, since) if page == 1 else pages.append(page)
+        items = list(news.iter_news())
+        assert pages == [1, 2], f"fetched pages {pages}"
+        assert len(records_only(items)) == news.PAGE_SIZE and not any(isinstance(i, Checkpoint) for i in items)
+        run_stream(items, FakeInsert())
+        assert cursors == [], cursors
+        ok("NewsAPI cursor kept when a later page fails")
+    finally:
+        patched(news, **originals)
+
+    # GDELT DOC: a full page then a short one, a checkpoint after each
+    def gdelt_page(start):
+        if start == "20240501000000":
+            return [{"title": f"GDELT {n}", "seendate": f"20240501T00{n // 60:02d}{n % 60:02d}Z"} for n in range(gdelt.PAGE_SIZE)]
+        return [{"title": "GDELT last", "seendate": "20240501T050000Z"}]
+
+    cursors = []
+    originals = patched(
+        gdelt,
+        _fetch_page=gdelt_page,
+        load_cursors=lambda source: {"startdatetime": "20240501000000"},
+        save_cursors=lambda source, values: cursors.append(values["startdatetime"]),
+    )
+    try:
+        items = list(gdelt.iter_gdelt())
+        assert sum(isinstance(item, Checkpoint) for item in items) == 2
+        assert cursors == []
+
+        # second page's insert fails: only the first page's cursor moves
+        run_stream(items, FakeInsert(fail_at=2), batch_size=gdelt.PAGE_SIZE)
+        assert cursors == ["20240501000409"], cursors
+        ok("GDELT cursor advances page by page, only after commit", cursors[0])
+    finally:
+        patched(gdelt, **originals)
+except AssertionError as e:
+    fail("Cursor assertion", str(e))
+except Exception as e:
+    fail("Cursor import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 6. RSS FEED CACHE — saved only after commit
+# ══════════════════════════════════════════════
+section("6. RSS Feed Cache")
+try:
+    from sqlalchemy.pool import StaticPool
+    from models import FeedValidator
+    from ingestion import feed_cache
+    from ingestion.fetcher import FetchResult
+    from ingestion.collectors import regional_rss
+
+    FEED = "https://feeds.example.com/pk.xml"
+    RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel><title>Test</title>
+        <item><guid>g1</guid><title>Army on alert along the India border</title><link>https://example.com/1</link></item>
+        <item><guid>g2</guid><title>Kashmir security review held</title><link>https://example.com/2</link></item>
+        </channel></rss>"""
+
+    # one shared connection: the collector runs in the producer thread
+    cache_engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(cache_engine, tables=[FeedValidator.__table__])
+    cache_session = sessionmaker(bind=cache_engine)
+
+    def stored_validators():
+        db = cache_session()
+        try:
+            return {row.url: (row.etag, list(row.seen_guids or [])) for row in db.query(FeedValidator)}
+        finally:
+            db.close()
+
+    originals = patched(
+        regional_rss,
+        REGIONAL_SOURCES={"Pakistan": [FEED]},
+        fetch_many=lambda urls, **kwargs: [FetchResult(url=FEED, status=200, content=RSS, headers={"ETag": '"v1"'})],
+    )
+    real_session = patched(feed_cache, SessionLocal=cache_session)
+    try:
+        error = run_stream(regional_rss.iter_regional_rss(), FakeInsert(fail_at=1))
+        assert error is not None and stored_validators() == {}, stored_validators()
+        ok("Feed validators / GUIDs not saved after a failed insert")
+
+        insert = FakeInsert()
+        run_stream(regional_rss.iter_regional_rss(), insert)
+        assert len(insert.batches[0]) == 2, "entries hidden by the failed run"
+        assert stored_validators() == {FEED: ('"v1"', ["g1", "g2"])}, stored_validators()
+        ok("Feed validators / GUIDs saved after commit", "ETag + 2 GUIDs")
+    finally:
+        patched(regional_rss, **originals)
+        patched(feed_cache, **real_session)
+except AssertionError as e:
+    fail("Feed cache assertion", str(e))
+except Exception as e:
+    fail("Feed cache import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 7. GDELT EVENTS — slot cursor after commit, swapped actors kept
+# ══════════════════════════════════════════════
+section("7. GDELT Events")
+try:
+    from ingestion.collectors import gdelt_events
+
+    def export(url, slot, outcome):
+        for actors in (("INDIA", "PAKISTAN"), ("PAKISTAN", "INDIA")):
+            yield {"source": "gdelt_events", "content": f"Fight: {actors[0]} -> {actors[1]} in Kashmir ({slot})",
+                   "canonical_url": None, "url": "https://example.com/article"}
+        outcome["complete"] = True
+
+    slots = []
+    originals = patched(
+        gdelt_events,
+        _latest_export=lambda: "http://data.gdeltproject.org/gdeltv2/20240501003000.export.CSV.zip",
+        _iter_export=export,
+        load_cursors=lambda source: {"last_slot": "20240501000000"},
+        save_cursors=lambda source, values: slots.append(values["last_slot"]),
+    )
+    try:
+        items = list(gdelt_events.iter_gdelt_events())
+        assert sum(isinstance(item, Checkpoint) for item in items) == 2 and slots == []
+
+        run_stream(items, FakeInsert(fail_at=2), batch_size=10)
+        assert slots == ["20240501001500"], slots
+        ok("Slot cursor saved only for committed slots", slots[0])
+
+        rows, _, suppressed = near_dup.screen_rows(_prepare_rows(records_only(items)))
+        assert len(rows) == 4 and suppressed == 0, f"{len(rows)} kept"
+        ok("Actor-swapped events all kept", "no URL or near-dup collapse")
+    finally:
+        patched(gdelt_events, **originals)
+except AssertionError as e:
+    fail("GDELT events assertion", str(e))
+except Exception as e:
+    fail("GDELT events import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 8. RESPONSE HEADERS — looked up case-insensitively
+# ══════════════════════════════════════════════
+section("8. Response Headers")
+try:
+    from ingestion.fetcher import FetchResult
+    from ingestion.resilience import retry_after_seconds
+    from ingestion.feed_cache import FeedCache
+    from ingestion import enrichment, feed_cache
+
+    # HTTP/2 servers send every header name lower-case
+    response = FetchResult(url="https://example.com/", status=429, content="<p>ok</p>".encode("cp1252"), headers={
+        "retry-after": "30", "etag": '"v2"', "last-modified": "Wed, 01 May 2024 00:00:00 GMT",
+        "content-type": "text/html; charset=cp1252",
+    })
+
+    assert retry_after_seconds(response.headers) == 30.0, retry_after_seconds(response.headers)
+    ok("Retry-After read from lower-case header", "30s")
+
+    real_session = patched(feed_cache, SessionLocal=cache_session)
+    try:
+        cache = FeedCache([response.url])
+    finally:
+        patched(feed_cache, **real_session)
+    cache.update(response.url, response)
+    assert cache.headers(response.url) == {
+        "If-None-Match": '"v2"', "If-Modified-Since": "Wed, 01 May 2024 00:00:00 GMT"
+    }, cache.headers(response.url)
+    ok("ETag / Last-Modified read from lower-case headers")
+
+    assert enrichment._is_html(response) and "charset=cp1252" in response.headers["Content-Type"]
+    ok("Content-Type read from lower-case header")
+except AssertionError as e:
+    fail("Response headers assertion", str(e))
+except Exception as e:
+    fail("Response headers import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 9. PIPELINE DISPATCHER — reconnect, catch-up, row claiming
+# ══════════════════════════════════════════════
+section("9. Pipeline Dispatcher")
+try:
+    import queue
+    from types import SimpleNamespace
+    from sqlalchemy.exc import OperationalError
+    from ai_engine import dispatcher as dispatcher_module, pipeline
+    from ai_engine.dispatcher import PipelineDispatcher
+
+    class FakeListenConnection:
+        def __init__(self):
+            self.executed, self.notifies, self.invalidated = [], [], False
+            self.driver_connection = self
+
+        def cursor(self):
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql):
+            self.executed.append(sql)
+
+        def invalidate(self):
+            self.invalidated = True
+
+    d = PipelineDispatcher(mode="postgres")
+    d._events = queue.Queue()
+    connections = []
+
+    def raw_connection():
+        if not connections:
+            connections.append(None)
+            raise OperationalError("connect", {}, Exception("server closed the connection"))
+        connections.append(FakeListenConnection())
+        return connections[-1]
+
+    def select_once(r, w, x, timeout):
+        d._stop.set()
+        return [], [], []
+
+    originals = patched(
+        dispatcher_module,
+        engine=SimpleNamespace(raw_connection=raw_connection),
+        select=SimpleNamespace(select=select_once),
+        unprocessed_record_ids=lambda limit: [3, 4],
+        RECONNECT_MAX=0.01,
+    )
+    try:
+        d._listen()
+    finally:
+        patched(dispatcher_module, **originals)
+
+    conn = connections[-1]
+    assert d.reconnects == 1 and len(connections) == 2, f"{d.reconnects} reconnects"
+    assert conn.executed and conn.executed[0].startswith("LISTEN") and conn.invalidated
+    ok("LISTEN reconnects after a lost connection", "1 retry with backoff")
+
+    assert d._events.get_nowait() == [3, 4]
+    ok("Unprocessed IDs queued after (re)connecting", "catch-up poll")
+
+    session = sessionmaker(bind=engine)()
+    sql = str(pipeline._claim(session.query(RawOSINT)).statement.compile(dialect=postgresql.dialect()))
+    assert sql.rstrip().endswith("FOR UPDATE SKIP LOCKED"), sql
+    ok("Pipeline claims rows FOR UPDATE SKIP LOCKED")
+
+    # one failing record is rolled back alone; the batch commits once
+    session.query(RawOSINT).delete()
+    session.add_all([RawOSINT(source="test", content=f"record {i}") for i in range(3)])
+    session.commit()
+
+    def process_record(record, body=None, original=None):
+        record.processed = True
+        if record.content == "record 1":
+            raise ValueError("bad record")
+
+    real_process = patched(pipeline, _process_record=process_record, BATCH_WRITE=False)
+    try:
+        counts = pipeline._process_batch(session, pipeline._claim(session.query(RawOSINT)).all())
+    finally:
+        patched(pipeline, **real_process)
+    session.close()
+
+    session = sessionmaker(bind=engine)()
+    stored = [(r.content, r.processed) for r in session.query(RawOSINT).order_by(RawOSINT.id)]
+    session.close()
+    assert counts == (2, 1), counts
+    assert stored == [("record 0", True), ("record 1", False), ("record 2", True)], stored
+    ok("Failed record rolled back alone, batch committed", "2 processed, 1 failed")
+except AssertionError as e:
+    fail("Pipeline dispatcher assertion", str(e))
+except Exception as e:
+    fail("Pipeline dispatcher import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 10. MIGRATIONS — schema changes for existing databases
+# ══════════════════════════════════════════════
+section("10. Migrations")
+try:
+    import migrate
+    from sqlalchemy import inspect, text
+
+    sql = migrate.statements(postgresql.dialect())
+    assert "ALTER TABLE ingestion_logs ADD COLUMN IF NOT EXISTS duration_seconds FLOAT" in sql, sql
+    assert "ALTER TABLE ingestion_logs ADD COLUMN IF NOT EXISTS duplicate_count INTEGER" in sql, sql
+    assert sql.index("ALTER TABLE raw_osint ADD COLUMN IF NOT EXISTS canonical_url TEXT") < sql.index(
+        "CREATE UNIQUE INDEX IF NOT EXISTS raw_osint_canonical_url_key ON raw_osint (canonical_url)"), sql
+    ok("Added columns compile to ADD COLUMN IF NOT EXISTS", f"{len(sql)} statements")
+
+    # SQLite has no ADD COLUMN IF NOT EXISTS; create_all() adds every column there
+    migrate_engine = create_engine("sqlite://")
+    Base.metadata.create_all(migrate_engine, tables=[RawOSINT.__table__])
+    urls = [
+        "https://www.example.com/a?utm_source=x",   # old row
+        "http://example.com/a",                      # same article, later: stays NULL
+        "https://example.com/b",                     # taken by a row stored after the column existed
+        "https://example.com/c/",
+        "ftp://example.com/d",                       # not an article URL
+        None,
+    ]
+    with migrate_engine.begin() as conn:
+        conn.execute(RawOSINT.__table__.insert(), [
+            {"source": "test", "content": f"row {i}", "url": url} for i, url in enumerate(urls)
+        ])
+        conn.execute(RawOSINT.__table__.insert(), {"source": "test", "content": "new",
+                                                   "url": "https://example.com/b",
+                                                   "canonical_url": "https://example.com/b"})
+
+    real_statements = patched(migrate, column_statements=lambda dialect: [], BACKFILL_BATCH=2)
+    try:
+        filled = migrate.migrate(migrate_engine)
+    finally:
+        patched(migrate, **real_statements)
+    created = set(inspect(migrate_engine).get_table_names())
+    assert {"feed_validators", "collector_cursors", "article_cache"} <= created, created
+    ok("New tables created", f"{len(created)} tables")
+
+    with migrate_engine.connect() as conn:
+        stored = [url for (url,) in conn.execute(
+            RawOSINT.__table__.select().with_only_columns(RawOSINT.canonical_url).order_by(RawOSINT.id))]
+    assert filled == 2, filled
+    assert stored == ["https://example.com/a", None, None, "https://example.com/c", None, None,
+                      "https://example.com/b"], stored
+    ok("canonical_url backfilled in batches", "collisions left NULL")
+
+    # duplicates stored some other way stop the migration before the index
+    dup_engine = create_engine("sqlite://")
+    with dup_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE raw_osint (id INTEGER PRIMARY KEY, url TEXT, canonical_url TEXT)"))
+        conn.execute(text("INSERT INTO raw_osint (url, canonical_url) VALUES ('a', 'https://x.com/a'), "
+                          "('b', 'https://x.com/a')"))
+    try:
+        migrate.check_canonical_collisions(dup_engine)
+        raise AssertionError("duplicate canonical_url values not reported")
+    except RuntimeError as e:
+        assert "https://x.com/a (2x)" in str(e), str(e)
+    ok("Collisions reported before the unique index")
+except AssertionError as e:
+    fail("Migrations assertion", str(e))
+except Exception as e:
+    fail("Migrations import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 11. ARCHIVE — dated segment names, size rotation
+# ══════════════════════════════════════════════
+section("11. Archive Segments")
+try:
+    import os
+    import tempfile
+    from datetime import datetime, timezone
+    from ingestion import archive
+
+    with tempfile.TemporaryDirectory() as root:
+        frozen = datetime(2024, 5, 1, 12, 30, 0, tzinfo=timezone.utc)
+        originals = patched(archive, _now=lambda: frozen, SEGMENT_MAX_BYTES=200)
+        try:
+            # two runs of the same source opening their segments at the same instant
+            for run in ("a", "b"):
+                writer = archive.ArchiveWriter("rss", root=root)
+                for n in range(3):
+                    writer.write({"source": "rss", "content": f"run {run} record {n} " + "x" * 100})
+                writer.close()
+        finally:
+            patched(archive, **originals)
+
+        segments = archive.iter_segments("rss", root=root)
+        paths = [entry["path"] for entry in segments]
+        assert len(paths) == len(set(paths)) == 4, paths      # 2 records per 200-byte segment
+        assert all("rss-20240501T123000000000Z-" in path for path in paths), paths
+        ok("Segment names carry the full UTC date, never collide", f"{len(paths)} segments")
+
+        contents = [record["content"][:14] for record in archive.iter_archived("rss", root=root)]
+        assert sorted(contents) == sorted(f"run {r} record {n}" for r in "ab" for n in range(3)), contents
+        ok("Segments rotate by size, every record replayable")
+
+    # async collectors: archive I/O runs off the event loop thread
+    class ThreadRecordingWriter:
+        def __init__(self):
+            self.threads, self.records = [], []
+
+        def write(self, record):
+            self.threads.append(threading.get_ident())
+            self.records.append(record)
+
+        def close(self):
+            self.threads.append(threading.get_ident())
+
+    async def collect():
+        yield {"content": "a"}
+        yield Checkpoint(lambda: None)
+        yield {"content": "b"}
+
+    async def drain(writer):
+        loop_thread = threading.get_ident()
+        items = [item async for item in archive.archived_async(collect(), writer)]
+        return loop_thread, items
+
+    writer = ThreadRecordingWriter()
+    loop_thread, items = asyncio.run(drain(writer))
+    assert len(items) == 3 and writer.records == [{"content": "a"}, {"content": "b"}], writer.records
+    assert len(writer.threads) == 3 and loop_thread not in writer.threads, "archive I/O ran on the loop"
+    ok("Async archive writes and close run off the event loop")
+except AssertionError as e:
+    fail("Archive assertion", str(e))
+except Exception as e:
+    fail("Archive import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 12. ENRICHMENT — bodies fetched on the shared loop, cached
+# ══════════════════════════════════════════════
+section("12. Article Enrichment")
+try:
+    import asyncio
+    from models import ArticleCache
+    from ingestion import enrichment, fetcher
+
+    PAGE = ("<html><head><title>Border alert</title></head><body><nav>Home | World</nav>"
+            "<p>Security forces stepped up patrols along the border on Tuesday after reports of movement.</p>"
+            "</body></html>").encode()
+
+    enrich_engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(enrich_engine, tables=[ArticleCache.__table__])
+
+    requested, loops = [], []
+
+    async def fake_fetch_many_async(urls, timeout=None, source=None, deadline=None, **kwargs):
+        loops.append(asyncio.get_running_loop())
+        requested.extend(urls)
+        return [FetchResult(url=url, status=200, content=PAGE, headers={"content-type": "text/html"})
+                for url in urls]
+
+    originals = patched(enrichment, SessionLocal=sessionmaker(bind=enrich_engine),
+                        fetch_many_async=fake_fetch_many_async)
+    try:
+        urls = ["https://www.example.com/story?utm_source=feed", "https://example.com/story"]
+        first = enrichment.fetch_bodies(urls)
+        second = enrichment.fetch_bodies(urls)
+    finally:
+        patched(enrichment, **originals)
+
+    assert loops == [fetcher._get_loop()], "fetch did not run on the shared loop"
+    assert requested == [urls[0]], requested
+    assert set(first) == set(urls) and first[urls[1]].startswith("Security forces"), first
+    ok("Bodies fetched once on the shared loop", "2 links, 1 canonical url")
+
+    assert second == first, second
+    ok("Cached body returned without a request")
+except AssertionError as e:
+    fail("Enrichment assertion", str(e))
+except Exception as e:
+    fail("Enrichment import/run", traceback.format_exc().splitlines()[-1])
+
+
+# ══════════════════════════════════════════════
+# 13. CONTENT HASH FILTER — Bloom filter generations
+# ══════════════════════════════════════════════
+section("13. Content Hash Filter")
+try:
+    import hashlib
+    from ingestion.dedup import HashFilter
+
+    def digest(n):
+        return hashlib.sha256(f"record {n}".encode()).hexdigest()
+
+    bloom = HashFilter(capacity=1000, error_rate=0.01)
+    memory = bloom.stats()["memory_bytes"]
+
+    for n in range(1000):
+        bloom.add(digest(n))
+    assert all(bloom.might_contain(digest(n)) for n in range(1000)), "false negative"
+    ok("No false negatives at capacity", f"{bloom.num_bits} bits, {bloom.num_hashes} hashes")
+
+    false_positives = sum(bloom.might_contain(digest(n)) for n in range(10_000, 20_000))
+    assert false_positives / 10_000 < 0.03, f"{false_positives / 10_000:.2%} false positives"
+    ok("False-positive rate near target", f"{false_positives / 10_000:.2%} (target 1%)")
+
+    # two more generations: the first has aged out, the newest two are kept
+    for n in range(1000, 3000):
+        bloom.add(digest(n))
+    aged = sum(bloom.might_contain(digest(n)) for n in range(1000))
+    assert aged / 1000 < 0.05, f"{aged} of the oldest generation still reported"
+    assert all(bloom.might_contain(digest(n)) for n in range(2000, 3000)), "recent hash lost"
+    assert bloom.stats()["memory_bytes"] == memory, "filter grew"
+    ok("Oldest generation ages out, memory fixed", f"{memory} bytes")
+except AssertionError as e:
+    fail("Hash filter assertion", str(e))
+except Exception as e:
+    fail("Hash filter import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 14. RESILIENCE — token bucket, circuit breaker
+# ══════════════════════════════════════════════
+section("14. Token Bucket / Circuit Breaker")
+try:
+    from ingestion.resilience import TokenBucket, CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+    bucket = TokenBucket(rate_per_minute=60, burst=2)
+    waits = [bucket.reserve() for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0], waits
+    assert 0.9 < waits[2] <= 1.0 and 1.9 < waits[3] <= 2.0, waits
+    ok("Token bucket: burst, then one token per second", ", ".join(f"{w:.2f}s" for w in waits))
+
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.2, max_cooldown=5)
+    breaker.record_failure("HTTP 503")
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure("HTTP 503")
+    assert breaker.state == OPEN and not breaker.allow(), breaker.state
+    ok("Breaker opens after failure_threshold failures")
+
+    time.sleep(0.2 * 1.1)
+    assert breaker.allow() and breaker.state == HALF_OPEN, breaker.state
+    assert not breaker.allow(), "second half-open probe let through"
+    breaker.record_failure("HTTP 503")
+    assert breaker.state == OPEN and breaker.retry_in() > 0.2 * 1.5, breaker.retry_in()     # 0.4s ± 10% jitter
+    ok("Failed probe re-opens with a doubled cooldown", f"{breaker.retry_in():.3f}s")
+
+    time.sleep(breaker.retry_in() + 0.01)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.trips == 0 and breaker.allow()
+    ok("Successful probe closes the breaker")
+
+    breaker.record_failure("HTTP 429", retry_after=30)
+    assert breaker.state == OPEN and breaker.retry_in() > 29, breaker.retry_in()
+    ok("Retry-After opens the breaker at once", f"{breaker.retry_in():.0f}s")
+except AssertionError as e:
+    fail("Resilience assertion", str(e))
+except Exception as e:
+    fail("Resilience import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 15. SOURCE REGISTRY — config, policies, sync collectors
+# ══════════════════════════════════════════════
+section("15. Source Registry")
+try:
+    import json
+    from ingestion import registry, resilience
+
+    def sample_collector():
+        for n in range(120):
+            yield {"source": "registry_test", "content": f"record {n}"}
+
+    with tempfile.TemporaryDirectory() as folder:
+        config = os.path.join(folder, "sources.json")
+        with open(config, "w", encoding="utf-8") as f:
+            json.dump({"registry_test": {
+                "fetch": "ingestion.collectors.news:iter_news", "interval_minutes": 5,
+                "rate_per_minute": 12, "concurrency": 3,
+            }}, f)
+        registry.load_config(config)
+
+        with open(config, "w", encoding="utf-8") as f:
+            json.dump({"registry_test": {"fetch": "x:y", "interval": 5}}, f)
+        try:
+            registry.load_config(config)
+            raise AssertionError("unknown setting accepted")
+        except ValueError as e:
+            assert "interval" in str(e), e
+
+    try:
+        spec = registry.get_source("registry_test")
+        policy = resilience.SOURCE_POLICIES["registry_test"]
+        assert spec.interval_minutes == 5 and spec.deadline == registry.DEFAULT_DEADLINE, spec
+        assert (policy.rate_per_minute, policy.concurrency, policy.burst) == (12, 3, resilience.DEFAULT_POLICY.burst)
+        ok("load_config() registers spec and policy", "interval 5 min, 12/min, 3 in flight")
+        ok("Unknown settings rejected")
+
+        assert isinstance(spec.fetch, str) and spec.load() is news.iter_news, spec.fetch
+        ok("fetch path imported on first use")
+
+        spec.fetch = sample_collector
+
+        async def drain(records):
+            return [record async for record in records]
+
+        records = asyncio.run(drain(spec.open()))
+        assert [r["content"] for r in records] == [f"record {n}" for n in range(120)], len(records)
+        ok("Sync collector driven through a worker thread", f"{len(records)} records")
+    finally:
+        registry._specs.pop("registry_test", None)
+        resilience.SOURCE_POLICIES.pop("registry_test", None)
+except AssertionError as e:
+    fail("Registry assertion", str(e))
+except Exception as e:
+    fail("Registry import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 16. URL CANONICALIZATION
+# ══════════════════════════════════════════════
+section("16. URL Canonicalization")
+try:
+    from ingestion.urls import canonicalize_url
+
+    spellings = [
+        "https://www.example.com/story/?utm_source=tw&b=2&a=1#top",
+        "http://m.example.com:80/story?a=1&b=2&fbclid=xyz",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/story/amp?b=2&a=1&amp_js_v=0.1&usqp=mq331AQ",
+        "https://amp.example.com/amp/story?a=1&b=2&utm_medium=social",
+    ]
+    canonical = {canonicalize_url(url) for url in spellings}
+    assert canonical == {"https://example.com/story?a=1&b=2"}, canonical
+    ok("Tracking / host / AMP variants collapse to one URL", len(spellings))
+
+    tests = {
+        "https://EXAMPLE.com/Path":           "https://example.com/Path",       # path case kept
+        "https://example.com:8443/x":         "https://example.com:8443/x",     # non-default port kept
+        "https://www.example.com/":           "https://example.com/",
+        "https://example.com/a?id=7&page=2":  "https://example.com/a?id=7&page=2",
+        "ftp://example.com/x":                None,
+        "not a url":                          None,
+        "":                                   None,
+    }
+    for url, expected in tests.items():
+        result = canonicalize_url(url)
+        assert result == expected, f"{url!r}: expected {expected}, got {result}"
+    ok("Meaningful parts kept, non-http rejected", f"{len(tests)} cases")
+except AssertionError as e:
+    fail("URL canonicalization assertion", str(e))
+except Exception as e:
+    fail("URL canonicalization import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 17. HALF-OPEN PROBE — released when cancelled before sending
+# ══════════════════════════════════════════════
+section("17. Half-Open Probe Cancellation")
+try:
+    from ingestion.fetcher import fetch_async, submit
+    from ingestion.resilience import set_policy, get_guard, HALF_OPEN
+
+    set_policy("probe_test", rate_per_minute=1, burst=1, failure_threshold=1, cooldown=0.05, max_retries=0)
+    guard = get_guard("probe_test")
+    try:
+        guard.bucket.reserve()                  # bucket drained: the next request waits ~60s
+        guard.record_failure("HTTP 503")        # circuit open
+        time.sleep(0.06)                        # cooldown over: next admit() takes the probe
+
+        async def cancel_during_wait():
+            task = asyncio.ensure_future(fetch_async("http://127.0.0.1:9/", source="probe_test"))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                return True
+            return False
+
+        assert submit(cancel_during_wait()).result(timeout=5), "fetch finished instead of waiting"
+        breaker = guard.breaker
+        assert breaker.state == HALF_OPEN and not breaker._probing, (breaker.state, breaker._probing)
+        assert breaker.failures == 1, f"{breaker.failures} failures: the wait was counted"
+        ok("Probe released, wait not counted as a failure")
+
+        assert guard.admit() is not None, "source still refused"
+        ok("Source admits the next probe")
+    finally:
+        guard.breaker.reset()
+        resilience.SOURCE_POLICIES.pop("probe_test", None)
+except AssertionError as e:
+    fail("Probe cancellation assertion", str(e))
+except Exception as e:
+    fail("Probe cancellation import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 18. NEAR-DUPLICATE ANALYSIS REUSE
+# ══════════════════════════════════════════════
+section("18. Near-Duplicate Analysis Reuse")
+try:
+    from ai_engine import pipeline
+
+    analysed = []
+
+    def analyze_record(record, body=None):
+        analysed.append(record.content)
+        # same keys as the real analysis, so the bulk UPDATE shares one SET list
+        return {**dict.fromkeys(pipeline.NEAR_DUP_FIELDS), "incident_type": "other",
+                "processed": True, "extra_metadata": {}}
+
+    for bulk in (False, True):
+        session = sessionmaker(bind=engine)()
+        session.query(RawOSINT).delete()
+        session.add_all([
+            RawOSINT(source="newsapi", content="original", content_hash="h-orig", processed=True,
+                     incident_type="terrorism", severity="high", risk_score=0.9, country="India",
+                     state="Jammu and Kashmir", geo_lat=34.1, geo_lon=74.8,
+                     extra_metadata={"place": "Kupwara"}),
+            RawOSINT(source="gdelt", content="re-titled copy", content_hash="h-copy",
+                     extra_metadata={"near_duplicate_of": "h-orig"}),
+            RawOSINT(source="gdelt", content="unrelated", content_hash="h-other"),
+        ])
+        session.commit()
+
+        analysed.clear()
+        real = patched(pipeline, _analyze_record=analyze_record, BATCH_WRITE=bulk, ENRICH_BODIES=False)
+        try:
+            pending = session.query(RawOSINT).filter(RawOSINT.processed == False).order_by(RawOSINT.id).all()  # noqa: E712
+            counts = pipeline._process_batch(session, pending)
+        finally:
+            patched(pipeline, **real)
+        session.close()
+
+        session = sessionmaker(bind=engine)()
+        copy = session.query(RawOSINT).filter_by(content_hash="h-copy").one()
+        original_id = session.query(RawOSINT).filter_by(content_hash="h-orig").one().id
+        session.close()
+
+        mode = "bulk" if bulk else "per record"
+        assert counts == (2, 0), f"{mode}: {counts}"
+        assert analysed == ["unrelated"], f"{mode}: linked row re-analysed ({analysed})"
+        assert copy.processed and copy.incident_type == "terrorism" and copy.geo_lat == 34.1, \
+            f"{mode}: {copy.incident_type} / {copy.geo_lat}"
+        assert copy.extra_metadata["place"] == "Kupwara" and copy.extra_metadata["analysis_of"] == original_id
+        assert "gdelt" in copy.extra_metadata["summary"], copy.extra_metadata["summary"]
+        ok(f"Linked row takes over the original's analysis ({mode})", "not re-analysed")
+
+    # with the stage off, remember() must not warm the index from the DB
+    warmed = []
+    real = patched(near_dup, NEAR_DUP_MODE="off", get_near_dup_index=lambda: warmed.append(1))
+    try:
+        near_dup.remember([(1, "h")])
+    finally:
+        patched(near_dup, **real)
+    assert not warmed, "index warmed with NEAR_DUP_MODE=off"
+    ok("remember() is a no-op with the stage off")
+except AssertionError as e:
+    fail("Near-duplicate reuse assertion", str(e))
+except Exception as e:
+    fail("Near-duplicate reuse import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 19. BACKFILL COPY + MERGE
+# ══════════════════════════════════════════════
+section("19. Backfill COPY + Merge")
+try:
+    import csv
+    import io
+    import json
+    from ingestion import backfill
+
+    class FakeCopyCursor:
+        def __init__(self, log):
+            self.log, self.rowcount = log, 0
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def execute(self, sql):
+            self.log.append(("execute", " ".join(sql.split())))
+            self.rowcount = 2
+
+        def copy_expert(self, sql, buffer):
+            self.log.append(("copy", sql, buffer.read()))
+
+    class FakeCopyConnection:
+        def __init__(self):
+            self.log = []
+
+        def cursor(self):
+            return FakeCopyCursor(self.log)
+
+        def commit(self):
+            self.log.append(("commit",))
+
+    items = [
+        json.dumps({"source": "archive", "content": "Curfew in Srinagar", "url": "https://example.com/a?utm_source=x",
+                    "geo_lat": 34.08, "geo_lon": "74.79", "metadata": {"k": 1}}),
+        json.dumps({"content": "Floods in Assam", "geo_lat": ""}),
+        "not json",
+    ]
+    rows = backfill._prepare_batch((items, "ndjson", "backfill"))
+    assert len(rows) == 2 and all(len(row) == len(backfill.STAGING_COLUMNS) for row in rows), rows
+
+    conn = FakeCopyConnection()
+    inserted = backfill._copy_and_merge(conn, rows)
+    steps = [entry[0] for entry in conn.log]
+    assert steps == ["execute", "copy", "execute", "commit"], steps
+    ok("One transaction per chunk", "create → COPY → merge → commit")
+
+    create, copy, merge = conn.log[0][1], conn.log[1], conn.log[2][1]
+    assert create.startswith("CREATE TEMP TABLE") and create.endswith("ON COMMIT DROP"), create
+    ok("Staging table is a per-transaction temp table")
+
+    columns = ", ".join(backfill.STAGING_COLUMNS)
+    assert f"({columns})" in copy[1] and "geo_lat" in columns and "geo_lon" in columns, copy[1]
+    assert f"INSERT INTO raw_osint ({columns}, processed)" in merge, merge
+    assert "DISTINCT ON (content_hash)" in merge and merge.endswith("ON CONFLICT DO NOTHING"), merge
+    assert inserted == 2
+    ok("COPY and INSERT ... ON CONFLICT DO NOTHING share the column list")
+
+    copied = [dict(zip(backfill.STAGING_COLUMNS, row)) for row in csv.reader(io.StringIO(copy[2]))]
+    assert copied[0]["geo_lat"] == "34.08" and copied[0]["geo_lon"] == "74.79", copied[0]
+    assert copied[0]["canonical_url"] == "https://example.com/a", copied[0]["canonical_url"]
+    assert copied[1]["source"] == "backfill" and copied[1]["geo_lat"] == "", copied[1]
+    ok("Coordinates, canonical URL and default source copied", "missing values as NULL")
+except AssertionError as e:
+    fail("Backfill assertion", str(e))
+except Exception as e:
+    fail("Backfill import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 20. PIPELINE BATCH WRITE
+# ══════════════════════════════════════════════
+section("20. Pipeline Batch Write")
+try:
+    from ai_engine import pipeline
+
+    contents = [
+        "Terrorists attacked an army camp in Kupwara, Jammu and Kashmir; two soldiers killed",
+        "Heavy floods in Assam displace thousands as the Brahmaputra crosses the danger mark",
+        "Pakistan accuses India of ceasefire violation along the LoC near Poonch",
+        "Protest march in Delhi turns violent, police use tear gas",
+    ]
+    result_columns = pipeline.NEAR_DUP_FIELDS + ("processed", "extra_metadata")
+
+    def run_batch(bulk, analyze=None):
+        batch_engine = create_engine("sqlite://")
+        Base.metadata.create_all(batch_engine, tables=[RawOSINT.__table__])
+        session = sessionmaker(bind=batch_engine)()
+        session.add_all([RawOSINT(source="test", content=c, url=f"https://example.com/{i}")
+                         for i, c in enumerate(contents)])
+        session.commit()
+
+        overrides = dict(BATCH_WRITE=bulk, ENRICH_BODIES=False, WRITE_CHUNK=3)
+        if analyze:
+            overrides["_analyze_record"] = analyze
+        real = patched(pipeline, **overrides)
+        try:
+            counts = pipeline._process_batch(session, session.query(RawOSINT).order_by(RawOSINT.id).all())
+        finally:
+            patched(pipeline, **real)
+        session.close()
+
+        session = sessionmaker(bind=batch_engine)()
+        stored = [tuple(getattr(r, c) for c in result_columns)
+                  for r in session.query(RawOSINT).order_by(RawOSINT.id)]
+        session.close()
+        return counts, stored
+
+    per_record = run_batch(False)
+    bulk = run_batch(True)
+    assert per_record[0] == bulk[0] == (4, 0), (per_record[0], bulk[0])
+    assert all(row[result_columns.index("processed")] for row in bulk[1]), "bulk left rows unprocessed"
+    assert per_record[1] == bulk[1], "bulk write stored different results"
+    ok("Bulk path writes the same rows as the per-record path", "4 records, 2 chunks")
+
+    # analysis of one record fails: only that record is left unprocessed
+    real_analyze = pipeline._analyze_record
+
+    def analyze_failing(record, body=None):
+        if "Assam" in record.content:
+            raise ValueError("bad record")
+        return real_analyze(record, body)
+
+    counts, stored = run_batch(True, analyze_failing)
+    processed = [row[result_columns.index("processed")] for row in stored]
+    assert counts == (3, 1) and processed == [True, False, True, True], (counts, processed)
+    ok("Failed analysis skips only its record (bulk)", "3 written, 1 failed")
+
+    # writing one record fails: its chunk is retried row by row
+    def analyze_unwritable(record, body=None):
+        fields = real_analyze(record, body)
+        if "ceasefire" in record.content:
+            fields["extra_metadata"] = {"unserialisable": object()}
+        return fields
+
+    counts, stored = run_batch(True, analyze_unwritable)
+    processed = [row[result_columns.index("processed")] for row in stored]
+    assert counts == (3, 1) and processed == [True, True, False, True], (counts, processed)
+    assert stored[3] == per_record[1][3], "row after the bad one stored differently"
+    ok("Failed write isolated within its chunk (bulk)", "3 written, 1 failed")
+except AssertionError as e:
+    fail("Pipeline batch write assertion", str(e))
+except Exception as e:
+    fail("Pipeline batch write import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# 21. KEYWORD MATCHER
+# ══════════════════════════════════════════════
+section("21. Keyword Matcher")
+try:
+    from ingestion.matcher import KeywordMatcher, WORD, PREFIX
+
+    # overlapping keywords: every one is reported, nested ones included
+    matcher = KeywordMatcher(["he", "she", "his", "hers"])
+    spans = [(m.start, m.end, m.keyword) for m in matcher.finditer("ushers")]
+    assert spans == [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")], spans
+    ok("Overlapping keywords", "she / he / hers in 'ushers'")
+
+    matcher = KeywordMatcher(["army", "army camp", "camp"])
+    assert matcher.counts("Army camp attacked near an army camp") == {"army": 2, "army camp": 2, "camp": 2}
+    ok("Nested phrases counted separately")
+
+    # boundaries
+    text = "The armyman and the shack hackers met army officials"
+    substring = KeywordMatcher(["army", "hack"])
+    word = KeywordMatcher(["army", "hack"], boundary=WORD)
+    prefix = KeywordMatcher(["army", "hack"], boundary=PREFIX)
+    assert substring.counts(text) == {"army": 2, "hack": 2}, substring.counts(text)
+    assert word.counts(text) == {"army": 1}, word.counts(text)
+    assert prefix.counts(text) == {"army": 2, "hack": 1}, prefix.counts(text)
+    ok("Substring / word / prefix boundaries")
+
+    mixed = KeywordMatcher(["loc"], boundary=WORD)
+    mixed.add("ied", boundary=PREFIX)
+    assert mixed.find_all("Blocked roads, IEDs found near the LoC.") == ["ied", "loc"]
+    ok("Per-keyword boundary override")
+
+    # punctuation and text edges count as boundaries
+    assert word.find_all("army") == ["army"] and word.find_all("(army)") == ["army"]
+    assert not word.search("") and not word.search(None)
+    ok("Text edges and punctuation are boundaries")
+
+    # Unicode: case folding, non-Latin scripts, letters as word characters
+    unicode = KeywordMatcher(["zürich", "कश्मीर", "attack"], boundary=WORD)
+    assert unicode.find_all("Protest in ZÜRICH over कश्मीर") == ["zürich", "कश्मीर"]
+    assert not unicode.search("Zürichsee"), "accented word matched inside a longer word"
+    # vowel signs and viramas are combining marks, still inside the word
+    assert not KeywordMatcher(["मीर", "कश"], boundary=WORD).search("कश्मीर"), "matched inside a Devanagari word"
+    ok("Unicode case folding and scripts")
+
+    # "İ" lowers to two characters: spans still index the original text
+    text = "İstanbul attack"
+    (match,) = unicode.finditer(text)
+    assert text[match.start:match.end] == "attack", (match.start, match.end)
+    ok("Spans stay aligned after length-changing case folds")
+
+    # one pass returns every keyword once, in order of first appearance,
+    # with its value
+    categories = KeywordMatcher({"blast": "terrorism", "flood": "disaster", "riot": "unrest"})
+    text = "Flood waters rose after the blast; a riot followed another blast"
+    assert categories.find_all(text) == ["flood", "blast", "riot"], categories.find_all(text)
+    assert [m.value for m in categories.finditer(text)] == ["disaster", "terrorism", "unrest", "terrorism"]
+    ok("find_all() returns every keyword in one pass", "with values")
+
+    assert KeywordMatcher(["Delhi"], case_sensitive=True).find_all("delhi and Delhi") == ["Delhi"]
+    assert KeywordMatcher(["Delhi"], case_sensitive=True).counts("delhi and Delhi") == {"Delhi": 1}
+    ok("Case-sensitive matching")
+except AssertionError as e:
+    fail("Keyword matcher assertion", str(e))
+except Exception as e:
+    fail("Keyword matcher import/run", traceback.format_exc().splitlines()[-1])
+
+# ══════════════════════════════════════════════
+# FINAL REPORT
+# ══════════════════════════════════════════════
+total = passed + failed
+print(f"\n{BOLD}{'═'*45}{RESET}")
+print(f"{BOLD}  RESULTS:  {GREEN}{passed} passed{RESET}  |  {RED}{failed} failed{RESET}  |  {total} total{RESET}")
+print(f"{BOLD}{'═'*45}{RESET}\n")
+
+if failed > 0:
+    sys.exit(1)
+else:
+    print(f"{GREEN}{BOLD}  ✓ All checks passed. Ingestion is healthy!{RESET}\n")
+    sys.exit(0)